@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Whisper INT8量化对比工具 - 在参考音频上比较FP32与INT8模型的速度和准确度
+
+用法:
+    python benchmark_quantization.py <参考音频或视频> [模型名称]
+"""
+
+import sys
+import time
+
+import whisper
+
+import config
+from core.speech_recognizer import SpeechRecognizer
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    计算词错误率（以FP32结果为参考）
+
+    Args:
+        reference: 参考文本
+        hypothesis: 待评估文本
+
+    Returns:
+        词错误率 (0-1，可能大于1)
+    """
+    ref_words = reference.lower().split()
+    hyp_words = hypothesis.lower().split()
+
+    if not ref_words:
+        return 0.0 if not hyp_words else 1.0
+
+    # 编辑距离（只保留上一行）
+    previous = list(range(len(hyp_words) + 1))
+    for i, ref_word in enumerate(ref_words, 1):
+        current = [i] + [0] * len(hyp_words)
+        for j, hyp_word in enumerate(hyp_words, 1):
+            cost = 0 if ref_word == hyp_word else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+        previous = current
+
+    return previous[-1] / len(ref_words)
+
+
+def run_once(audio_path: str, model_name: str, quantize: bool) -> dict:
+    """
+    运行一次转录并统计耗时
+
+    Args:
+        audio_path: 参考音频路径
+        model_name: Whisper模型名称
+        quantize: 是否使用INT8量化
+
+    Returns:
+        统计结果字典
+    """
+    recognizer = SpeechRecognizer(model_name=model_name, device="cpu", quantize=quantize)
+
+    load_start = time.time()
+    recognizer._load_model()
+    load_time = time.time() - load_start
+
+    transcribe_start = time.time()
+    subtitle_list = recognizer.transcribe(audio_path, language=config.TRANSLATION_SOURCE_LANG)
+    transcribe_time = time.time() - transcribe_start
+
+    return {
+        "load_time": load_time,
+        "transcribe_time": transcribe_time,
+        "text": " ".join(segment.text_en for segment in subtitle_list.segments),
+        "segments": len(subtitle_list),
+    }
+
+
+def main():
+    """主函数"""
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    audio_path = sys.argv[1]
+    model_name = sys.argv[2] if len(sys.argv) > 2 else config.WHISPER_MODEL
+
+    # 两次运行都必须真正转录，不能读取对方留下的语音识别断点
+    config.TRANSCRIBE_CHECKPOINT = False
+
+    audio_duration = len(whisper.load_audio(audio_path)) / whisper.audio.SAMPLE_RATE
+
+    print("=" * 60)
+    print(" Whisper INT8量化对比报告")
+    print("=" * 60)
+    print(f"参考音频: {audio_path}")
+    print(f"音频时长: {audio_duration:.1f}秒")
+    print(f"模型: {model_name}")
+
+    fp32 = run_once(audio_path, model_name, quantize=False)
+    int8 = run_once(audio_path, model_name, quantize=True)
+
+    print()
+    print(f"{'':<12}{'FP32':>12}{'INT8':>12}")
+    print(f"{'加载耗时':<10}{fp32['load_time']:>11.1f}s{int8['load_time']:>11.1f}s")
+    print(f"{'转录耗时':<10}{fp32['transcribe_time']:>11.1f}s{int8['transcribe_time']:>11.1f}s")
+    print(f"{'实时率RTF':<11}"
+          f"{fp32['transcribe_time'] / audio_duration:>12.3f}"
+          f"{int8['transcribe_time'] / audio_duration:>12.3f}")
+    print(f"{'字幕条数':<10}{fp32['segments']:>12d}{int8['segments']:>12d}")
+    print()
+    print(f"加速比: {fp32['transcribe_time'] / int8['transcribe_time']:.2f}x")
+    print(f"INT8相对FP32的词错误率: {word_error_rate(fp32['text'], int8['text']) * 100:.2f}%")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+字幕内存占用对比工具 - 比较逐片段对象存储与列式存储的每片段内存占用
+
+用法:
+    python benchmark_subtitle_memory.py [片段数]
+"""
+
+import sys
+import tracemalloc
+from dataclasses import dataclass
+
+from models.subtitle import SubtitleList, SubtitleSegment
+
+
+@dataclass
+class LegacySubtitleSegment:
+    """改为列式存储之前的字幕片段（普通dataclass，每个实例带__dict__）"""
+    id: int
+    start: float
+    end: float
+    text_en: str
+    text_zh: str = ""
+    translating: bool = False
+    avg_logprob: float = 0.0
+    no_speech_prob: float = 0.0
+
+
+def make_texts(count: int) -> list[tuple[str, str]]:
+    """
+    生成测试用的双语文本（在测量之前创建，两种存储共享同样的字符串）
+
+    Args:
+        count: 片段数
+
+    Returns:
+        (英文, 中文) 列表
+    """
+    return [
+        (f"This is subtitle number {i} with a typical sentence length.", f"这是第{i}条字幕，长度和普通句子差不多。")
+        for i in range(count)
+    ]
+
+
+def measure(build) -> int:
+    """
+    测量构建函数返回的对象占用的内存
+
+    Args:
+        build: 无参数的构建函数
+
+    Returns:
+        分配的字节数
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    texts = make_texts(count)
+
+    def build_legacy():
+        return [
+            LegacySubtitleSegment(i + 1, i * 2.5, i * 2.5 + 2.0, en, zh, avg_logprob=-0.3, no_speech_prob=0.01)
+            for i, (en, zh) in enumerate(texts)
+        ]
+
+    def build_slots():
+        return [
+            SubtitleSegment(i + 1, i * 2.5, i * 2.5 + 2.0, en, zh, avg_logprob=-0.3, no_speech_prob=0.01)
+            for i, (en, zh) in enumerate(texts)
+        ]
+
+    def build_columnar():
+        segments = (
+            SubtitleSegment(i + 1, i * 2.5, i * 2.5 + 2.0, en, zh, avg_logprob=-0.3, no_speech_prob=0.01)
+            for i, (en, zh) in enumerate(texts)
+        )
+        return SubtitleList(segments=segments)
+
+    print(f"片段数: {count}（文本字符串不计入，三种存储共享）")
+    print("-" * 50)
+    for name, build in [
+        ("dataclass对象列表（原实现）", build_legacy),
+        ("__slots__ dataclass对象列表", build_slots),
+        ("列式SubtitleList", build_columnar),
+    ]:
+        size = measure(build)
+        print(f"{name:<28} {size / count:8.1f} 字节/片段  共 {size / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,15 +12,49 @@ BASE_DIR = Path(__file__).parent
 CACHE_DIR = BASE_DIR / "cache"
 AUDIO_CACHE_DIR = CACHE_DIR / "audio"
 SUBTITLE_CACHE_DIR = CACHE_DIR / "subtitles"
+CHECKPOINT_CACHE_DIR = CACHE_DIR / "checkpoints"
+ENCODER_CACHE_DIR = CACHE_DIR / "encoder"
 
 # 创建缓存目录
 CACHE_DIR.mkdir(exist_ok=True)
 AUDIO_CACHE_DIR.mkdir(exist_ok=True)
 SUBTITLE_CACHE_DIR.mkdir(exist_ok=True)
+CHECKPOINT_CACHE_DIR.mkdir(exist_ok=True)
+ENCODER_CACHE_DIR.mkdir(exist_ok=True)
 
 # Whisper配置
 WHISPER_MODEL = "base"  # 可选: tiny, base, small, medium, large
 WHISPER_DEVICE = "cpu"  # 自动检测，如果可用则使用cuda
+WHISPER_QUANTIZE = False  # CPU推理时对Linear层做动态INT8量化（量化后的模型缓存为 models/whisper/<模型名>.int8.pt）
+DECODING_GUARD = True  # 检测解码器的重复循环和压缩比异常，提前截断窗口并丢弃重复片段
+
+# 语音识别后端配置
+ASR_BACKEND = "whisper"  # 可选: whisper, ctranslate2, stub（测试用）
+CT2_MODEL_DIR = BASE_DIR / "models" / "whisper-ct2"  # 转换后的CTranslate2模型目录
+CT2_COMPUTE_TYPE = "int8"  # CTranslate2计算精度
+CT2_CPU_THREADS = 0  # CTranslate2使用的CPU线程数，0表示自动
+
+# 批量推理配置
+WHISPER_BATCHED = False  # 把音频预切分为30秒窗口，按批次进行编码和解码
+WHISPER_BATCH_SIZE = 8  # 每批的窗口数
+WHISPER_BATCH_MEMORY_MB = 1024  # 批量推理的内存上限（MB），超过时自动减小批次
+ENCODER_CACHE = True  # 批量推理时把每个窗口的梅尔频谱和编码器输出缓存到磁盘（float16），更换解码参数时跳过编码器
+ENCODER_CACHE_MAX_MB = 2048  # 编码器缓存的总大小上限（MB），超过时删除最久未使用的音频的缓存
+ASR_SHARED_SERVER = False  # 多个转录任务共享一个模型，由推理服务跨任务合批（使用批量推理模式）
+INFERENCE_BATCH_DEADLINE_MS = 200  # 推理服务凑批等待的最长时间（毫秒）
+
+# 两遍转录配置
+ASR_TWO_PASS = False  # 先用小模型快速生成字幕立即打开视频，再在后台用 WHISPER_MODEL 精修
+WHISPER_PREVIEW_MODEL = "tiny"  # 第一遍使用的快速模型
+REFINE_SAVE_WINDOWS = 10  # 精修每替换这么多个窗口保存一次字幕（结束或停止时总会保存）
+
+# 渐进式转录配置
+ASR_PROGRESSIVE = False  # 提取音频后立即打开视频，在后台逐个窗口生成字幕，优先处理播放位置附近的窗口
+PROGRESSIVE_WINDOW_SECONDS = 30  # 渐进式转录的窗口时长（秒）
+
+# 断点续传配置
+TRANSCRIBE_CHECKPOINT = True  # 按窗口分段转录并保存断点，中断后重新处理同一音频时从上次完成的窗口继续
+TRANSCRIBE_WINDOW_SECONDS = 300  # 断点窗口时长（秒）
 
 # 翻译配置
 TRANSLATION_SOURCE_LANG = "en"
@@ -35,6 +69,11 @@ SUPPORTED_VIDEO_FORMATS = [".mp4", ".mov", ".mkv", ".avi", ".flv", ".wmv"]
 
 # 字幕配置
 SUBTITLE_FORMAT = "json"  # 输出格式：json, srt, vtt
+SUBTITLE_CACHE_FORMAT = "bin"  # 缓存格式：bin（二进制，内存映射加载）, json
+SUBTITLE_CACHE_COMPRESS = False  # 二进制缓存是否压缩文本（文件更小，但加载时需要解压）
+USE_EMBEDDED_SUBTITLES = True  # 视频带有文本字幕时询问是否直接使用，跳过语音识别
+SEARCH_INDEX = True  # 保存字幕时更新字幕库全文搜索索引
+SEARCH_INDEX_PATH = CACHE_DIR / "search_index.db"  # 搜索索引数据库
 
 # GUI配置
 WINDOW_WIDTH = 1400
@@ -45,3 +84,5 @@ SUBTITLE_PANEL_WIDTH = 500
 # 复读配置
 REPEAT_COUNTS = [0, 3, 10, 20]  # 可选的复读次数
 REPEAT_BUFFER_TIME = 0.3  # 复读时句子结束后的缓冲时间（秒），确保完整听完最后一个单词
+PCM_REPEAT = False  # 是否默认勾选音频复读（默认关闭，可在控制面板中开启）：从缓存音频截取句子在内存中循环播放，不跳转视频（不可用时回退为跳转复读）
+PCM_REPEAT_VIDEO = "freeze"  # 音频复读时的视频：freeze（停在句首）/sync（静音跟随每一遍）/none（不控制，只静音）
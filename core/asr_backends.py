@@ -0,0 +1,768 @@
+"""
+语音识别后端模块 - 统一不同推理引擎的加载、转录、流式输出和单词时间戳能力
+
+所有后端都输出Whisper格式的片段字典：
+    {"start", "end", "text", "words": [{"start", "end", "word"}],
+     "avg_logprob", "no_speech_prob", "compression_ratio"}
+解码失控被截断的片段额外带有 "runaway" 字段（失控原因）。
+SpeechRecognizer 统一把片段字典转换为 SubtitleList，保证不同后端的输出结构一致。
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+import config
+from core.decoding_guard import guarded_decode, install_guard, mark_runaway_segments
+from core.encoder_cache import EncoderCache
+from utils.audio_utils import SAMPLE_RATE, load_audio
+
+AudioInput = Union[str, np.ndarray]
+
+# Whisper温度回退序列及判定阈值（与 whisper.transcribe 的默认值一致）
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def shift_segment(segment: dict, offset: float) -> dict:
+    """
+    将窗口内的片段时间换算为整段音频的绝对时间
+
+    Args:
+        segment: Whisper格式的片段字典
+        offset: 窗口开始时间（秒）
+
+    Returns:
+        时间平移后的新片段字典
+    """
+    shifted = dict(segment)
+    shifted["start"] = segment["start"] + offset
+    shifted["end"] = segment["end"] + offset
+    shifted["words"] = [
+        dict(word, start=word["start"] + offset, end=word["end"] + offset)
+        for word in segment.get("words") or []
+    ]
+    return shifted
+
+
+def quantize_model(model):
+    """
+    对Whisper模型的Linear层做动态INT8量化
+
+    Whisper自定义的Linear子类只是在前向时转换权重精度，CPU上的FP32推理与
+    torch.nn.Linear等价；量化前先还原为torch.nn.Linear，量化工具才能识别。
+
+    Args:
+        model: FP32的Whisper模型（CPU）
+
+    Returns:
+        量化后的模型
+    """
+    import torch
+
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(
+        model,
+        {torch.nn.Linear},
+        dtype=torch.qint8
+    )
+
+
+class PrecomputedEncoderModel:
+    """
+    使用预先计算的编码器输出的Whisper模型代理
+
+    whisper.timing 的单词对齐会以 model(mel, tokens) 的形式运行完整模型，
+    代理把这次调用改为只运行解码器，其余属性都转发给原模型。
+    """
+
+    def __init__(self, model, audio_features):
+        """
+        Args:
+            model: Whisper模型
+            audio_features: 单个窗口的编码器输出 (音频帧数, 特征维度)
+        """
+        self._model = model
+        self._audio_features = audio_features
+
+    def __call__(self, mel, tokens):
+        return self._model.decoder(tokens, self._audio_features.unsqueeze(0))
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+
+class ASRBackend(ABC):
+    """语音识别后端基类"""
+
+    name = ""
+    supports_word_timestamps = True  # 是否能输出单词级时间戳
+
+    def __init__(self,
+                 model_name: str = config.WHISPER_MODEL,
+                 device: Optional[str] = None,
+                 quantize: Optional[bool] = None):
+        """
+        初始化后端
+
+        Args:
+            model_name: 模型名称 (tiny/base/small/medium/large)
+            device: 运行设备 (cpu/cuda)，None则自动检测
+            quantize: 是否使用INT8推理，None则使用配置
+        """
+        self.model_name = model_name
+        self.device = device or "cpu"
+        self.quantize = config.WHISPER_QUANTIZE if quantize is None else quantize
+        self.model = None
+
+    @property
+    def loaded(self) -> bool:
+        """模型是否已加载"""
+        return self.model is not None
+
+    @abstractmethod
+    def load(self) -> None:
+        """加载模型"""
+
+    @abstractmethod
+    def transcribe(self, audio: AudioInput, language: str = "en", **options) -> list[dict]:
+        """
+        转录音频
+
+        Args:
+            audio: 音频文件路径或16kHz float32数组
+            language: 音频语言代码
+            **options: 传递给推理引擎的解码参数
+
+        Returns:
+            Whisper格式的片段字典列表
+        """
+
+    def stream(self, audio: AudioInput, language: str = "en", **options) -> Iterator[dict]:
+        """
+        流式转录音频，每识别出一个片段就立即返回
+
+        默认实现等待整体转录完成后依次返回，支持增量输出的后端应重写此方法。
+
+        Args:
+            audio: 音频文件路径或16kHz float32数组
+            language: 音频语言代码
+            **options: 传递给推理引擎的解码参数
+
+        Yields:
+            Whisper格式的片段字典
+        """
+        yield from self.transcribe(audio, language, **options)
+
+    def decode_windows(self,
+                       audio: np.ndarray,
+                       windows: list[tuple[int, int]],
+                       language: str = "en",
+                       batch_size: int = 1,
+                       word_timestamps: bool = True,
+                       standalone: bool = False) -> list[list[dict]]:
+        """
+        解码预先切分好的音频窗口
+
+        默认实现逐个窗口调用transcribe，支持批量推理的后端应重写此方法。
+
+        Args:
+            audio: 16kHz float32音频数组
+            windows: (开始采样点, 结束采样点) 列表，每个窗口不超过30秒
+            language: 音频语言代码
+            batch_size: 每批的窗口数
+            word_timestamps: 是否输出单词级时间戳
+            standalone: 各窗口是否来自互不相关的音频（推理服务拼接的多个任务），
+                        为True时每个窗口单独处理，结果与单独解码该窗口一致
+
+        Returns:
+            每个窗口的片段字典列表（时间为相对整段音频的绝对时间）
+        """
+        results = []
+        for start, end in windows:
+            segments = self.transcribe(audio[start:end], language, word_timestamps=word_timestamps)
+            results.append([shift_segment(segment, start / SAMPLE_RATE) for segment in segments])
+        return results
+
+
+class WhisperBackend(ASRBackend):
+    """openai-whisper 后端"""
+
+    name = "whisper"
+
+    def __init__(self,
+                 model_name: str = config.WHISPER_MODEL,
+                 device: Optional[str] = None,
+                 quantize: Optional[bool] = None):
+        super().__init__(model_name, device, quantize)
+        self.device = self._get_device(device)
+
+    def _get_device(self, device: Optional[str]) -> str:
+        """检测可用的设备"""
+        if device is not None:
+            return device
+
+        import torch
+        if torch.cuda.is_available():
+            return "cuda"
+        return "cpu"
+
+    def load(self) -> None:
+        """加载Whisper模型"""
+        if self.model is not None:
+            return
+
+        # 量化只对CPU推理有意义
+        if self.quantize and self.device == "cpu":
+            self.model = self._load_quantized_model()
+        else:
+            self.model = self._load_fp32_model()
+
+    def _load_fp32_model(self):
+        """加载原始精度的Whisper模型"""
+        import whisper
+
+        # 优先从项目目录加载模型，如果不存在则从默认位置加载
+        model_path = self._get_model_path()
+        if model_path and os.path.exists(model_path):
+            # 从项目目录加载
+            return whisper.load_model(model_path, device=self.device)
+
+        # 从默认位置加载（打包后可能在资源目录中）
+        try:
+            return whisper.load_model(self.model_name, device=self.device)
+        except Exception:
+            # 尝试从打包后的资源目录加载
+            import sys
+            if getattr(sys, 'frozen', False):
+                # 打包后的环境
+                bundle_dir = sys._MEIPASS
+                model_path = os.path.join(bundle_dir, 'models', 'whisper', f'{self.model_name}.pt')
+                if os.path.exists(model_path):
+                    return whisper.load_model(model_path, device=self.device)
+                raise FileNotFoundError(f"找不到Whisper模型文件: {model_path}")
+            raise
+
+    def _load_quantized_model(self):
+        """加载INT8量化模型，优先使用磁盘上的量化缓存"""
+        import torch
+
+        cache_path = config.BASE_DIR / 'models' / 'whisper' / f'{self.model_name}.int8.pt'
+
+        if cache_path.exists():
+            try:
+                return torch.load(cache_path, map_location="cpu", weights_only=False)
+            except Exception:
+                # 缓存损坏或PyTorch版本不兼容，重新量化
+                pass
+
+        model = quantize_model(self._load_fp32_model())
+
+        # 保存量化后的模型，下次直接加载（与原始模型放在同一目录）
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            torch.save(model, cache_path)
+        except OSError:
+            pass
+
+        return model
+
+    def _get_model_path(self) -> str:
+        """获取模型文件路径"""
+        # 检查项目目录中的模型
+        base_dir = config.BASE_DIR
+        model_path = base_dir / 'models' / 'whisper' / f'{self.model_name}.pt'
+
+        if model_path.exists():
+            return str(model_path)
+
+        return None
+
+    def transcribe(self, audio: AudioInput, language: str = "en", **options) -> list[dict]:
+        """使用Whisper转录音频"""
+        self.load()
+
+        options.setdefault("word_timestamps", True)
+
+        if not config.DECODING_GUARD:
+            result = self.model.transcribe(audio, language=language, verbose=False, **options)
+            return result["segments"]
+
+        # whisper.transcribe 内部逐窗口调用 model.decode，临时替换为带失控保护的解码
+        events = []
+        uninstall = install_guard(self.model, events)
+        try:
+            result = self.model.transcribe(audio, language=language, verbose=False, **options)
+        finally:
+            uninstall()
+
+        mark_runaway_segments(result["segments"], events)
+        return result["segments"]
+
+    def decode_windows(self,
+                       audio: np.ndarray,
+                       windows: list[tuple[int, int]],
+                       language: str = "en",
+                       batch_size: int = config.WHISPER_BATCH_SIZE,
+                       word_timestamps: bool = True,
+                       standalone: bool = False) -> list[list[dict]]:
+        """
+        批量解码音频窗口：整段音频只计算一次梅尔频谱，每批窗口一起送入编码器和解码器
+
+        standalone为True时窗口来自不同的音频，梅尔频谱按窗口分别计算：Whisper按整段梅尔频谱的
+        最大值归一化，拼接计算会让一个窗口的结果受同批其他音频响度的影响。
+
+        开启编码器缓存时，各窗口的梅尔频谱和编码器输出会保存到磁盘，
+        更换解码参数重新识别时直接读取，跳过编码器。缓存以float16保存，首次识别也使用
+        舍入到float16的结果，保证命中缓存与否识别结果一致。推理服务拼接的音频只会出现一次，不使用缓存。
+        """
+        import torch
+        import whisper
+        from whisper.audio import HOP_LENGTH, N_FRAMES, N_SAMPLES
+        from whisper.timing import add_word_timestamps
+        from whisper.tokenizer import get_tokenizer
+
+        self.load()
+
+        tokenizer = get_tokenizer(
+            self.model.is_multilingual,
+            num_languages=self.model.num_languages,
+            language=language,
+            task="transcribe"
+        )
+
+        cache = None
+        if config.ENCODER_CACHE and not standalone:
+            cache = EncoderCache(audio, self._model_key(), self.model.dims.n_mels)
+
+        full_mel = None
+
+        def window_mel(start: int, end: int):
+            """获取窗口的梅尔频谱（优先读取缓存，未命中时才计算整段音频的梅尔频谱）"""
+            nonlocal full_mel
+
+            if cache is not None:
+                cached = cache.load_mel(start, end)
+                if cached is not None:
+                    return torch.from_numpy(np.asarray(cached, dtype=np.float32))
+
+            if standalone:
+                # 与单独转录该窗口时一样，只用窗口自己的音频计算梅尔频谱
+                mel = whisper.log_mel_spectrogram(
+                    torch.from_numpy(audio[start:end]),
+                    self.model.dims.n_mels,
+                    padding=N_SAMPLES
+                )
+                return whisper.pad_or_trim(mel[:, :(end - start) // HOP_LENGTH], N_FRAMES)
+
+            if full_mel is None:
+                # 与 whisper.transcribe 一样对整段音频计算梅尔频谱，保证归一化方式一致
+                full_mel = whisper.log_mel_spectrogram(
+                    torch.from_numpy(audio),
+                    self.model.dims.n_mels,
+                    padding=N_SAMPLES
+                )
+
+            start_frame = start // HOP_LENGTH
+            num_frames = (end - start) // HOP_LENGTH
+            mel_segment = whisper.pad_or_trim(full_mel[:, start_frame:start_frame + num_frames], N_FRAMES)
+
+            if cache is not None:
+                cache.save_mel(start, end, mel_segment.numpy())
+                # 与从缓存读取时的精度一致
+                mel_segment = mel_segment.half().float()
+            return mel_segment
+
+        batch_size = self._bounded_batch_size(batch_size)
+        results = []
+
+        for i in range(0, len(windows), batch_size):
+            batch = windows[i:i + batch_size]
+
+            # 编码器输出：命中缓存的窗口直接读取，其余窗口一起编码
+            features = [None] * len(batch)
+            if cache is not None:
+                for j, (start, end) in enumerate(batch):
+                    cached = cache.load_features(start, end)
+                    if cached is not None:
+                        features[j] = torch.from_numpy(np.asarray(cached, dtype=np.float32))
+
+            missing = [j for j, feature in enumerate(features) if feature is None]
+            if missing:
+                mel_batch = torch.stack([window_mel(*batch[j]) for j in missing]).to(self.model.device)
+                with torch.no_grad():
+                    encoded = self.model.embed_audio(mel_batch).float().cpu()
+
+                for j, feature in zip(missing, encoded):
+                    if cache is not None:
+                        cache.save_features(*batch[j], feature.numpy())
+                        # 与从缓存读取时的精度一致
+                        feature = feature.half().float()
+                    features[j] = feature
+
+            audio_features = torch.stack(features).to(self.model.device)
+            if self.device != "cpu":
+                audio_features = audio_features.half()
+
+            decoded, reasons = self._decode_with_fallback(audio_features, language)
+
+            for (start, end), feature, result, reason in zip(batch, audio_features, decoded, reasons):
+                segments = self._result_to_segments(result, tokenizer, start, end)
+                if reason is not None and segments:
+                    segments[-1]["runaway"] = reason
+
+                if word_timestamps and segments:
+                    # 对齐时复用编码器输出，不再重复计算编码器
+                    add_word_timestamps(
+                        segments=segments,
+                        model=PrecomputedEncoderModel(self.model, feature),
+                        tokenizer=tokenizer,
+                        mel=feature,
+                        num_frames=(end - start) // HOP_LENGTH,
+                        last_speech_timestamp=start / SAMPLE_RATE
+                    )
+
+                results.append(segments)
+
+        if cache is not None:
+            EncoderCache.prune(config.ENCODER_CACHE_MAX_MB * 1024 * 1024, keep=cache.directory)
+
+        return results
+
+    def _model_key(self) -> str:
+        """模型标识（编码器缓存按模型和精度区分）"""
+        if self.quantize and self.device == "cpu":
+            return f"{self.model_name}-int8"
+        return self.model_name
+
+    def _bounded_batch_size(self, batch_size: int) -> int:
+        """
+        根据内存上限限制批次大小
+
+        编码器的内存开销主要来自自注意力矩阵（头数 x 帧数 x 帧数）和各层激活值。
+        """
+        dims = self.model.dims
+        n_ctx = dims.n_audio_ctx
+        bytes_per_window = (dims.n_audio_head * n_ctx * n_ctx + 8 * n_ctx * dims.n_audio_state) * 4
+        limit = config.WHISPER_BATCH_MEMORY_MB * 1024 * 1024 // bytes_per_window
+        return max(1, min(batch_size, limit))
+
+    def _decode_with_fallback(self, audio_features, language: str) -> tuple[list, list[Optional[str]]]:
+        """
+        批量解码，输出质量不合格的窗口按温度序列重新解码
+
+        传入的是编码器输出，温度回退时不会重复运行编码器。
+        开启失控保护时，陷入循环的窗口在解码中途就被截断，并且不再回退重试。
+
+        Args:
+            audio_features: (批次, 音频帧数, 特征维度) 的编码器输出
+            language: 音频语言代码
+
+        Returns:
+            (每个窗口的 DecodingResult, 每个窗口的失控原因，正常窗口为None)
+        """
+        import whisper
+
+        results = [None] * len(audio_features)
+        reasons: list[Optional[str]] = [None] * len(audio_features)
+        pending = list(range(len(audio_features)))
+
+        for temperature in FALLBACK_TEMPERATURES:
+            options = whisper.DecodingOptions(
+                task="transcribe",
+                language=language,
+                temperature=temperature,
+                best_of=5 if temperature > 0 else None,
+                fp16=self.device != "cpu"
+            )
+            if config.DECODING_GUARD:
+                decoded, tripped = guarded_decode(self.model, audio_features[pending], options)
+            else:
+                decoded, tripped = whisper.decode(self.model, audio_features[pending], options), [None] * len(pending)
+
+            retry = []
+            for index, result, reason in zip(pending, decoded, tripped):
+                results[index] = result
+                reasons[index] = reason
+                # 失控的窗口提高温度通常也无法恢复，直接使用截断后的结果
+                if reason is None and self._needs_fallback(result):
+                    retry.append(index)
+
+            pending = retry
+            if not pending:
+                break
+
+        return results, reasons
+
+    def _needs_fallback(self, result) -> bool:
+        """判断解码结果是否需要以更高温度重试"""
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD:
+            # 很可能是静音窗口，无需重试
+            return False
+        return (result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                or result.avg_logprob < LOGPROB_THRESHOLD)
+
+    def _result_to_segments(self, result, tokenizer, start: int, end: int) -> list[dict]:
+        """
+        按时间戳标记把一个窗口的解码结果拆分为片段（与 whisper.transcribe 的拆分规则一致）
+
+        Args:
+            result: 窗口的 DecodingResult
+            tokenizer: Whisper分词器
+            start: 窗口开始采样点
+            end: 窗口结束采样点
+
+        Returns:
+            Whisper格式的片段字典列表
+        """
+        from whisper.audio import HOP_LENGTH
+
+        # 静音窗口不输出片段
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob <= LOGPROB_THRESHOLD:
+            return []
+
+        time_offset = start / SAMPLE_RATE
+        time_precision = 0.02  # 每个时间戳标记对应20毫秒
+        tokens = list(result.tokens)
+        timestamp_begin = tokenizer.timestamp_begin
+        is_timestamp = [token >= timestamp_begin for token in tokens]
+
+        def make_segment(segment_tokens: list[int], segment_start: float, segment_end: float) -> dict:
+            text_tokens = [token for token in segment_tokens if token < tokenizer.eot]
+            return {
+                "seek": start // HOP_LENGTH,
+                "start": time_offset + segment_start,
+                "end": time_offset + segment_end,
+                "text": tokenizer.decode(text_tokens),
+                "tokens": segment_tokens,
+                "temperature": result.temperature,
+                "avg_logprob": result.avg_logprob,
+                "compression_ratio": result.compression_ratio,
+                "no_speech_prob": result.no_speech_prob,
+            }
+
+        # 两个连续的时间戳标记是片段的分界
+        slices = [i + 1 for i in range(len(tokens) - 1) if is_timestamp[i] and is_timestamp[i + 1]]
+        window_duration = (end - start) / SAMPLE_RATE
+
+        if not slices:
+            duration = window_duration
+            timestamps = [token for token, flag in zip(tokens, is_timestamp) if flag]
+            if timestamps and timestamps[-1] != timestamp_begin:
+                duration = (timestamps[-1] - timestamp_begin) * time_precision
+            return [make_segment(tokens, 0.0, duration)]
+
+        # 窗口是固定切分的，不能像逐窗口转录那样回退重解码，末尾不完整的片段一直延续到窗口结束
+        if slices[-1] != len(tokens):
+            slices.append(len(tokens))
+
+        segments = []
+        last_slice = 0
+        for current_slice in slices:
+            segment_tokens = tokens[last_slice:current_slice]
+            last_slice = current_slice
+            if not any(token < tokenizer.eot for token in segment_tokens):
+                continue
+
+            segment_start = 0.0
+            if segment_tokens[0] >= timestamp_begin:
+                segment_start = (segment_tokens[0] - timestamp_begin) * time_precision
+
+            if segment_tokens[-1] >= timestamp_begin:
+                segment_end = (segment_tokens[-1] - timestamp_begin) * time_precision
+            else:
+                segment_end = window_duration
+            segments.append(make_segment(segment_tokens, segment_start, segment_end))
+
+        return segments
+
+
+class CTranslate2Backend(ASRBackend):
+    """
+    CTranslate2 后端（基于 faster-whisper）
+
+    加载转换后的本地模型（models/whisper-ct2/<模型名>/），在优化的CPU推理引擎上
+    以INT8精度运行。模型转换命令示例：
+        ct2-transformers-converter --model openai/whisper-base \\
+            --output_dir models/whisper-ct2/base --quantization int8
+    """
+
+    name = "ctranslate2"
+
+    def load(self) -> None:
+        """加载CTranslate2模型"""
+        if self.model is not None:
+            return
+
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError(
+                "未安装faster-whisper，无法使用CTranslate2后端。\n"
+                "请运行: pip install faster-whisper"
+            )
+
+        model_path = config.CT2_MODEL_DIR / self.model_name
+        if not model_path.exists():
+            raise FileNotFoundError(f"找不到转换后的CTranslate2模型: {model_path}")
+
+        self.model = WhisperModel(
+            str(model_path),
+            device=self.device,
+            compute_type=config.CT2_COMPUTE_TYPE,
+            cpu_threads=config.CT2_CPU_THREADS
+        )
+
+    def transcribe(self, audio: AudioInput, language: str = "en", **options) -> list[dict]:
+        """使用CTranslate2转录音频"""
+        return list(self.stream(audio, language, **options))
+
+    def stream(self, audio: AudioInput, language: str = "en", **options) -> Iterator[dict]:
+        """faster-whisper按片段惰性解码，可以真正地流式输出"""
+        self.load()
+
+        options.setdefault("word_timestamps", True)
+        segments, _ = self.model.transcribe(audio, language=language, **options)
+
+        for segment in segments:
+            yield {
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "words": [
+                    {"start": word.start, "end": word.end, "word": word.word}
+                    for word in (segment.words or [])
+                ],
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob,
+                "compression_ratio": segment.compression_ratio,
+            }
+
+
+class StubBackend(ASRBackend):
+    """
+    确定性的测试后端
+
+    不加载任何模型，把音频中的每段非静音区域作为片段（超过segment_duration的再按时长切分），
+    文本由该段音频的峰值音量生成。结果只取决于音频内容，整段转录和按窗口转录
+    （切分点位于静音处时）得到相同的片段；也可以直接注入预设的片段字典。
+    """
+
+    name = "stub"
+
+    # 低于该幅度的采样点视为静音
+    SILENCE_THRESHOLD = 0.001
+
+    # 短于该时长的静音不分隔片段（秒）
+    MIN_SILENCE_SECONDS = 0.3
+
+    def __init__(self,
+                 model_name: str = "stub",
+                 device: Optional[str] = None,
+                 quantize: Optional[bool] = None,
+                 segments: Optional[list[dict]] = None,
+                 segment_duration: float = 5.0):
+        """
+        初始化测试后端
+
+        Args:
+            model_name: 模型名称（仅用于标识）
+            device: 忽略
+            quantize: 忽略
+            segments: 预设的片段字典列表，None则按音频内容生成
+            segment_duration: 生成片段的最大时长（秒）
+        """
+        super().__init__(model_name, device, quantize)
+        self.segments = segments
+        self.segment_duration = segment_duration
+
+    def load(self) -> None:
+        """无需加载模型"""
+        self.model = self
+
+    def transcribe(self, audio: AudioInput, language: str = "en", **options) -> list[dict]:
+        """生成确定性的片段"""
+        self.load()
+
+        if self.segments is not None:
+            return [dict(segment) for segment in self.segments]
+
+        if isinstance(audio, str):
+            audio = load_audio(audio)
+
+        segments = []
+        for run_start, run_end in self._voiced_runs(audio):
+            start = run_start / SAMPLE_RATE
+            run_end_time = run_end / SAMPLE_RATE
+            while start < run_end_time:
+                end = min(start + self.segment_duration, run_end_time)
+                chunk = audio[int(round(start * SAMPLE_RATE)):int(round(end * SAMPLE_RATE))]
+                level = int(round(float(np.abs(chunk).max()) * 100)) if len(chunk) else 0
+                words = [f"tone{level}", "word1", "word2"]
+                step = (end - start) / len(words)
+                segments.append({
+                    "start": start,
+                    "end": end,
+                    "text": " " + " ".join(words),
+                    "words": [
+                        {"start": start + i * step, "end": start + (i + 1) * step, "word": " " + word}
+                        for i, word in enumerate(words)
+                    ],
+                    "avg_logprob": -0.1,
+                    "no_speech_prob": 0.0,
+                    "compression_ratio": 1.0,
+                })
+                start = end
+
+        return segments
+
+    def _voiced_runs(self, audio: np.ndarray) -> list[tuple[int, int]]:
+        """
+        非静音区域（按采样点计算，不受窗口起点影响）
+
+        Args:
+            audio: 16kHz float32音频数组
+
+        Returns:
+            (开始采样点, 结束采样点) 列表
+        """
+        voiced = np.flatnonzero(np.abs(audio) > self.SILENCE_THRESHOLD)
+        if len(voiced) == 0:
+            return []
+
+        gaps = np.flatnonzero(np.diff(voiced) > self.MIN_SILENCE_SECONDS * SAMPLE_RATE)
+        starts = np.concatenate(([voiced[0]], voiced[gaps + 1]))
+        ends = np.concatenate((voiced[gaps] + 1, [voiced[-1] + 1]))
+        return list(zip(starts.tolist(), ends.tolist()))
+
+
+# 可用的后端
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    CTranslate2Backend.name: CTranslate2Backend,
+    StubBackend.name: StubBackend,
+}
+
+
+def create_backend(name: str = config.ASR_BACKEND, **kwargs) -> ASRBackend:
+    """
+    根据名称创建语音识别后端
+
+    Args:
+        name: 后端名称 (whisper/ctranslate2/stub)
+        **kwargs: 传递给后端构造函数的参数
+
+    Returns:
+        后端实例
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"不支持的语音识别后端: {name}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,324 @@
+"""
+解码失控保护模块 - 检测Whisper解码器的重复循环和压缩比异常，提前截断窗口
+
+音乐或静音片段上，解码器容易反复输出同一句话，直到用完整个窗口的标记长度，
+随后还会触发整条温度回退序列。保护分两层：
+    1. 解码时：RunawayFilter 作为logit过滤器逐步检查已生成的标记，
+       一旦出现循环或压缩比暴涨就强制输出结束标记，截断当前窗口；
+    2. 转录后：RunawayGuard 记录诊断信息，并丢弃连续重复的片段，避免再被翻译。
+"""
+
+import zlib
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import config
+
+# 循环检测：末尾至少重复 REPETITION_MIN_REPEATS 次、覆盖 REPETITION_MIN_TOKENS 个文本标记
+REPETITION_MAX_PERIOD = 32
+REPETITION_MIN_REPEATS = 4
+REPETITION_MIN_TOKENS = 12
+
+# 压缩比检测：解码过程中每隔若干标记检查一次已生成文本的压缩比
+# （阈值高于温度回退的2.4，未完成的文本只在明显失控时截断）
+COMPRESSION_CHECK_INTERVAL = 16
+COMPRESSION_MIN_TOKENS = 48
+RUNAWAY_COMPRESSION_RATIO = 3.0
+
+# 连续相同文本的片段达到该数量时，只保留第一个
+SEGMENT_REPEAT_LIMIT = 3
+
+
+@dataclass
+class RunawayEvent:
+    """解码失控诊断信息"""
+    start: float  # 开始时间（秒）
+    end: float  # 结束时间（秒）
+    reason: str  # repetition: 重复循环 / compression: 压缩比过高 / repeated_segments: 重复片段
+    text: str  # 保留的文本
+    dropped: int = 0  # 丢弃的片段数
+
+
+def compression_ratio(text: str) -> float:
+    """
+    计算文本的gzip压缩比（与Whisper的计算方式一致）
+
+    Args:
+        text: 文本
+
+    Returns:
+        压缩比，重复越多越大
+    """
+    text_bytes = text.encode("utf-8")
+    if not text_bytes:
+        return 0.0
+    return len(text_bytes) / len(zlib.compress(text_bytes))
+
+
+def find_repetition(tokens: list[int]) -> Optional[int]:
+    """
+    检查标记序列末尾是否陷入循环
+
+    Args:
+        tokens: 文本标记序列（不含时间戳标记）
+
+    Returns:
+        只保留一次循环内容时的截断位置，没有循环时返回None
+    """
+    n = len(tokens)
+    for period in range(1, REPETITION_MAX_PERIOD + 1):
+        span = max(period * REPETITION_MIN_REPEATS, REPETITION_MIN_TOKENS)
+        if span > n:
+            break
+        if any(tokens[i] != tokens[i - period] for i in range(n - span + period, n)):
+            continue
+
+        # 向前找到循环开始的位置
+        loop_start = n - span
+        while loop_start > 0 and tokens[loop_start - 1] == tokens[loop_start - 1 + period]:
+            loop_start -= 1
+        return loop_start + period
+
+    return None
+
+
+class RunawayFilter:
+    """
+    解码失控过滤器（接口与 whisper.decoding.LogitFilter 一致）
+
+    每个解码步骤检查各条候选序列，检测到失控的序列只允许输出结束标记。
+    """
+
+    def __init__(self, tokenizer, sample_begin: int):
+        """
+        Args:
+            tokenizer: Whisper分词器
+            sample_begin: 生成内容在标记序列中的起始位置（前面是提示词和起始标记）
+        """
+        self.tokenizer = tokenizer
+        self.sample_begin = sample_begin
+        self.tripped: dict[int, str] = {}  # 候选序列行号 -> 失控原因
+
+    def apply(self, logits, tokens) -> None:
+        """
+        Args:
+            logits: (候选序列数, 词表大小) 的下一个标记logits，原地修改
+            tokens: (候选序列数, 已生成长度) 的标记序列
+        """
+        eot = self.tokenizer.eot
+
+        for row in range(tokens.shape[0]):
+            last = tokens[row, -1].item()
+            if last == eot:
+                continue
+
+            reason = self.tripped.get(row)
+            if reason is None and last < eot:
+                # 只在新增文本标记时检查
+                reason = self._check(tokens[row, self.sample_begin:].tolist())
+                if reason is not None:
+                    self.tripped[row] = reason
+
+            if reason is not None:
+                logits[row, :] = -float("inf")
+                logits[row, eot] = 0
+
+    def _check(self, sampled: list[int]) -> Optional[str]:
+        """检查一条候选序列，返回失控原因"""
+        text_tokens = [token for token in sampled if token < self.tokenizer.eot]
+
+        if find_repetition(text_tokens) is not None:
+            return "repetition"
+
+        if len(text_tokens) >= COMPRESSION_MIN_TOKENS and len(text_tokens) % COMPRESSION_CHECK_INTERVAL == 0:
+            if compression_ratio(self.tokenizer.decode(text_tokens)) > RUNAWAY_COMPRESSION_RATIO:
+                return "compression"
+
+        return None
+
+
+def trim_result(result, tokenizer):
+    """
+    截掉解码结果末尾的循环内容（只保留一次），并重新计算文本和压缩比
+
+    Args:
+        result: whisper.DecodingResult
+        tokenizer: Whisper分词器
+
+    Returns:
+        截断后的 DecodingResult，没有循环时原样返回
+    """
+    tokens = list(result.tokens)
+    text_positions = [i for i, token in enumerate(tokens) if token < tokenizer.eot]
+    cut = find_repetition([tokens[i] for i in text_positions])
+    if cut is None:
+        return result
+
+    tokens = tokens[:text_positions[cut]] if cut < len(text_positions) else tokens
+    text = tokenizer.decode([token for token in tokens if token < tokenizer.eot])
+    return replace(result, tokens=tokens, text=text, compression_ratio=compression_ratio(text))
+
+
+def guarded_decode(model, mel, options) -> tuple[list, list[Optional[str]]]:
+    """
+    带失控保护的 whisper.decode
+
+    Args:
+        model: Whisper模型
+        mel: (批次, 梅尔通道数, 帧数) 的梅尔频谱，或 (批次, 音频帧数, 特征维度) 的编码器输出
+        options: whisper.DecodingOptions
+
+    Returns:
+        (DecodingResult列表, 每个窗口的失控原因列表，正常窗口为None)
+    """
+    from whisper.decoding import DecodingTask
+
+    task = DecodingTask(model, options)
+    runaway_filter = RunawayFilter(task.tokenizer, task.sample_begin)
+    task.logit_filters.append(runaway_filter)
+
+    results = task.run(mel)
+
+    # 每个窗口有 n_group 条候选序列（best_of/beam_size），任一条失控都记为该窗口失控
+    reasons: list[Optional[str]] = [None] * len(results)
+    for row, reason in runaway_filter.tripped.items():
+        index = row // task.n_group
+        if reasons[index] is None:
+            reasons[index] = reason
+
+    results = [
+        trim_result(result, task.tokenizer) if reason is not None else result
+        for result, reason in zip(results, reasons)
+    ]
+    return results, reasons
+
+
+def install_guard(model, events: list[dict]):
+    """
+    替换模型实例的decode方法，使 whisper.transcribe 内部的每次解码都带失控保护
+
+    截断后的结果压缩比恢复正常，whisper.transcribe 不会再为该窗口逐级提高温度重试。
+
+    Args:
+        model: Whisper模型
+        events: 失控窗口的截断结果会追加到此列表 ({"reason", "tokens"})
+
+    Returns:
+        恢复原decode方法的函数
+    """
+    def decode(mel, options=None, **kwargs):
+        import whisper
+
+        options = options or whisper.DecodingOptions()
+        if kwargs:
+            options = replace(options, **kwargs)
+
+        single = mel.ndim == 2
+        if single:
+            mel = mel.unsqueeze(0)
+
+        results, reasons = guarded_decode(model, mel, options)
+        for result, reason in zip(results, reasons):
+            if reason is not None:
+                events.append({"reason": reason, "tokens": list(result.tokens)})
+
+        return results[0] if single else results
+
+    model.decode = decode
+
+    def uninstall():
+        del model.decode
+
+    return uninstall
+
+
+def mark_runaway_segments(segments: list[dict], events: list[dict]) -> None:
+    """
+    根据解码时记录的失控事件标记片段（片段标记序列是截断结果的结尾部分）
+
+    Args:
+        segments: whisper.transcribe 输出的片段字典列表，原地添加 "runaway" 字段
+        events: install_guard 记录的失控事件
+    """
+    position = 0
+    for event in events:
+        for i in range(position, len(segments)):
+            segment_tokens = list(segments[i].get("tokens") or [])
+            if segment_tokens and event["tokens"][-len(segment_tokens):] == segment_tokens:
+                segments[i]["runaway"] = event["reason"]
+                position = i + 1
+                break
+
+
+class RunawayGuard:
+    """
+    转录结果的失控保护
+
+    记录解码阶段截断的窗口，并合并连续重复的片段。
+    """
+
+    def __init__(self):
+        self.diagnostics: list[RunawayEvent] = []
+
+    def filter_segments(self, segments: list[dict]) -> list[dict]:
+        """
+        记录诊断信息并丢弃失控产生的重复片段
+
+        Args:
+            segments: Whisper格式的片段字典列表
+
+        Returns:
+            过滤后的片段字典列表
+        """
+        if not config.DECODING_GUARD:
+            return segments
+
+        kept = []
+        run_start = 0  # 当前连续相同文本的第一个片段在kept中的位置
+        run_length = 0
+
+        for segment in segments:
+            text = segment["text"].strip()
+
+            reason = segment.get("runaway")
+            if reason is None and compression_ratio(text) > RUNAWAY_COMPRESSION_RATIO:
+                reason = "compression"
+            if reason is not None:
+                self.diagnostics.append(RunawayEvent(segment["start"], segment["end"], reason, text))
+                if reason == "compression":
+                    # 片段内部已经失控，整体丢弃
+                    self.diagnostics[-1].dropped = 1
+                    continue
+
+            if kept and self._normalize(text) == self._normalize(kept[run_start]["text"]):
+                run_length += 1
+                if run_length >= SEGMENT_REPEAT_LIMIT:
+                    # 达到上限后只保留第一个，之前暂时保留的重复片段一并丢弃
+                    for duplicate in kept[run_start + 1:] + [segment]:
+                        self._record_repeat(kept[run_start], duplicate)
+                    del kept[run_start + 1:]
+                    continue
+            else:
+                run_start = len(kept)
+                run_length = 1
+
+            kept.append(segment)
+
+        return kept
+
+    def _record_repeat(self, first: dict, segment: dict) -> None:
+        """记录一个被丢弃的重复片段（同一段重复合并为一条诊断）"""
+        last = self.diagnostics[-1] if self.diagnostics else None
+        if last is not None and last.reason == "repeated_segments" and last.start == first["start"]:
+            last.end = segment["end"]
+            last.dropped += 1
+            return
+
+        self.diagnostics.append(RunawayEvent(
+            first["start"], segment["end"], "repeated_segments", first["text"].strip(), dropped=1
+        ))
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """比较重复片段时忽略大小写和标点"""
+        return "".join(char for char in text.lower() if char.isalnum())
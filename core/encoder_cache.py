@@ -0,0 +1,135 @@
+"""
+编码器缓存模块 - 按窗口缓存梅尔频谱和Whisper编码器输出
+
+修改语言、温度等解码参数重新识别时，编码器输出不变，可以直接从磁盘读取，
+跳过CPU上开销最大的编码器。缓存以float16格式保存，读取时使用内存映射。
+缓存目录的修改时间记录最近一次使用，总大小超过上限时删除最久未使用的音频的缓存。
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+import config
+from utils.file_utils import atomic_write
+
+
+class EncoderCache:
+    """编码器缓存"""
+
+    def __init__(self, audio: np.ndarray, model_key: str, n_mels: int):
+        """
+        初始化编码器缓存
+
+        Args:
+            audio: 16kHz float32音频数组（按内容哈希定位缓存目录）
+            model_key: 模型标识（模型名称和精度），编码器输出按模型区分
+            n_mels: 梅尔通道数，梅尔频谱只与通道数有关，可在模型之间共享
+        """
+        content_hash = hashlib.md5(np.ascontiguousarray(audio).data).hexdigest()
+        self.directory = Path(config.ENCODER_CACHE_DIR) / content_hash
+        self.model_key = model_key
+        self.n_mels = n_mels
+
+        # 标记为最近使用
+        if self.directory.exists():
+            try:
+                os.utime(self.directory)
+            except OSError:
+                pass
+
+    @staticmethod
+    def prune(max_bytes: int, keep: Optional[Path] = None) -> None:
+        """
+        缓存总大小超过上限时，按最近使用时间从旧到新删除各音频的缓存目录
+
+        Args:
+            max_bytes: 缓存总大小上限（字节）
+            keep: 不删除的目录（当前正在使用的缓存）
+        """
+        entries = []
+        total = 0
+        try:
+            for directory in Path(config.ENCODER_CACHE_DIR).iterdir():
+                if not directory.is_dir():
+                    continue
+                size = sum(f.stat().st_size for f in directory.iterdir() if f.is_file())
+                entries.append((directory.stat().st_mtime, size, directory))
+                total += size
+        except OSError:
+            return
+
+        entries.sort(key=lambda entry: entry[0])
+        for _, size, directory in entries:
+            if total <= max_bytes:
+                break
+            if keep is not None and directory == keep:
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+            total -= size
+
+    def _mel_path(self, start: int, end: int) -> Path:
+        """梅尔频谱缓存路径"""
+        return self.directory / f"mel{self.n_mels}_{start}_{end}.npy"
+
+    def _features_path(self, start: int, end: int) -> Path:
+        """编码器输出缓存路径"""
+        return self.directory / f"{self.model_key}_{start}_{end}.npy"
+
+    def load_mel(self, start: int, end: int) -> Optional[np.ndarray]:
+        """
+        读取窗口的梅尔频谱
+
+        Args:
+            start: 窗口开始采样点
+            end: 窗口结束采样点
+
+        Returns:
+            内存映射的float16数组，不存在时返回None
+        """
+        return self._load(self._mel_path(start, end))
+
+    def save_mel(self, start: int, end: int, mel: np.ndarray) -> None:
+        """保存窗口的梅尔频谱"""
+        self._save(self._mel_path(start, end), mel)
+
+    def load_features(self, start: int, end: int) -> Optional[np.ndarray]:
+        """
+        读取窗口的编码器输出
+
+        Args:
+            start: 窗口开始采样点
+            end: 窗口结束采样点
+
+        Returns:
+            内存映射的float16数组，不存在时返回None
+        """
+        return self._load(self._features_path(start, end))
+
+    def save_features(self, start: int, end: int, features: np.ndarray) -> None:
+        """保存窗口的编码器输出"""
+        self._save(self._features_path(start, end), features)
+
+    def _load(self, path: Path) -> Optional[np.ndarray]:
+        """以内存映射方式读取缓存"""
+        if not path.exists():
+            return None
+        try:
+            return np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            # 缓存文件损坏，当作未命中
+            return None
+
+    def _save(self, path: Path, array: np.ndarray) -> None:
+        """以float16格式写入缓存"""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with atomic_write(str(path), "wb") as f:
+                np.save(f, array.astype(np.float16))
+        except OSError:
+            # 磁盘空间不足等情况下放弃缓存，不影响识别
+            pass
@@ -0,0 +1,226 @@
+"""
+推理服务模块 - 进程内共享一个语音识别模型，跨转录任务动态合批
+"""
+
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+import config
+from core.asr_backends import ASRBackend, create_backend, shift_segment
+from utils.audio_utils import SAMPLE_RATE
+
+
+@dataclass
+class WindowRequest:
+    """窗口推理请求"""
+    audio: np.ndarray  # 窗口音频（不超过30秒）
+    language: str  # 音频语言代码
+    word_timestamps: bool  # 是否输出单词级时间戳
+    future: Future  # 返回结果（窗口内的片段字典列表，时间相对窗口开始）
+
+
+class InferenceServer:
+    """
+    推理服务
+
+    持有唯一的已加载模型，多个转录任务通过队列提交窗口级请求。
+    工作线程取到第一个请求后，在截止时间内继续收集请求，合成一批后统一推理，
+    再把结果分发给各自的调用方。
+    """
+
+    _instances: dict[tuple, "InferenceServer"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self,
+                 backend: ASRBackend,
+                 max_batch_size: int = config.WHISPER_BATCH_SIZE,
+                 deadline_ms: int = config.INFERENCE_BATCH_DEADLINE_MS):
+        """
+        初始化推理服务
+
+        Args:
+            backend: 语音识别后端
+            max_batch_size: 每批的最大窗口数
+            deadline_ms: 凑批等待的最长时间（毫秒）
+        """
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.deadline = deadline_ms / 1000.0
+
+        self._queue: queue.Queue[WindowRequest] = queue.Queue()
+        self._lock = threading.Lock()  # 保证同一时刻只有一个线程使用模型
+        self._thread_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def get_instance(cls,
+                     backend_name: str = config.ASR_BACKEND,
+                     model_name: str = config.WHISPER_MODEL,
+                     device: Optional[str] = None,
+                     quantize: Optional[bool] = None) -> "InferenceServer":
+        """
+        获取共享的推理服务（相同后端和模型只创建一个实例）
+
+        Args:
+            backend_name: 后端名称
+            model_name: 模型名称
+            device: 运行设备
+            quantize: 是否使用INT8量化
+
+        Returns:
+            推理服务实例
+        """
+        key = (backend_name, model_name, device, quantize)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                backend = create_backend(backend_name, model_name=model_name, device=device, quantize=quantize)
+                cls._instances[key] = cls(backend)
+            return cls._instances[key]
+
+    def load(self) -> None:
+        """加载模型（多个任务同时调用时只加载一次）"""
+        with self._lock:
+            self.backend.load()
+
+    def submit(self, audio: np.ndarray, language: str = "en", word_timestamps: bool = True) -> Future:
+        """
+        提交一个窗口推理请求
+
+        Args:
+            audio: 窗口音频（16kHz float32，不超过30秒）
+            language: 音频语言代码
+            word_timestamps: 是否输出单词级时间戳
+
+        Returns:
+            Future对象，结果为窗口内的片段字典列表（时间相对窗口开始）
+        """
+        self._ensure_worker()
+
+        future = Future()
+        self._queue.put(WindowRequest(audio, language, word_timestamps, future))
+        return future
+
+    def decode_windows(self,
+                       audio: np.ndarray,
+                       windows: list[tuple[int, int]],
+                       language: str = "en",
+                       word_timestamps: bool = True) -> list[list[dict]]:
+        """
+        提交整段音频的所有窗口并等待结果（与 ASRBackend.decode_windows 的返回格式一致）
+
+        Args:
+            audio: 16kHz float32音频数组
+            windows: (开始采样点, 结束采样点) 列表
+            language: 音频语言代码
+            word_timestamps: 是否输出单词级时间戳
+
+        Returns:
+            每个窗口的片段字典列表（时间为相对整段音频的绝对时间）
+        """
+        futures = [self.submit(audio[start:end], language, word_timestamps) for start, end in windows]
+
+        results = []
+        for (start, _), future in zip(windows, futures):
+            offset = start / SAMPLE_RATE
+            results.append([shift_segment(segment, offset) for segment in future.result()])
+        return results
+
+    def transcribe(self, audio, language: str = "en", **options) -> list[dict]:
+        """
+        直接转录整段音频（不合批，独占模型）
+
+        Args:
+            audio: 音频文件路径或16kHz float32数组
+            language: 音频语言代码
+            **options: 解码参数
+
+        Returns:
+            Whisper格式的片段字典列表
+        """
+        with self._lock:
+            return self.backend.transcribe(audio, language, **options)
+
+    def _ensure_worker(self) -> None:
+        """启动工作线程"""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="InferenceServer", daemon=True)
+                self._thread.start()
+
+    def _collect_batch(self) -> list[WindowRequest]:
+        """取出一批请求：阻塞等待第一个请求，之后在截止时间内尽量凑满一批"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.deadline
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        """工作线程主循环"""
+        while True:
+            batch = self._collect_batch()
+
+            # 解码参数相同的请求才能合成一批
+            groups = defaultdict(list)
+            for request in batch:
+                groups[(request.language, request.word_timestamps)].append(request)
+
+            for (language, word_timestamps), requests in groups.items():
+                self._process_group(requests, language, word_timestamps)
+
+    def _process_group(self, requests: list[WindowRequest], language: str, word_timestamps: bool) -> None:
+        """
+        推理一组请求并分发结果
+
+        Args:
+            requests: 解码参数相同的请求
+            language: 音频语言代码
+            word_timestamps: 是否输出单词级时间戳
+        """
+        try:
+            # 把各任务的窗口拼接为一段音频，复用后端的批量解码（各窗口单独计算梅尔频谱）
+            windows = []
+            position = 0
+            for request in requests:
+                windows.append((position, position + len(request.audio)))
+                position += len(request.audio)
+            audio = np.concatenate([request.audio for request in requests])
+
+            with self._lock:
+                results = self.backend.decode_windows(
+                    audio,
+                    windows,
+                    language=language,
+                    batch_size=len(requests),
+                    word_timestamps=word_timestamps,
+                    standalone=True
+                )
+
+            outputs = [
+                [shift_segment(segment, -start / SAMPLE_RATE) for segment in segments]
+                for (start, _), segments in zip(windows, results)
+            ]
+        except Exception as e:
+            # 任何异常都要通知所有等待的调用方，否则它们会一直阻塞
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        for request, output in zip(requests, outputs):
+            request.future.set_result(output)
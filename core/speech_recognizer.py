@@ -2,15 +2,20 @@
 语音识别模块 - 使用Whisper进行语音识别
 """
 
-import os
 import time
-from typing import Optional, Callable
+from typing import Optional, Callable, Union
 
-import whisper
-import torch
+import numpy as np
 
 import config
+from core.asr_backends import ASRBackend, create_backend, shift_segment
+from core.decoding_guard import RunawayEvent, RunawayGuard
+from core.inference_server import InferenceServer
+from core.transcription_checkpoint import TranscriptionCheckpoint
 from models.subtitle import SubtitleList, SubtitleSegment
+from models.word_timing import WordTimings
+from utils.audio_utils import get_audio_duration, load_audio, split_audio_windows
+from utils.time_utils import seconds_to_time_string
 
 
 class SpeechRecognizer:
@@ -19,7 +24,12 @@ class SpeechRecognizer:
     def __init__(self,
                  model_name: str = config.WHISPER_MODEL,
                  device: Optional[str] = None,
-                 progress_callback: Optional[Callable[[str], None]] = None):
+                 progress_callback: Optional[Callable[[str], None]] = None,
+                 quantize: Optional[bool] = None,
+                 backend: Optional[Union[str, ASRBackend]] = None,
+                 batched: Optional[bool] = None,
+                 batch_size: int = config.WHISPER_BATCH_SIZE,
+                 server: Optional[InferenceServer] = None):
         """
         初始化语音识别器
 
@@ -27,64 +37,47 @@ class SpeechRecognizer:
             model_name: Whisper模型名称 (tiny/base/small/medium/large)
             device: 运行设备 (cpu/cuda)，None则自动检测
             progress_callback: 进度回调函数
+            quantize: 是否使用动态INT8量化（仅CPU有效），None则使用配置
+            backend: 语音识别后端实例或名称 (whisper/ctranslate2/stub)，None则使用配置
+            batched: 是否把音频预切分为30秒窗口后批量推理，None则使用配置
+            batch_size: 批量推理时每批的窗口数（实际值还受内存上限约束）
+            server: 共享的推理服务，指定后使用服务持有的模型并以窗口为单位提交请求
         """
-        self.model_name = model_name
-        self.device = self._get_device(device)
-        self.progress_callback = progress_callback
-        self.model = None
-
-    def _get_device(self, device: Optional[str]) -> str:
-        """检测可用的设备"""
-        if device is not None:
-            return device
+        if server is not None:
+            backend = server.backend
+            batched = True
+
+        if not isinstance(backend, ASRBackend):
+            backend = create_backend(
+                backend or config.ASR_BACKEND,
+                model_name=model_name,
+                device=device,
+                quantize=quantize
+            )
 
-        if torch.cuda.is_available():
-            return "cuda"
-        return "cpu"
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.device = backend.device
+        self.progress_callback = progress_callback
+        self.batched = config.WHISPER_BATCHED if batched is None else batched
+        self.batch_size = batch_size
+        self.server = server
+        self.diagnostics: list[RunawayEvent] = []  # 最近一次转录的解码失控诊断信息
 
     def _load_model(self) -> None:
-        """加载Whisper模型"""
-        if self.model is None:
+        """加载语音识别模型"""
+        if not self.backend.loaded:
             if self.progress_callback:
-                self.progress_callback(f"正在加载Whisper模型 ({self.model_name})...")
+                self.progress_callback(f"正在加载语音识别模型 ({self.backend.name}: {self.model_name})...")
 
-            # 优先从项目目录加载模型，如果不存在则从默认位置加载
-            model_path = self._get_model_path()
-            if model_path and os.path.exists(model_path):
-                # 从项目目录加载
-                self.model = whisper.load_model(model_path, device=self.device)
+            if self.server is not None:
+                self.server.load()
             else:
-                # 从默认位置加载（打包后可能在资源目录中）
-                try:
-                    self.model = whisper.load_model(self.model_name, device=self.device)
-                except Exception:
-                    # 尝试从打包后的资源目录加载
-                    import sys
-                    if getattr(sys, 'frozen', False):
-                        # 打包后的环境
-                        bundle_dir = sys._MEIPASS
-                        model_path = os.path.join(bundle_dir, 'models', 'whisper', f'{self.model_name}.pt')
-                        if os.path.exists(model_path):
-                            self.model = whisper.load_model(model_path, device=self.device)
-                        else:
-                            raise FileNotFoundError(f"找不到Whisper模型文件: {model_path}")
-                    else:
-                        raise
+                self.backend.load()
 
             if self.progress_callback:
                 self.progress_callback("模型加载完成")
 
-    def _get_model_path(self) -> str:
-        """获取模型文件路径"""
-        # 检查项目目录中的模型
-        base_dir = config.BASE_DIR
-        model_path = base_dir / 'models' / 'whisper' / f'{self.model_name}.pt'
-
-        if model_path.exists():
-            return str(model_path)
-
-        return None
-
     def transcribe(self,
                    audio_path: str,
                    language: str = "en") -> SubtitleList:
@@ -103,33 +96,22 @@ class SpeechRecognizer:
         if self.progress_callback:
             self.progress_callback("正在进行语音识别...")
 
+        def report(progress: float, message: str):
+            if self.progress_callback:
+                self.progress_callback(message)
+
         start_time = time.time()
 
-        # 使用Whisper进行转录
-        result = self.model.transcribe(
-            audio_path,
-            language=language,
-            word_timestamps=True,
-            verbose=False
-        )
+        # 使用语音识别后端进行转录
+        whisper_segments = self._transcribe_segments(audio_path, language, report)
 
         elapsed_time = time.time() - start_time
 
         if self.progress_callback:
             self.progress_callback(f"语音识别完成 (耗时: {elapsed_time:.1f}秒)")
 
-        # 将Whisper的结果转换为SubtitleList
-        segments = []
-        for i, segment in enumerate(result["segments"]):
-            subtitle_segment = SubtitleSegment(
-                id=i + 1,
-                start=segment["start"],
-                end=segment["end"],
-                text_en=segment["text"].strip()
-            )
-            segments.append(subtitle_segment)
-
-        return SubtitleList(segments=segments, language=language)
+        # 将识别结果转换为SubtitleList
+        return self.build_subtitle_list(whisper_segments, language)
 
     def transcribe_with_progress(self,
                                   audio_path: str,
@@ -151,37 +133,234 @@ class SpeechRecognizer:
         if step_callback:
             step_callback(0, "正在进行语音识别...")
 
+        def report(progress: float, message: str):
+            if step_callback:
+                step_callback(progress, message)
+
         start_time = time.time()
 
-        # 使用Whisper进行转录
-        result = self.model.transcribe(
-            audio_path,
-            language=language,
-            word_timestamps=True,
-            verbose=False
-        )
+        # 使用语音识别后端进行转录
+        whisper_segments = self._transcribe_segments(audio_path, language, report)
 
         elapsed_time = time.time() - start_time
 
         if step_callback:
             step_callback(1.0, f"语音识别完成 (耗时: {elapsed_time:.1f}秒)")
 
-        # 将Whisper的结果转换为SubtitleList
+        # 将识别结果转换为SubtitleList
+        return self.build_subtitle_list(whisper_segments, language, step_callback)
+
+    def transcribe_window(self,
+                          audio_path: str,
+                          start: float,
+                          end: float,
+                          language: str = "en") -> SubtitleList:
+        """
+        转录WAV音频中的一个窗口（渐进式转录按调度顺序逐个窗口调用）
+
+        Args:
+            audio_path: WAV音频文件路径
+            start: 窗口开始时间（秒）
+            end: 窗口结束时间（秒）
+            language: 音频语言代码
+
+        Returns:
+            窗口内的SubtitleList（时间为整段音频的绝对时间，序号从1开始）
+        """
+        self._load_model()
+
+        audio = load_audio(audio_path, start, end)
+        segments = [shift_segment(segment, start) for segment in self._transcribe_audio(audio, language)]
+
+        guard = RunawayGuard()
+        segments = guard.filter_segments(segments)
+        self.diagnostics.extend(guard.diagnostics)
+
+        return self.build_subtitle_list(segments, language)
+
+    def _transcribe_segments(self,
+                             audio_path: str,
+                             language: str,
+                             report: Callable[[float, str], None]) -> list[dict]:
+        """
+        转录音频，缓存的WAV音频按窗口转录并保存断点，最后过滤解码失控产生的片段
+
+        Args:
+            audio_path: 音频文件路径
+            language: 音频语言代码
+            report: 进度回调函数 (progress: float, message: str)
+
+        Returns:
+            Whisper格式的片段字典列表
+        """
+        if not audio_path.lower().endswith(".wav"):
+            segments = (self.server or self.backend).transcribe(
+                audio_path,
+                language=language,
+                word_timestamps=self.backend.supports_word_timestamps
+            )
+        elif not config.TRANSCRIBE_CHECKPOINT:
+            segments = self._transcribe_audio(load_audio(audio_path), language)
+        else:
+            segments = self._transcribe_checkpointed(audio_path, language, report)
+
+        # 丢弃解码失控产生的重复片段，避免后续再被翻译
+        guard = RunawayGuard()
+        segments = guard.filter_segments(segments)
+        self.diagnostics = guard.diagnostics
+
+        if self.diagnostics:
+            dropped = sum(event.dropped for event in self.diagnostics)
+            report(1.0, f"检测到 {len(self.diagnostics)} 处解码失控，已截断并丢弃 {dropped} 个重复片段")
+
+        return segments
+
+    def _transcribe_audio(self,
+                          audio: np.ndarray,
+                          language: str,
+                          initial_prompt: Optional[str] = None) -> list[dict]:
+        """
+        转录音频数组
+
+        批量模式下先把音频切分为30秒窗口，再按批次送入编码器和解码器；
+        各窗口独立解码，不以前一窗口的文本作为提示词。
+
+        Args:
+            audio: 16kHz float32音频数组
+            language: 音频语言代码
+            initial_prompt: 提示词上文（仅逐窗口模式使用）
+
+        Returns:
+            Whisper格式的片段字典列表
+        """
+        if not self.batched:
+            return self.backend.transcribe(
+                audio,
+                language=language,
+                word_timestamps=self.backend.supports_word_timestamps,
+                initial_prompt=initial_prompt
+            )
+
+        windows = split_audio_windows(audio)
+
+        if self.server is not None:
+            # 由推理服务与其他任务的窗口合批
+            window_segments = self.server.decode_windows(
+                audio,
+                windows,
+                language=language,
+                word_timestamps=self.backend.supports_word_timestamps
+            )
+            return [segment for segments in window_segments for segment in segments]
+
+        window_segments = self.backend.decode_windows(
+            audio,
+            windows,
+            language=language,
+            batch_size=self.batch_size,
+            word_timestamps=self.backend.supports_word_timestamps
+        )
+        return [segment for segments in window_segments for segment in segments]
+
+    def _transcribe_checkpointed(self,
+                                 audio_path: str,
+                                 language: str,
+                                 report: Callable[[float, str], None]) -> list[dict]:
+        """
+        按窗口转录音频，每完成一个窗口就把片段、下一窗口位置和提示词上文写入断点
+
+        Args:
+            audio_path: WAV音频文件路径
+            language: 音频语言代码
+            report: 进度回调函数 (progress: float, message: str)
+
+        Returns:
+            Whisper格式的片段字典列表
+        """
+        window = config.TRANSCRIBE_WINDOW_SECONDS
+        checkpoint = TranscriptionCheckpoint.load(audio_path, {
+            "backend": self.backend.name,
+            "model": self.model_name,
+            "language": language,
+            "window": window,
+            "quantize": self.backend.quantize,
+            "batched": self.batched,
+            "batch_size": self.batch_size if self.batched else None,
+        })
+
+        if checkpoint.completed:
+            report(1.0, "使用已完成的语音识别断点")
+            return checkpoint.segments
+
+        if checkpoint.resumed:
+            report(0, f"从断点继续语音识别 ({seconds_to_time_string(checkpoint.offset)})...")
+
+        duration = get_audio_duration(audio_path)
+
+        while checkpoint.offset < duration:
+            window_start = checkpoint.offset
+            window_end = min(window_start + window, duration)
+
+            audio = load_audio(audio_path, window_start, window_end)
+            segments = self._transcribe_audio(audio, language, checkpoint.get_prompt())
+            segments = [shift_segment(segment, window_start) for segment in segments]
+
+            # 窗口末尾的片段可能被截断，留到下一个窗口从该片段开始处重新识别
+            next_offset = window_end
+            if window_end < duration and len(segments) > 1 and segments[-1]["start"] > window_start:
+                next_offset = segments[-1]["start"]
+                segments = segments[:-1]
+
+            checkpoint.add_window(segments, next_offset)
+
+            report(
+                min(next_offset / duration, 1.0),
+                f"语音识别进度 {seconds_to_time_string(next_offset)} / {seconds_to_time_string(duration)}"
+            )
+
+        checkpoint.finish()
+        return checkpoint.segments
+
+    def build_subtitle_list(self,
+                             whisper_segments: list[dict],
+                             language: str,
+                             step_callback: Optional[Callable[[float, str], None]] = None) -> SubtitleList:
+        """
+        将Whisper的识别结果转换为SubtitleList（保留单词级时间戳）
+
+        Args:
+            whisper_segments: Whisper输出的片段列表
+            language: 音频语言代码
+            step_callback: 进度回调函数 (progress: float, message: str)
+
+        Returns:
+            SubtitleList对象
+        """
         segments = []
-        total_segments = len(result["segments"])
+        words = WordTimings()
+        total_segments = len(whisper_segments)
 
-        for i, segment in enumerate(result["segments"]):
+        for i, segment in enumerate(whisper_segments):
             subtitle_segment = SubtitleSegment(
                 id=i + 1,
                 start=segment["start"],
                 end=segment["end"],
-                text_en=segment["text"].strip()
+                text_en=segment["text"].strip(),
+                avg_logprob=segment.get("avg_logprob", 0.0),
+                no_speech_prob=segment.get("no_speech_prob", 0.0)
             )
             segments.append(subtitle_segment)
 
+            for word in segment.get("words", []):
+                words.append(word["start"], word["end"], word["word"])
+
             # 更新进度
             if step_callback:
                 progress = (i + 1) / total_segments
                 step_callback(progress, f"处理字幕片段 {i + 1}/{total_segments}")
 
-        return SubtitleList(segments=segments, language=language)
+        return SubtitleList(
+            segments=segments,
+            language=language,
+            words=words if len(words) > 0 else None
+        )
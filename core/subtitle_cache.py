@@ -0,0 +1,228 @@
+"""
+字幕缓存模块 - 紧凑的二进制字幕缓存格式
+
+文件布局（小端序）：
+    文件头    magic "SUBC", 版本号 u16, 标志位 u16, 片段数 u32, 单词数 u32,
+              字符串区大小 u32, 语言代码长度 u32
+    片段列    开始时间 f64[n], 结束时间 f64[n], 序号 i32[n],
+              文本偏移 u32[2n+1]（第i个片段的英文为 [2i, 2i+1)，中文为 [2i+1, 2i+2)，按字节）
+    单词列    开始时间 f32[m], 结束时间 f32[m], 文本偏移 u32[m+1]（按字符，与 WordTimings 一致）
+    字符串区  语言代码 + 片段文本 + 单词文本（UTF-8，标志位 FLAG_ZLIB 时整体zlib压缩）
+
+定长的数值列通过内存映射直接转换为数组，不需要逐个解析；片段文本按偏移量
+在访问时才解码。JSON仍作为导出和交换格式。
+"""
+
+import mmap
+import struct
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from models.subtitle import SubtitleList
+from models.word_timing import WordTimings
+from utils.file_utils import atomic_write
+
+MAGIC = b"SUBC"
+VERSION = 1
+FLAG_ZLIB = 0x1
+
+HEADER = struct.Struct("<4sHHIIII")
+
+
+def write_subtitle_cache(subtitle_list: SubtitleList, file_path: str, compress: bool = False) -> str:
+    """
+    把字幕列表写入二进制缓存文件
+
+    Args:
+        subtitle_list: 字幕列表
+        file_path: 输出文件路径
+        compress: 是否用zlib压缩字符串区
+
+    Returns:
+        保存的文件路径
+    """
+    segments = subtitle_list.segments
+    count = len(segments)
+
+    # 片段文本按 英文, 中文, 英文, 中文... 的顺序拼接
+    texts = []
+    text_offsets = np.zeros(2 * count + 1, dtype='<u4')
+    position = 0
+    for i, segment in enumerate(segments):
+        for j, text in enumerate((segment.text_en, segment.text_zh)):
+            data = text.encode("utf-8")
+            texts.append(data)
+            position += len(data)
+            text_offsets[2 * i + j + 1] = position
+
+    words = subtitle_list.words if subtitle_list.words is not None else WordTimings()
+    language = subtitle_list.language.encode("utf-8")
+    strings = language + b"".join(texts) + words.text.encode("utf-8")
+
+    flags = 0
+    if compress:
+        strings = zlib.compress(strings, 1)
+        flags |= FLAG_ZLIB
+
+    with atomic_write(file_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, count, len(words), len(strings), len(language)))
+        starts, ends = subtitle_list.time_columns()
+        f.write(starts.astype('<f8').tobytes())
+        f.write(ends.astype('<f8').tobytes())
+        f.write(np.array([segment.id for segment in segments], dtype='<i4').tobytes())
+        f.write(text_offsets.tobytes())
+        f.write(np.asarray(words.starts, dtype='<f4').tobytes())
+        f.write(np.asarray(words.ends, dtype='<f4').tobytes())
+        f.write(np.asarray(words.offsets, dtype='<u4').tobytes())
+        f.write(strings)
+
+    return file_path
+
+
+class SubtitleCacheFile:
+    """
+    以内存映射方式打开的二进制字幕缓存
+
+    数值列是直接指向映射内存的数组，片段文本在访问时才解码。
+    """
+
+    def __init__(self, file_path: str):
+        """
+        打开缓存文件
+
+        Args:
+            file_path: 缓存文件路径
+
+        Raises:
+            ValueError: 文件不是当前版本的字幕缓存
+        """
+        with open(file_path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # 空文件无法映射
+                raise ValueError("字幕缓存文件为空")
+
+        if len(self._mmap) < HEADER.size:
+            self.close()
+            raise ValueError("字幕缓存文件不完整")
+
+        magic, version, flags, count, word_count, strings_size, language_size = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("不支持的字幕缓存格式")
+
+        offset = HEADER.size
+
+        def column(dtype: str, length: int) -> np.ndarray:
+            nonlocal offset
+            array = np.frombuffer(self._mmap, dtype=dtype, count=length, offset=offset)
+            offset += array.nbytes
+            return array
+
+        try:
+            self.starts = column('<f8', count)
+            self.ends = column('<f8', count)
+            self.ids = column('<i4', count)
+            self.text_offsets = column('<u4', 2 * count + 1)
+            self.word_starts = column('<f4', word_count)
+            self.word_ends = column('<f4', word_count)
+            self.word_offsets = column('<u4', word_count + 1)
+        except ValueError:
+            self.close()
+            raise ValueError("字幕缓存文件不完整")
+
+        strings = memoryview(self._mmap)[offset:offset + strings_size]
+        if flags & FLAG_ZLIB:
+            strings = memoryview(zlib.decompress(strings))
+
+        self._strings = strings
+        self._text_base = language_size
+        self._words_base = language_size + int(self.text_offsets[-1])
+        self.language = bytes(strings[:language_size]).decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __enter__(self) -> "SubtitleCacheFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _text(self, index: int) -> str:
+        """解码第index段文本（片段i的英文为2i，中文为2i+1）"""
+        start = self._text_base + int(self.text_offsets[index])
+        end = self._text_base + int(self.text_offsets[index + 1])
+        return str(self._strings[start:end], "utf-8")
+
+    def text_en(self, index: int) -> str:
+        """获取第index个片段的英文原文"""
+        return self._text(2 * index)
+
+    def text_zh(self, index: int) -> str:
+        """获取第index个片段的中文翻译"""
+        return self._text(2 * index + 1)
+
+    def words(self) -> Optional[WordTimings]:
+        """获取单词时间戳，没有单词时返回None"""
+        if len(self.word_starts) == 0:
+            return None
+
+        from array import array
+        words = WordTimings()
+        words.starts = array('f', self.word_starts.tobytes())
+        words.ends = array('f', self.word_ends.tobytes())
+        words.offsets = array('I', self.word_offsets.tobytes())
+        words._text = str(self._strings[self._words_base:], "utf-8")
+        return words
+
+    def to_subtitle_list(self) -> SubtitleList:
+        """
+        转换为字幕列表
+
+        Returns:
+            字幕列表对象
+        """
+        # 数值列整体转换，避免逐个元素访问数组
+        offsets = (self.text_offsets + self._text_base).tolist()
+        strings = bytes(self._strings[:self._words_base])
+        texts = [strings[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+        return SubtitleList.from_columns(
+            self.ids.tolist(),
+            self.starts.tolist(),
+            self.ends.tolist(),
+            texts[0::2],
+            texts[1::2],
+            language=self.language,
+            words=self.words()
+        )
+
+    def close(self) -> None:
+        """释放内存映射（之后不能再访问数组和文本）"""
+        self.starts = self.ends = self.ids = self.text_offsets = None
+        self.word_starts = self.word_ends = self.word_offsets = None
+        self._strings = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+def read_subtitle_cache(file_path: str) -> SubtitleList:
+    """
+    读取二进制缓存文件
+
+    Args:
+        file_path: 缓存文件路径
+
+    Returns:
+        字幕列表对象
+
+    Raises:
+        ValueError: 文件不是当前版本的字幕缓存
+    """
+    with SubtitleCacheFile(file_path) as cache:
+        return cache.to_subtitle_list()
@@ -0,0 +1,239 @@
+"""
+字幕导出模块 - 一次遍历同时写出多种格式的字幕文件
+
+所有时间戳在导出前用numpy一次性批量格式化；同一磁盘上的目标文件在一次
+片段遍历中同时写入（各自带大缓冲区），不同磁盘上的目标文件分组并发写入。
+"""
+
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+import numpy as np
+
+from core.subtitle_cache import write_subtitle_cache
+from core.subtitle_json import SubtitleJsonWriter
+from models.subtitle import SubtitleList, SubtitleSegment
+from utils.file_utils import atomic_write
+
+EXPORT_FORMATS = ("json", "srt", "vtt", "txt", "bin")
+
+# 写入文件的缓冲区大小
+WRITE_BUFFER_SIZE = 1 << 20
+
+# 文本格式每累积这么多个片段编码写入一次
+FLUSH_SEGMENTS = 512
+
+
+@dataclass
+class ExportTarget:
+    """导出目标"""
+    path: str  # 输出文件路径
+    format: str  # json/srt/vtt/txt/bin
+    pretty: bool = True  # JSON是否使用缩进格式（缓存副本使用紧凑格式）
+    compress: bool = False  # 二进制缓存是否压缩文本
+
+
+def format_timestamps(seconds: np.ndarray, separator: str = ",") -> list[str]:
+    """
+    批量把秒数格式化为 HH:MM:SS,mmm 时间戳（按毫秒四舍五入）
+
+    Args:
+        seconds: 秒数数组
+        separator: 毫秒分隔符，SRT为逗号，WebVTT为点号
+
+    Returns:
+        时间戳字符串列表（超过99小时的时间戳小时位数相应增加）
+    """
+    milliseconds = np.rint(np.maximum(np.asarray(seconds, dtype=np.float64), 0) * 1000).astype(np.int64)
+    hours, milliseconds = np.divmod(milliseconds, 3600000)
+    minutes, milliseconds = np.divmod(milliseconds, 60000)
+    secs, milliseconds = np.divmod(milliseconds, 1000)
+
+    if len(hours) and hours.max() > 99:
+        # 小时位数不固定，逐个格式化（只有超长视频才会出现）
+        return [f"{h:02d}:{m:02d}:{s:02d}{separator}{ms:03d}"
+                for h, m, s, ms in zip(hours.tolist(), minutes.tolist(), secs.tolist(), milliseconds.tolist())]
+
+    hour_digits = 2
+    width = hour_digits + 10
+
+    # 逐列填入ASCII字符，再把每行解释为一个定长字符串
+    chars = np.empty((len(hours), width), dtype=np.uint8)
+    columns = [(hours, hour_digits), (minutes, 2), (secs, 2), (milliseconds, 3)]
+    position = 0
+    for k, (values, digits) in enumerate(columns):
+        if k > 0:
+            chars[:, position] = ord(":") if k < 3 else ord(separator)
+            position += 1
+        for d in range(digits):
+            chars[:, position + digits - 1 - d] = ord("0") + values // 10 ** d % 10
+        position += digits
+
+    return chars.view(f"S{width}").ravel().astype(f"U{width}").tolist()
+
+
+class _TextWriter(ABC):
+    """文本格式写入器：拼接一批片段后编码写入"""
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self._parts: list[str] = []
+
+    def begin(self, subtitle_list: SubtitleList) -> None:
+        pass
+
+    def write_segment(self, index: int, segment: SubtitleSegment) -> None:
+        self._parts.append(self.format_segment(index, segment))
+        if len(self._parts) >= FLUSH_SEGMENTS:
+            self.flush()
+
+    def end(self, subtitle_list: SubtitleList) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        if self._parts:
+            self.f.write("".join(self._parts).encode("utf-8"))
+            self._parts.clear()
+
+    @abstractmethod
+    def format_segment(self, index: int, segment: SubtitleSegment) -> str:
+        """格式化一个片段（子类实现）"""
+
+    @staticmethod
+    def _bilingual_text(segment: SubtitleSegment) -> str:
+        """双语文本行（没有翻译时只有英文）"""
+        if segment.text_zh:
+            return f"{segment.text_en}\n{segment.text_zh}\n"
+        return f"{segment.text_en}\n"
+
+
+class _SrtWriter(_TextWriter):
+    """SRT格式：序号、时间轴、双语文本"""
+
+    def __init__(self, f: BinaryIO, starts: list[str], ends: list[str]):
+        super().__init__(f)
+        self.starts = starts
+        self.ends = ends
+
+    def format_segment(self, index: int, segment: SubtitleSegment) -> str:
+        return f"{segment.id}\n{self.starts[index]} --> {self.ends[index]}\n{self._bilingual_text(segment)}\n"
+
+
+class _VttWriter(_SrtWriter):
+    """WebVTT格式：头部 + 时间轴、双语文本"""
+
+    def begin(self, subtitle_list: SubtitleList) -> None:
+        self.f.write(b"WEBVTT\n\n")
+
+    def format_segment(self, index: int, segment: SubtitleSegment) -> str:
+        return f"{self.starts[index]} --> {self.ends[index]}\n{self._bilingual_text(segment)}\n"
+
+
+class _TxtWriter(_TextWriter):
+    """纯文本格式：只有双语文本，片段之间空一行"""
+
+    def format_segment(self, index: int, segment: SubtitleSegment) -> str:
+        return f"{self._bilingual_text(segment)}\n"
+
+
+class SubtitleExporter:
+    """多格式字幕导出器"""
+
+    def export(self, subtitle_list: SubtitleList, targets: list[ExportTarget]) -> list[str]:
+        """
+        导出字幕到多个目标文件（每个文件都是先写临时文件再替换）
+
+        Args:
+            subtitle_list: 字幕列表
+            targets: 导出目标列表
+
+        Returns:
+            保存的文件路径列表（与targets顺序一致）
+        """
+        for target in targets:
+            if target.format not in EXPORT_FORMATS:
+                raise ValueError(f"不支持的字幕格式: {target.format}")
+
+        timestamps = self._format_timestamps(subtitle_list, {target.format for target in targets})
+
+        groups: dict[Optional[int], list[ExportTarget]] = {}
+        for target in targets:
+            groups.setdefault(self._device_of(target.path), []).append(target)
+
+        if len(groups) == 1:
+            self._write_group(subtitle_list, targets, timestamps)
+        else:
+            # 不同磁盘的写入互不影响，分组并发
+            with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+                futures = [
+                    executor.submit(self._write_group, subtitle_list, group, timestamps)
+                    for group in groups.values()
+                ]
+                for future in futures:
+                    future.result()
+
+        return [target.path for target in targets]
+
+    @staticmethod
+    def _format_timestamps(subtitle_list: SubtitleList, formats: set[str]) -> dict[str, tuple[list[str], list[str]]]:
+        """按需批量格式化开始/结束时间戳，返回 {分隔符: (开始时间戳列表, 结束时间戳列表)}"""
+        separators = set()
+        if "srt" in formats:
+            separators.add(",")
+        if "vtt" in formats:
+            separators.add(".")
+        if not separators:
+            return {}
+
+        starts, ends = subtitle_list.time_columns()
+
+        return {
+            separator: (format_timestamps(starts, separator), format_timestamps(ends, separator))
+            for separator in separators
+        }
+
+    @staticmethod
+    def _device_of(path: str) -> Optional[int]:
+        """目标文件所在磁盘的设备号，目录不存在时返回None"""
+        try:
+            return os.stat(Path(path).parent).st_dev
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write_group(subtitle_list: SubtitleList,
+                     targets: list[ExportTarget],
+                     timestamps: dict[str, tuple[list[str], list[str]]]) -> None:
+        """在一次片段遍历中写入同一磁盘上的所有目标文件"""
+        with ExitStack() as stack:
+            writers = []
+            for target in targets:
+                if target.format == "bin":
+                    # 二进制缓存按列写入，不参与逐片段遍历
+                    write_subtitle_cache(subtitle_list, target.path, target.compress)
+                    continue
+
+                f = stack.enter_context(atomic_write(target.path, "wb", buffering=WRITE_BUFFER_SIZE))
+                if target.format == "json":
+                    writers.append(SubtitleJsonWriter(f, target.pretty))
+                elif target.format == "srt":
+                    writers.append(_SrtWriter(f, *timestamps[","]))
+                elif target.format == "vtt":
+                    writers.append(_VttWriter(f, *timestamps["."]))
+                else:
+                    writers.append(_TxtWriter(f))
+
+            for writer in writers:
+                writer.begin(subtitle_list)
+
+            for i, segment in enumerate(subtitle_list.segments):
+                for writer in writers:
+                    writer.write_segment(i, segment)
+
+            for writer in writers:
+                writer.end(subtitle_list)
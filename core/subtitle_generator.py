@@ -2,11 +2,18 @@
 字幕生成器模块 - 生成各种格式的字幕文件
 """
 
-import json
+import hashlib
+import os
+import sqlite3
 from pathlib import Path
 from typing import Optional
 
 import config
+from core.subtitle_cache import read_subtitle_cache, write_subtitle_cache
+from core.subtitle_exporter import ExportTarget, SubtitleExporter
+from core.subtitle_json import read_subtitle_json, write_subtitle_json
+from core.subtitle_index import SubtitleSearchIndex
+from core.subtitle_parser import parse_subtitle_file
 from models.subtitle import SubtitleList
 from utils.file_utils import get_cache_file_path
 
@@ -15,23 +22,21 @@ class SubtitleGenerator:
     """字幕生成器"""
 
     def __init__(self):
-        pass
+        self.exporter = SubtitleExporter()
 
-    def save_json(self, subtitle_list: SubtitleList, output_path: str) -> str:
+    def save_json(self, subtitle_list: SubtitleList, output_path: str, pretty: bool = True) -> str:
         """
-        保存JSON格式的字幕文件
+        保存JSON格式的字幕文件（逐个片段流式写入）
 
         Args:
             subtitle_list: 字幕列表
             output_path: 输出文件路径
+            pretty: 是否使用缩进格式（缓存副本使用紧凑格式）
 
         Returns:
             保存的文件路径
         """
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(subtitle_list.to_dict(), f, ensure_ascii=False, indent=2)
-
-        return output_path
+        return write_subtitle_json(subtitle_list, output_path, pretty)
 
     def load_json(self, file_path: str) -> SubtitleList:
         """
@@ -43,112 +48,213 @@ class SubtitleGenerator:
         Returns:
             字幕列表对象
         """
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        return read_subtitle_json(file_path)
 
-        return SubtitleList.from_dict(data)
+    def load_srt(self, file_path: str, language: str = "en") -> SubtitleList:
+        """
+        加载SRT格式的字幕文件（流式解析，支持双语字幕）
 
-    def save_srt(self, subtitle_list: SubtitleList, output_path: str) -> str:
+        Args:
+            file_path: 字幕文件路径
+            language: 字幕语言代码
+
+        Returns:
+            字幕列表对象
         """
-        保存SRT格式的字幕文件
+        return parse_subtitle_file(file_path, language)
+
+    def load_vtt(self, file_path: str, language: str = "en") -> SubtitleList:
+        """
+        加载WebVTT格式的字幕文件（流式解析，支持双语字幕）
+
+        Args:
+            file_path: 字幕文件路径
+            language: 字幕语言代码
+
+        Returns:
+            字幕列表对象
+        """
+        return parse_subtitle_file(file_path, language)
+
+    def save_binary(self, subtitle_list: SubtitleList, output_path: str,
+                    compress: Optional[bool] = None) -> str:
+        """
+        保存二进制格式的字幕缓存
 
         Args:
             subtitle_list: 字幕列表
             output_path: 输出文件路径
+            compress: 是否压缩文本，None则使用配置
 
         Returns:
             保存的文件路径
         """
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for segment in subtitle_list.segments:
-                # SRT格式: 序号
-                f.write(f"{segment.id}\n")
+        if compress is None:
+            compress = config.SUBTITLE_CACHE_COMPRESS
+        return write_subtitle_cache(subtitle_list, output_path, compress)
 
-                # 时间轴: HH:MM:SS,mmm --> HH:MM:SS,mmm
-                start_time = self._seconds_to_srt_time(segment.start)
-                end_time = self._seconds_to_srt_time(segment.end)
-                f.write(f"{start_time} --> {end_time}\n")
+    def load_binary(self, file_path: str) -> SubtitleList:
+        """
+        加载二进制格式的字幕缓存（内存映射读取）
 
-                # 字幕文本（双语）
-                f.write(f"{segment.text_en}\n")
-                if segment.text_zh:
-                    f.write(f"{segment.text_zh}\n")
+        Args:
+            file_path: 缓存文件路径
+
+        Returns:
+            字幕列表对象
+        """
+        return read_subtitle_cache(file_path)
 
-                f.write("\n")
+    def load_file(self, file_path: str) -> SubtitleList:
+        """
+        按扩展名加载字幕文件
 
-        return output_path
+        Args:
+            file_path: 字幕文件路径 (.json/.srt/.vtt/.bin)
 
-    def save_vtt(self, subtitle_list: SubtitleList, output_path: str) -> str:
+        Returns:
+            字幕列表对象
         """
-        保存WebVTT格式的字幕文件
+        extension = Path(file_path).suffix.lower()
+
+        if extension == ".json":
+            return self.load_json(file_path)
+        elif extension == ".srt":
+            return self.load_srt(file_path)
+        elif extension == ".vtt":
+            return self.load_vtt(file_path)
+        elif extension == ".bin":
+            return self.load_binary(file_path)
+        else:
+            raise ValueError(f"不支持的字幕格式: {extension}")
+
+    def save_file(self, subtitle_list: SubtitleList, output_path: str, pretty: bool = True) -> str:
+        """
+        按扩展名保存字幕文件
 
         Args:
             subtitle_list: 字幕列表
-            output_path: 输出文件路径
+            output_path: 输出文件路径 (.json/.srt/.vtt/.bin)
+            pretty: JSON是否使用缩进格式
 
         Returns:
             保存的文件路径
         """
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # WebVTT头部
-            f.write("WEBVTT\n\n")
+        extension = Path(output_path).suffix.lower()
+
+        if extension == ".json":
+            return self.save_json(subtitle_list, output_path, pretty)
+        elif extension == ".srt":
+            return self.save_srt(subtitle_list, output_path)
+        elif extension == ".vtt":
+            return self.save_vtt(subtitle_list, output_path)
+        elif extension == ".bin":
+            return self.save_binary(subtitle_list, output_path)
+        else:
+            raise ValueError(f"不支持的字幕格式: {extension}")
 
-            for segment in subtitle_list.segments:
-                # 时间轴: HH:MM:SS.mmm --> HH:MM:SS.mmm
-                start_time = self._seconds_to_vtt_time(segment.start)
-                end_time = self._seconds_to_vtt_time(segment.end)
-                f.write(f"{start_time} --> {end_time}\n")
+    def load_with_cache(self, file_path: str) -> SubtitleList:
+        """
+        加载字幕文件，并为其维护一份二进制缓存
 
-                # 字幕文本（双语）
-                f.write(f"{segment.text_en}\n")
-                if segment.text_zh:
-                    f.write(f"{segment.text_zh}\n")
+        缓存以文件路径、大小和修改时间为键，文件未修改时直接读取缓存，不再解析文本格式。
 
-                f.write("\n")
+        Args:
+            file_path: 字幕文件路径 (.json/.srt/.vtt)
 
-        return output_path
+        Returns:
+            字幕列表对象
+        """
+        stat = os.stat(file_path)
+        key = hashlib.md5(f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8")).hexdigest()
+        cache_path = Path(config.SUBTITLE_CACHE_DIR) / f"file-{key}.bin"
+
+        if cache_path.exists():
+            try:
+                return self.load_binary(str(cache_path))
+            except (OSError, ValueError):
+                # 缓存损坏或版本不同，重新解析原文件
+                pass
+
+        subtitle_list = self.load_file(file_path)
+        try:
+            self.save_binary(subtitle_list, str(cache_path))
+        except OSError:
+            pass
+        return subtitle_list
 
-    def _seconds_to_srt_time(self, seconds: float) -> str:
+    def save_srt(self, subtitle_list: SubtitleList, output_path: str) -> str:
         """
-        将秒数转换为SRT时间格式 (HH:MM:SS,mmm)
+        保存SRT格式的字幕文件
 
         Args:
-            seconds: 秒数
+            subtitle_list: 字幕列表
+            output_path: 输出文件路径
 
         Returns:
-            SRT时间格式字符串
+            保存的文件路径
         """
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        milliseconds = int((seconds % 1) * 1000)
+        return self.exporter.export(subtitle_list, [ExportTarget(output_path, "srt")])[0]
 
-        return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
+    def save_vtt(self, subtitle_list: SubtitleList, output_path: str) -> str:
+        """
+        保存WebVTT格式的字幕文件
 
-    def _seconds_to_vtt_time(self, seconds: float) -> str:
+        Args:
+            subtitle_list: 字幕列表
+            output_path: 输出文件路径
+
+        Returns:
+            保存的文件路径
+        """
+        return self.exporter.export(subtitle_list, [ExportTarget(output_path, "vtt")])[0]
+
+    def get_output_targets(self, video_path: str, cache_path: Optional[str] = None) -> list[ExportTarget]:
         """
-        将秒数转换为WebVTT时间格式 (HH:MM:SS.mmm)
+        处理视频后要保存的字幕文件：缓存副本，以及视频同目录下的双语JSON和SRT（方便通用播放器使用）
 
         Args:
-            seconds: 秒数
+            video_path: 视频文件路径
+            cache_path: 缓存文件路径，None则根据视频计算
 
         Returns:
-            WebVTT时间格式字符串
+            导出目标列表，第一个是缓存副本
+        """
+        video_dir = Path(video_path).parent
+        video_name = Path(video_path).stem
+        cache_path = cache_path or self.get_cache_path(video_path)
+
+        return [
+            ExportTarget(
+                cache_path,
+                Path(cache_path).suffix.lstrip(".").lower(),
+                pretty=False,
+                compress=config.SUBTITLE_CACHE_COMPRESS
+            ),
+            ExportTarget(str(video_dir / f"{video_name}_bilingual.json"), "json"),
+            ExportTarget(str(video_dir / f"{video_name}_bilingual.srt"), "srt"),
+        ]
+
+    def export(self, subtitle_list: SubtitleList, targets: list[ExportTarget]) -> list[str]:
         """
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        milliseconds = int((seconds % 1) * 1000)
+        一次遍历导出多种格式的字幕文件
 
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}.{milliseconds:03d}"
+        Args:
+            subtitle_list: 字幕列表
+            targets: 导出目标列表
 
-    def get_cache_path(self, video_path: str, format: str = "json") -> str:
+        Returns:
+            保存的文件路径列表
+        """
+        return self.exporter.export(subtitle_list, targets)
+
+    def get_cache_path(self, video_path: str, format: str = config.SUBTITLE_CACHE_FORMAT) -> str:
         """
         获取字幕缓存文件路径
 
         Args:
             video_path: 视频文件路径
-            format: 字幕格式 (json/srt/vtt)
+            format: 字幕格式 (json/srt/vtt/bin)
 
         Returns:
             缓存文件路径
@@ -160,36 +266,66 @@ class SubtitleGenerator:
             extension
         )
 
-    def save_to_cache(self, subtitle_list: SubtitleList, video_path: str, format: str = "json") -> str:
+    def save_to_cache(self, subtitle_list: SubtitleList, video_path: str, format: str = config.SUBTITLE_CACHE_FORMAT) -> str:
         """
         保存字幕到缓存
 
         Args:
             subtitle_list: 字幕列表
             video_path: 视频文件路径
-            format: 字幕格式 (json/srt/vtt)
+            format: 字幕格式 (json/srt/vtt/bin)
 
         Returns:
             保存的文件路径
         """
         cache_path = self.get_cache_path(video_path, format)
+        self.save_file(subtitle_list, cache_path, pretty=False)
+        self.index_subtitles(subtitle_list, video_path)
+        return cache_path
+
+    def save_outputs(self,
+                     subtitle_list: SubtitleList,
+                     video_path: str,
+                     targets: Optional[list[ExportTarget]] = None) -> list[ExportTarget]:
+        """
+        保存处理视频后的全部字幕文件（缓存副本和视频同目录的双语JSON、SRT），并更新搜索索引
 
-        if format == "json":
-            return self.save_json(subtitle_list, cache_path)
-        elif format == "srt":
-            return self.save_srt(subtitle_list, cache_path)
-        elif format == "vtt":
-            return self.save_vtt(subtitle_list, cache_path)
-        else:
-            raise ValueError(f"不支持的字幕格式: {format}")
+        Args:
+            subtitle_list: 字幕列表
+            video_path: 视频文件路径
+            targets: 导出目标列表，None则使用 get_output_targets()
+
+        Returns:
+            导出目标列表，第一个是缓存副本
+        """
+        targets = targets or self.get_output_targets(video_path)
+        self.export(subtitle_list, targets)
+        self.index_subtitles(subtitle_list, video_path)
+        return targets
+
+    def index_subtitles(self, subtitle_list: SubtitleList, video_path: str) -> None:
+        """
+        更新字幕库搜索索引（索引失败不影响字幕保存）
+
+        Args:
+            subtitle_list: 字幕列表
+            video_path: 视频文件路径
+        """
+        if not config.SEARCH_INDEX:
+            return
 
-    def load_from_cache(self, video_path: str, format: str = "json") -> Optional[SubtitleList]:
+        try:
+            SubtitleSearchIndex().index_subtitles(video_path, subtitle_list)
+        except sqlite3.Error:
+            pass
+
+    def load_from_cache(self, video_path: str, format: str = config.SUBTITLE_CACHE_FORMAT) -> Optional[SubtitleList]:
         """
         从缓存加载字幕
 
         Args:
             video_path: 视频文件路径
-            format: 字幕格式 (json/srt/vtt)
+            format: 字幕格式 (json/srt/vtt/bin)
 
         Returns:
             字幕列表对象，如果缓存不存在返回None
@@ -199,8 +335,4 @@ class SubtitleGenerator:
         if not Path(cache_path).exists():
             return None
 
-        if format == "json":
-            return self.load_json(cache_path)
-        else:
-            # SRT和VTT格式暂不支持从缓存加载
-            raise ValueError(f"暂不支持从缓存加载 {format} 格式的字幕")
+        return self.load_file(cache_path)
@@ -0,0 +1,218 @@
+"""
+字幕搜索索引模块 - 在所有已保存的字幕中全文搜索
+
+使用SQLite FTS5全文索引（trigram分词，中英文都可以按任意子串搜索）。
+每次保存字幕时更新对应视频的索引；字幕内容没有变化时跳过。
+FTS5的trigram分词至少需要3个字符，更短的查询（如两个汉字）改用LIKE逐行匹配。
+SQLite没有编译FTS5（或版本过旧不支持trigram分词）时，字幕保存在普通表中，全部用LIKE匹配。
+"""
+
+import hashlib
+import os
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import config
+from models.subtitle import SubtitleList
+
+# trigram分词能匹配的最短查询长度
+MIN_FTS_QUERY_LENGTH = 3
+
+VIDEOS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    signature TEXT NOT NULL
+);
+"""
+
+FTS_SEGMENTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5(
+    text_en,
+    text_zh,
+    video_id UNINDEXED,
+    segment_id UNINDEXED,
+    start UNINDEXED,
+    tokenize = 'trigram'
+);
+"""
+
+# 不支持FTS5 trigram时使用的普通表
+PLAIN_SEGMENTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    text_en TEXT,
+    text_zh TEXT,
+    video_id INTEGER,
+    segment_id INTEGER,
+    start REAL
+);
+"""
+
+
+@dataclass
+class SearchHit:
+    """搜索结果"""
+    video_path: str  # 视频文件路径
+    video_name: str  # 视频文件名
+    segment_id: int  # 字幕序号
+    start: float  # 开始时间（秒）
+    text_en: str  # 英文原文
+    text_zh: str  # 中文翻译
+
+
+class SubtitleSearchIndex:
+    """
+    字幕全文搜索索引
+
+    每个操作使用独立的数据库连接，后台处理线程写入索引的同时界面线程可以搜索。
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: 索引数据库路径，None则使用配置
+        """
+        self.db_path = str(db_path or config.SEARCH_INDEX_PATH)
+        self.fts = True  # 是否使用FTS5全文索引
+
+        connection = self._connect()
+        try:
+            connection.executescript(VIDEOS_SCHEMA)
+            try:
+                connection.executescript(FTS_SEGMENTS_SCHEMA)
+            except sqlite3.OperationalError:
+                # no such module: fts5 / no such tokenizer: trigram
+                connection.executescript(PLAIN_SEGMENTS_SCHEMA)
+                self.fts = False
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库连接（WAL模式下读写互不阻塞）"""
+        connection = sqlite3.connect(self.db_path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    @staticmethod
+    def _signature(subtitle_list: SubtitleList) -> str:
+        """字幕内容的摘要，用于判断是否需要重建索引"""
+        digest = hashlib.md5()
+        for segment in subtitle_list.segments:
+            digest.update(f"{segment.id}\x1f{segment.start}\x1f{segment.text_en}\x1f{segment.text_zh}\x1e".encode("utf-8"))
+        return digest.hexdigest()
+
+    def index_subtitles(self, video_path: str, subtitle_list: SubtitleList) -> bool:
+        """
+        更新一个视频的字幕索引
+
+        Args:
+            video_path: 视频文件路径
+            subtitle_list: 字幕列表
+
+        Returns:
+            是否重建了索引（内容没有变化时返回False）
+        """
+        video_path = os.path.abspath(video_path)
+        signature = self._signature(subtitle_list)
+
+        connection = self._connect()
+        try:
+            with connection:
+                row = connection.execute(
+                    "SELECT id, signature FROM videos WHERE path = ?", (video_path,)
+                ).fetchone()
+                if row is not None and row[1] == signature:
+                    return False
+
+                if row is None:
+                    video_id = connection.execute(
+                        "INSERT INTO videos (path, name, signature) VALUES (?, ?, ?)",
+                        (video_path, Path(video_path).name, signature)
+                    ).lastrowid
+                else:
+                    video_id = row[0]
+                    connection.execute("UPDATE videos SET signature = ? WHERE id = ?", (signature, video_id))
+                    connection.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+
+                connection.executemany(
+                    "INSERT INTO segments (text_en, text_zh, video_id, segment_id, start) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        (segment.text_en, segment.text_zh, video_id, segment.id, segment.start)
+                        for segment in subtitle_list.segments
+                    )
+                )
+            return True
+        finally:
+            connection.close()
+
+    def remove_video(self, video_path: str) -> None:
+        """
+        删除一个视频的索引
+
+        Args:
+            video_path: 视频文件路径
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                row = connection.execute(
+                    "SELECT id FROM videos WHERE path = ?", (os.path.abspath(video_path),)
+                ).fetchone()
+                if row is not None:
+                    connection.execute("DELETE FROM segments WHERE video_id = ?", (row[0],))
+                    connection.execute("DELETE FROM videos WHERE id = ?", (row[0],))
+        finally:
+            connection.close()
+
+    def search(self, query: str, limit: int = 200) -> tuple[list[SearchHit], bool]:
+        """
+        搜索包含查询文本的字幕（英文或中文，不区分大小写）
+
+        Args:
+            query: 查询文本
+            limit: 最多返回的结果数
+
+        Returns:
+            (按视频和时间排序的搜索结果, 是否因超过limit条而截断)
+            全文索引查询返回排序后的前limit条；LIKE查询返回先找到的limit条
+        """
+        query = query.strip()
+        if not query:
+            return [], False
+
+        if self.fts and len(query) >= MIN_FTS_QUERY_LENGTH:
+            # 整体作为一个短语匹配，双引号需要转义
+            condition = "segments MATCH ?"
+            parameters = ['"' + query.replace('"', '""') + '"']
+            order = "ORDER BY videos.name, videos.path, segments.start"
+        else:
+            condition = "(segments.text_en LIKE ? ESCAPE '\\' OR segments.text_zh LIKE ? ESCAPE '\\')"
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            parameters = [f"%{escaped}%"] * 2
+            # LIKE需要逐行扫描，不排序时找够limit条即可停止，结果在查询后再排序
+            order = ""
+
+        # 多取一条用于判断结果是否被截断
+        sql = f"""
+            SELECT videos.path, videos.name, segments.segment_id, segments.start,
+                   segments.text_en, segments.text_zh
+            FROM segments JOIN videos ON videos.id = segments.video_id
+            WHERE {condition}
+            {order}
+            LIMIT ?
+        """
+        connection = self._connect()
+        try:
+            rows = connection.execute(sql, parameters + [limit + 1]).fetchall()
+        finally:
+            connection.close()
+
+        truncated = len(rows) > limit
+        hits = [SearchHit(path, name, int(segment_id), float(start), text_en, text_zh)
+                for path, name, segment_id, start, text_en, text_zh in rows[:limit]]
+        if not order:
+            hits.sort(key=lambda hit: (hit.video_name, hit.video_path, hit.start))
+        return hits, truncated
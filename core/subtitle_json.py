@@ -0,0 +1,147 @@
+"""
+字幕JSON模块 - 流式写入和快速读取JSON格式的字幕文件
+
+写入时逐个片段序列化并写入文件，不需要先生成包含全部片段的嵌套字典。
+缓存副本使用紧凑格式，视频目录下给用户看的文件使用缩进格式。
+安装了 orjson 时使用它编解码，否则使用标准库 json。
+"""
+
+import json
+from typing import Any, BinaryIO
+
+from models.subtitle import SubtitleList, SubtitleSegment
+from utils.file_utils import atomic_write
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """
+    序列化为UTF-8编码的JSON（非ASCII字符不转义）
+
+    Args:
+        obj: 要序列化的对象
+        pretty: 是否使用2空格缩进
+
+    Returns:
+        JSON字节串
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """
+    解析JSON
+
+    Args:
+        data: JSON字节串
+
+    Returns:
+        解析结果
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class SubtitleJsonWriter:
+    """
+    JSON字幕写入器：逐个片段序列化并写入二进制文件对象
+
+    缩进格式的输出与 json.dump(indent=2) 相同，只是单词时间戳的每个数组写在一行内，
+    长视频的字幕文件不会多出数万行只有一个数字的行。
+    """
+
+    def __init__(self, f: BinaryIO, pretty: bool = False):
+        """
+        Args:
+            f: 以二进制模式打开的文件对象
+            pretty: 是否使用缩进格式
+        """
+        self.f = f
+        self.pretty = pretty
+        # 缩进格式下，片段位于第2层，单词时间戳位于第1层
+        self._segment_indent = b"\n    " if pretty else b""
+        self._field_separator = b",\n  " if pretty else b","
+        self._count = 0
+
+    def begin(self, subtitle_list: SubtitleList) -> None:
+        """写入片段之前的部分"""
+        self.f.write(b'{\n  "language": ' if self.pretty else b'{"language":')
+        self.f.write(dumps(subtitle_list.language))
+        self.f.write(self._field_separator)
+        self.f.write(b'"segments": [' if self.pretty else b'"segments":[')
+
+    def write_segment(self, index: int, segment: SubtitleSegment) -> None:
+        """写入一个片段"""
+        if self._count > 0:
+            self.f.write(b",")
+        data = dumps(segment.to_dict(), self.pretty)
+        if self.pretty:
+            data = self._segment_indent + data.replace(b"\n", self._segment_indent)
+        self.f.write(data)
+        self._count += 1
+
+    def end(self, subtitle_list: SubtitleList) -> None:
+        """写入片段之后的部分（单词时间戳）"""
+        if self.pretty and self._count > 0:
+            self.f.write(b"\n  ")
+        self.f.write(b"]")
+
+        if subtitle_list.words is not None:
+            self.f.write(self._field_separator)
+            self.f.write(b'"words": ' if self.pretty else b'"words":')
+            words = subtitle_list.words.to_dict()
+            if self.pretty:
+                # 每个字段一行，数组内部不换行
+                self.f.write(b"{\n    ")
+                self.f.write(b",\n    ".join(dumps(key) + b": " + dumps(value) for key, value in words.items()))
+                self.f.write(b"\n  }")
+            else:
+                self.f.write(dumps(words))
+
+        self.f.write(b"\n}" if self.pretty else b"}")
+
+
+def write_subtitle_json(subtitle_list: SubtitleList, file_path: str, pretty: bool = False) -> str:
+    """
+    流式写入JSON格式的字幕文件（先写临时文件再替换）
+
+    Args:
+        subtitle_list: 字幕列表
+        file_path: 输出文件路径
+        pretty: 是否使用缩进格式
+
+    Returns:
+        保存的文件路径
+    """
+    with atomic_write(file_path, "wb") as f:
+        writer = SubtitleJsonWriter(f, pretty)
+        writer.begin(subtitle_list)
+        for i, segment in enumerate(subtitle_list.segments):
+            writer.write_segment(i, segment)
+        writer.end(subtitle_list)
+
+    return file_path
+
+
+def read_subtitle_json(file_path: str) -> SubtitleList:
+    """
+    读取JSON格式的字幕文件
+
+    Args:
+        file_path: 字幕文件路径
+
+    Returns:
+        字幕列表对象
+    """
+    with open(file_path, "rb") as f:
+        return SubtitleList.from_dict(loads(f.read()))
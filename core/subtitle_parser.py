@@ -0,0 +1,187 @@
+"""
+字幕解析模块 - 流式解析SRT和WebVTT字幕文件
+
+逐行读取文件，每解析出一条字幕就立即创建片段，不会把整个文件读入内存，
+解析时间与文件大小成线性关系。双语字幕中英文在前、中文在后：从第一行以中日韩文字
+为主的行开始作为中文翻译，之前的行作为英文原文（英文句子中夹杂个别汉字不影响判断）。
+"""
+
+import html
+import re
+from typing import Iterator, Optional, TextIO
+
+from models.subtitle import SubtitleList, SubtitleSegment
+
+# 字幕文本中的HTML格式标签、WebVTT的时间戳/声音标签和ASS样式代码
+TAG_PATTERN = re.compile(r"<[^>]*>|\{\\[^}]*\}")
+
+# 时间轴：小时可省略（WebVTT），毫秒分隔符为逗号（SRT）或点号（WebVTT），结束时间后可带位置设置
+TIMING_PATTERN = re.compile(
+    r"\s*(?:(\d+):)?(\d{1,2}):(\d{1,2})[,.](\d{1,3})\s*-->\s*(?:(\d+):)?(\d{1,2}):(\d{1,2})[,.](\d{1,3})"
+)
+
+# 中日韩文字（含假名、谚文）和全角标点
+CJK_PATTERN = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+
+# 中日韩字符占全部文字的比例达到该值时，该行视为中文
+CJK_LINE_RATIO = 0.3
+
+
+def parse_timing(line: str) -> Optional[tuple[float, float]]:
+    """
+    解析时间轴行（一次正则匹配同时取出开始和结束时间）
+
+    Args:
+        line: 如 "00:01:02,500 --> 00:01:04,000"（SRT）或 "01:02.500 --> 01:04.000 align:start"（WebVTT）
+
+    Returns:
+        (开始时间, 结束时间)，格式错误时返回None
+    """
+    match = TIMING_PATTERN.match(line)
+    if match is None:
+        return None
+
+    h1, m1, s1, f1, h2, m2, s2, f2 = match.groups()
+    start = int(h1 or 0) * 3600 + int(m1) * 60 + int(s1) + int(f1.ljust(3, "0")) / 1000
+    end = int(h2 or 0) * 3600 + int(m2) * 60 + int(s2) + int(f2.ljust(3, "0")) / 1000
+    return start, end
+
+
+def iter_cues(lines: Iterator[str]) -> Iterator[tuple[float, float, list[str]]]:
+    """
+    从文本行中逐条解析字幕（SRT和WebVTT通用）
+
+    以时间轴行（包含 "-->"）开始一条字幕，空行结束；时间轴之前的序号行、
+    WebVTT的字幕标识和头部/注释/样式块都会被忽略。
+
+    Args:
+        lines: 文本行迭代器（如打开的文件对象）
+
+    Yields:
+        (开始时间, 结束时间, 文本行列表)
+    """
+    timing = None
+    text_lines: list[str] = []
+
+    for line in lines:
+        line = line.strip()
+
+        if "-->" in line:
+            if timing is not None and text_lines:
+                yield timing[0], timing[1], text_lines
+
+            timing = parse_timing(line)
+            text_lines = []
+        elif not line:
+            if timing is not None and text_lines:
+                yield timing[0], timing[1], text_lines
+            timing = None
+            text_lines = []
+        elif timing is not None:
+            text_lines.append(line)
+
+    if timing is not None and text_lines:
+        yield timing[0], timing[1], text_lines
+
+
+def clean_text(text: str) -> str:
+    """
+    去掉格式标签并还原HTML实体
+
+    Args:
+        text: 字幕行文本
+
+    Returns:
+        纯文本
+    """
+    if "<" in text or "{" in text:
+        text = TAG_PATTERN.sub("", text)
+    if "&" in text:
+        text = html.unescape(text)
+    return text.strip()
+
+
+def is_cjk_line(line: str) -> bool:
+    """
+    判断一行文本是否以中日韩文字为主
+
+    Args:
+        line: 去掉标签后的文本
+
+    Returns:
+        中日韩字符（含全角标点）占文字的比例不低于CJK_LINE_RATIO时返回True
+    """
+    cjk_count = len(CJK_PATTERN.findall(line))
+    if cjk_count == 0:
+        return False
+    letter_count = sum(1 for char in line if char.isalpha())
+    return cjk_count >= CJK_LINE_RATIO * max(letter_count, 1)
+
+
+def build_segment(segment_id: int, start: float, end: float, lines: list[str]) -> SubtitleSegment:
+    """
+    由一条字幕的文本行创建字幕片段（英文在前，从第一行以中日韩文字为主的行开始作为中文翻译）
+
+    Args:
+        segment_id: 字幕序号
+        start: 开始时间（秒）
+        end: 结束时间（秒）
+        lines: 文本行列表
+
+    Returns:
+        字幕片段
+    """
+    en_lines = []
+    zh_lines = []
+    for line in lines:
+        line = clean_text(line)
+        if not line:
+            continue
+        if zh_lines or is_cjk_line(line):
+            zh_lines.append(line)
+        else:
+            en_lines.append(line)
+
+    return SubtitleSegment(
+        id=segment_id,
+        start=start,
+        end=end,
+        text_en=" ".join(en_lines),
+        text_zh="".join(zh_lines)
+    )
+
+
+def parse_subtitle_stream(f: TextIO, language: str = "en") -> SubtitleList:
+    """
+    从打开的文本文件流式解析字幕
+
+    Args:
+        f: 以文本模式打开的SRT或WebVTT文件
+        language: 字幕语言代码
+
+    Returns:
+        字幕列表对象
+    """
+    segments = []
+    for start, end, lines in iter_cues(f):
+        segment = build_segment(len(segments) + 1, start, end, lines)
+        if segment.text_en or segment.text_zh:
+            segments.append(segment)
+
+    return SubtitleList(segments=segments, language=language)
+
+
+def parse_subtitle_file(file_path: str, language: str = "en") -> SubtitleList:
+    """
+    解析SRT或WebVTT字幕文件
+
+    Args:
+        file_path: 字幕文件路径
+        language: 字幕语言代码
+
+    Returns:
+        字幕列表对象
+    """
+    # utf-8-sig 去掉文件开头的BOM；个别字符解码失败时替换，不影响其他字幕
+    with open(file_path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        return parse_subtitle_stream(f, language)
@@ -0,0 +1,156 @@
+"""
+字幕精修模块 - 两遍转录的第二遍：用更大的模型在后台重新识别不可靠的片段
+
+识别和翻译在后台线程中完成，结果以RefinedWindow返回，
+由持有字幕列表的线程（界面线程）调用apply_window写入，后台线程不修改正在显示的字幕列表。
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+import config
+from core.asr_backends import ASRBackend, create_backend, shift_segment
+from core.translator import GoogleTranslator
+from models.subtitle import SubtitleList, SubtitleSegment
+from utils.audio_utils import load_audio
+
+# 精修窗口的最大时长（秒），与Whisper一次编码的音频长度一致
+REFINE_WINDOW_SECONDS = 30.0
+
+
+@dataclass
+class RefinedWindow:
+    """一个窗口的精修结果"""
+    start: float  # 窗口开始时间（秒）
+    end: float  # 窗口结束时间（秒）
+    segments: list[SubtitleSegment] = field(default_factory=list)  # 文本有变化的新片段（序号和时间轴不变）
+    words: Optional[list[tuple[float, float, str]]] = None  # 窗口内新的单词时间戳，None表示不更新
+
+
+class SubtitleRefiner:
+    """字幕精修器"""
+
+    def __init__(self,
+                 model_name: str = config.WHISPER_MODEL,
+                 backend: Optional[ASRBackend] = None,
+                 translator: Optional[GoogleTranslator] = None):
+        """
+        初始化字幕精修器
+
+        Args:
+            model_name: 精修使用的模型名称（应比预览模型更准确）
+            backend: 语音识别后端，None则按配置创建
+            translator: 翻译器，None则创建默认翻译器
+        """
+        self.backend = backend or create_backend(config.ASR_BACKEND, model_name=model_name)
+        self.translator = translator or GoogleTranslator()
+
+    def plan_windows(self, subtitle_list: SubtitleList) -> list[list[SubtitleSegment]]:
+        """
+        把相邻片段合并为不超过30秒的窗口，并按可靠性从低到高排序
+
+        平均对数概率越低、无语音概率越高的窗口越先精修。
+
+        Args:
+            subtitle_list: 预览字幕列表
+
+        Returns:
+            按优先级排序的窗口列表，每个窗口是一组相邻片段
+        """
+        windows: list[list[SubtitleSegment]] = []
+        for segment in subtitle_list.segments:
+            if windows and segment.end - windows[-1][0].start <= REFINE_WINDOW_SECONDS:
+                windows[-1].append(segment)
+            else:
+                windows.append([segment])
+
+        def priority(window: list[SubtitleSegment]) -> float:
+            return min(segment.avg_logprob - segment.no_speech_prob for segment in window)
+
+        windows.sort(key=priority)
+        return windows
+
+    def refine_window(self,
+                      window: list[SubtitleSegment],
+                      audio_path: str,
+                      language: str = "en") -> RefinedWindow:
+        """
+        重新识别一个窗口并翻译变化的片段（不修改字幕列表）
+
+        片段的序号和时间轴保持不变，按单词的中点时间把新识别的文本分配回原片段。
+
+        Args:
+            window: 要精修的相邻片段
+            audio_path: WAV音频文件路径
+            language: 音频语言代码
+
+        Returns:
+            精修结果，用apply_window写入字幕列表
+        """
+        start = window[0].start
+        end = window[-1].end
+
+        audio = load_audio(audio_path, start, end)
+        refined = self.backend.transcribe(
+            audio,
+            language=language,
+            word_timestamps=self.backend.supports_word_timestamps
+        )
+        refined = [shift_segment(segment, start) for segment in refined]
+
+        # 优先按单词分配，后端不支持单词时间戳时按片段分配
+        pieces = [
+            (word["start"], word["end"], word["word"])
+            for segment in refined
+            for word in segment["words"]
+        ]
+        if not pieces:
+            pieces = [(segment["start"], segment["end"], segment["text"]) for segment in refined]
+
+        texts = {segment.id: [] for segment in window}
+        for piece_start, piece_end, text in pieces:
+            middle = (piece_start + piece_end) / 2
+            target = next((segment for segment in window if middle < segment.end), window[-1])
+            texts[target.id].append(text)
+
+        result = RefinedWindow(start, end)
+        for segment in window:
+            text_en = "".join(texts[segment.id]).strip()
+            if not text_en or text_en == segment.text_en:
+                continue
+
+            result.segments.append(SubtitleSegment(
+                id=segment.id,
+                start=segment.start,
+                end=segment.end,
+                text_en=text_en,
+                text_zh=self.translator.translate_text(text_en)
+            ))
+
+        if result.segments and refined and refined[0]["words"]:
+            result.words = [
+                (word["start"], word["end"], word["word"])
+                for segment in refined
+                for word in segment["words"]
+            ]
+
+        return result
+
+    @staticmethod
+    def apply_window(subtitle_list: SubtitleList, result: RefinedWindow) -> list[int]:
+        """
+        把精修结果写入字幕列表（在持有字幕列表的线程中调用）
+
+        Args:
+            subtitle_list: 字幕列表
+            result: refine_window 的结果
+
+        Returns:
+            被替换的字幕序号列表
+        """
+        replaced = [segment.id for segment in result.segments if subtitle_list.replace_segment(segment)]
+
+        if replaced and subtitle_list.words is not None and result.words is not None:
+            subtitle_list.words = subtitle_list.words.with_range_replaced(result.start, result.end, result.words)
+
+        return replaced
@@ -0,0 +1,139 @@
+"""
+转录断点模块 - 分窗口保存语音识别进度，中断后可从上次完成的窗口继续
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import config
+from utils.file_utils import atomic_write, get_cache_file_path
+
+# 断点中保存的片段字段（丢弃tokens等体积大的中间结果）
+SEGMENT_KEYS = ("start", "end", "text", "words", "avg_logprob", "no_speech_prob", "compression_ratio", "runaway")
+
+# 作为下一窗口提示词的上文长度（字符）
+PROMPT_CONTEXT_CHARS = 200
+
+
+class TranscriptionCheckpoint:
+    """转录断点"""
+
+    def __init__(self, path: str, key: dict):
+        """
+        初始化断点
+
+        Args:
+            path: 断点文件路径
+            key: 断点参数（模型、语言、窗口时长等），参数变化时断点失效
+        """
+        self.path = path
+        self.key = key
+        self.segments: list[dict] = []  # 已完成的片段
+        self.offset = 0.0  # 下一个窗口的开始时间（秒）
+        self.prompt = ""  # 下一个窗口的提示词上文
+        self.completed = False
+
+    @classmethod
+    def load(cls, audio_path: str, key: dict) -> "TranscriptionCheckpoint":
+        """
+        加载音频对应的断点，不存在或参数不一致时返回空断点
+
+        Args:
+            audio_path: 音频文件路径（按内容哈希定位断点）
+            key: 断点参数
+
+        Returns:
+            断点对象
+        """
+        checkpoint = cls(cls.get_path(audio_path), key)
+        path = checkpoint.path
+
+        if not Path(path).exists():
+            return checkpoint
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # 断点文件损坏，从头开始
+            return checkpoint
+
+        if data.get("key") != key:
+            return checkpoint
+
+        checkpoint.segments = data["segments"]
+        checkpoint.offset = data["offset"]
+        checkpoint.prompt = data.get("prompt", "")
+        checkpoint.completed = data.get("completed", False)
+        return checkpoint
+
+    @staticmethod
+    def get_path(audio_path: str) -> str:
+        """
+        获取音频对应的断点文件路径
+
+        Args:
+            audio_path: 音频文件路径
+
+        Returns:
+            断点文件路径
+        """
+        return get_cache_file_path(audio_path, config.CHECKPOINT_CACHE_DIR, ".json")
+
+    @classmethod
+    def remove(cls, audio_path: str) -> None:
+        """
+        删除音频对应的断点（字幕缓存已保存后不再需要）
+
+        Args:
+            audio_path: 音频文件路径
+        """
+        try:
+            os.remove(cls.get_path(audio_path))
+        except FileNotFoundError:
+            pass
+
+    def add_window(self, segments: list[dict], next_offset: float) -> None:
+        """
+        记录一个已完成的窗口并写入磁盘
+
+        Args:
+            segments: 窗口内的片段（时间已换算为整段音频的绝对时间）
+            next_offset: 下一个窗口的开始时间（秒）
+        """
+        for segment in segments:
+            self.segments.append({k: segment[k] for k in SEGMENT_KEYS if k in segment})
+
+        self.offset = next_offset
+        context = " ".join(segment["text"].strip() for segment in self.segments[-10:])
+        self.prompt = context[-PROMPT_CONTEXT_CHARS:]
+        self.save()
+
+    def finish(self) -> None:
+        """标记转录完成并写入磁盘"""
+        self.completed = True
+        self.save()
+
+    def save(self) -> None:
+        """写入磁盘（先写临时文件再替换，避免中断时留下损坏的断点）"""
+        data = {
+            "key": self.key,
+            "offset": self.offset,
+            "prompt": self.prompt,
+            "completed": self.completed,
+            "segments": self.segments,
+        }
+
+        with atomic_write(self.path) as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    @property
+    def resumed(self) -> bool:
+        """是否从已有进度继续"""
+        return self.offset > 0 or self.completed
+
+    def get_prompt(self) -> Optional[str]:
+        """获取提示词，没有上文时返回None"""
+        return self.prompt or None
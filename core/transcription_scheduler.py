@@ -0,0 +1,62 @@
+"""
+转录调度模块 - 渐进式转录时根据播放位置决定下一个转录的窗口
+"""
+
+import threading
+from bisect import bisect_right
+from typing import Optional
+
+
+class TranscriptionScheduler:
+    """
+    转录窗口调度器
+
+    默认从头到尾依次转录；用户跳转播放位置后，优先转录播放位置所在的窗口
+    及其后面的窗口，这些窗口都完成后再回头转录前面剩下的窗口。
+    转录线程和界面线程都会访问，所有方法都是线程安全的。
+    """
+
+    def __init__(self, windows: list[tuple[float, float]]):
+        """
+        初始化调度器
+
+        Args:
+            windows: 按时间排序的 (开始时间, 结束时间) 窗口列表（秒）
+        """
+        self.windows = windows
+        self._starts = [start for start, _ in windows]
+        self._pending = set(range(len(windows)))
+        self._focus = 0  # 播放位置所在的窗口序号
+        self._lock = threading.Lock()
+
+    def hint(self, time: float) -> None:
+        """
+        提示用户正在观看的位置（跳转播放位置、点击字幕时调用）
+
+        Args:
+            time: 播放位置（秒）
+        """
+        with self._lock:
+            self._focus = max(bisect_right(self._starts, time) - 1, 0)
+
+    def next_window(self) -> Optional[int]:
+        """
+        取出下一个要转录的窗口
+
+        Returns:
+            窗口序号，全部窗口都已取出时返回None
+        """
+        with self._lock:
+            if not self._pending:
+                return None
+
+            following = [index for index in self._pending if index >= self._focus]
+            index = min(following) if following else min(self._pending)
+            self._pending.remove(index)
+            return index
+
+    @property
+    def remaining(self) -> int:
+        """尚未取出的窗口数"""
+        with self._lock:
+            return len(self._pending)
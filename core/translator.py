@@ -87,7 +87,7 @@ class GoogleTranslator:
                                  batch_size: int = config.TRANSLATION_BATCH_SIZE,
                                  delay: float = config.TRANSLATION_DELAY) -> SubtitleList:
         """
-        翻译字幕列表
+        翻译字幕列表（已有中文翻译的片段保留原翻译，只翻译缺少翻译的片段）
 
         Args:
             subtitle_list: 字幕列表
@@ -100,7 +100,7 @@ class GoogleTranslator:
         if self.progress_callback:
             self.progress_callback("开始翻译字幕...")
 
-        segments = subtitle_list.segments
+        segments = [segment for segment in subtitle_list.segments if not segment.text_zh]
         total_segments = len(segments)
 
         # 批量翻译
@@ -9,7 +9,7 @@ from pathlib import Path
 from typing import Optional, Tuple
 
 import config
-from models.video_info import VideoInfo
+from models.video_info import SubtitleStream, VideoInfo
 from utils.file_utils import get_cache_file_path, format_file_size
 from utils.time_utils import seconds_to_time_string
 
@@ -69,12 +69,22 @@ class VideoProcessor:
         # 解析视频流信息
         video_stream = None
         audio_stream = None
+        subtitle_streams = []
 
         for stream in info["streams"]:
             if stream["codec_type"] == "video" and video_stream is None:
                 video_stream = stream
             elif stream["codec_type"] == "audio" and audio_stream is None:
                 audio_stream = stream
+            elif stream["codec_type"] == "subtitle":
+                tags = stream.get("tags", {})
+                subtitle_streams.append(SubtitleStream(
+                    index=int(stream["index"]),
+                    codec=stream.get("codec_name", ""),
+                    language=tags.get("language", ""),
+                    title=tags.get("title", ""),
+                    default=bool(stream.get("disposition", {}).get("default", 0))
+                ))
 
         if video_stream is None:
             raise ValueError("视频文件中没有找到视频流")
@@ -105,7 +115,8 @@ class VideoProcessor:
             width=width,
             height=height,
             fps=fps,
-            size=size
+            size=size,
+            subtitle_streams=subtitle_streams
         )
 
     def extract_audio(self, video_path: str, output_path: Optional[str] = None) -> str:
@@ -151,6 +162,60 @@ class VideoProcessor:
 
         return output_path
 
+    def extract_subtitle_stream(self, video_path: str, stream: SubtitleStream,
+                                output_path: Optional[str] = None) -> str:
+        """
+        提取视频内嵌的文本字幕流，转换为SRT格式
+
+        Args:
+            video_path: 视频文件路径
+            stream: 字幕流（必须是文本字幕）
+            output_path: 输出字幕文件路径（可选）
+
+        Returns:
+            提取的SRT文件路径
+        """
+        if not stream.is_text:
+            raise ValueError(f"不支持的字幕编码: {stream.codec}（图形字幕无法直接提取文本）")
+
+        if output_path is None:
+            output_path = get_cache_file_path(
+                video_path,
+                config.SUBTITLE_CACHE_DIR,
+                f".stream{stream.index}.srt"
+            )
+
+        # 如果缓存文件已存在，直接返回
+        if os.path.exists(output_path):
+            return output_path
+
+        # 使用FFmpeg提取字幕流，只读取字幕数据，不解码音视频
+        # 先写临时文件，提取中断时不会留下不完整的缓存
+        temp_path = f"{output_path}.tmp.srt"
+        cmd = [
+            "ffmpeg",
+            "-i", video_path,
+            "-map", f"0:{stream.index}",
+            "-c:s", "srt",
+            "-y",  # 覆盖已存在的文件
+            temp_path
+        ]
+
+        try:
+            subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=True
+            )
+            os.replace(temp_path, output_path)
+        finally:
+            # 提取失败时删除不完整的临时文件
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return output_path
+
     def get_video_thumbnail(self, video_path: str, time: float = 1.0, size: Tuple[int, int] = (320, 180)) -> bytes:
         """
         获取视频缩略图
@@ -4,7 +4,7 @@
 
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QComboBox, QPushButton, QButtonGroup,
-                             QRadioButton, QFrame)
+                             QRadioButton, QFrame, QCheckBox)
 from PyQt6.QtCore import Qt, pyqtSignal
 
 import config
@@ -74,6 +74,25 @@ class ControlPanel(QWidget):
         # 连接按钮组信号
         self.repeat_button_group.buttonClicked.connect(self._on_repeat_count_changed)
 
+        # 音频复读选项
+        pcm_layout = QHBoxLayout()
+
+        self.pcm_checkbox = QCheckBox("音频复读（无跳转）")
+        self.pcm_checkbox.setToolTip("从缓存音频中截取句子循环播放，没有跳转延迟和间隙")
+        self.pcm_checkbox.setChecked(config.PCM_REPEAT)
+        pcm_layout.addWidget(self.pcm_checkbox)
+
+        self.video_mode_combo = QComboBox()
+        self.video_mode_combo.setToolTip("音频复读时视频的处理方式")
+        for label, mode in [("视频定格", "freeze"), ("视频同步", "sync"), ("视频不控制", "none")]:
+            self.video_mode_combo.addItem(label, mode)
+        self.video_mode_combo.setCurrentIndex(max(self.video_mode_combo.findData(config.PCM_REPEAT_VIDEO), 0))
+        self.video_mode_combo.setEnabled(config.PCM_REPEAT)
+        self.pcm_checkbox.toggled.connect(self.video_mode_combo.setEnabled)
+        pcm_layout.addWidget(self.video_mode_combo)
+
+        layout.addLayout(pcm_layout)
+
         # 复读按钮
         self.repeat_button = QPushButton("开始复读")
         self.repeat_button.setEnabled(False)
@@ -197,6 +216,24 @@ class ControlPanel(QWidget):
             self.repeat_button.setText("开始复读")
             self.repeat_clicked.emit(-1)  # -1表示停止复读
 
+    def pcm_repeat_enabled(self) -> bool:
+        """
+        是否使用音频复读
+
+        Returns:
+            勾选了音频复读返回True
+        """
+        return self.pcm_checkbox.isChecked()
+
+    def pcm_video_mode(self) -> str:
+        """
+        音频复读时视频的处理方式
+
+        Returns:
+            freeze/sync/none
+        """
+        return self.video_mode_combo.currentData()
+
     def reset_repeat_button(self):
         """重置复读按钮"""
         self.repeat_button.setText("开始复读")
@@ -2,6 +2,8 @@
 主窗口
 """
 
+import os
+
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QSplitter, QMenuBar, QStatusBar,
                              QMessageBox, QApplication)
@@ -9,10 +11,14 @@ from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QAction, QIcon
 
 import config
+from core.subtitle_refiner import RefinedWindow, SubtitleRefiner
 from gui.video_player import VideoPlayer
 from gui.subtitle_panel import SubtitlePanel
 from gui.control_panel import ControlPanel
-from gui.upload_dialog import UploadDialog
+from gui.upload_dialog import UploadDialog, RefineSubtitleThread, ProgressiveTranscribeThread
+from gui.search_dialog import SearchDialog
+from gui.subtitle_sync import SubtitleSyncScheduler
+from gui.pcm_repeater import PcmRepeatPlayer
 from models.subtitle import SubtitleList
 from models.video_info import VideoInfo
 
@@ -29,6 +35,13 @@ class MainWindow(QMainWindow):
         self.repeat_count = 0
         self.repeat_current = 0
         self.repeat_segment = None
+        self.pcm_video_mode = None  # 音频复读时视频的处理方式（None表示不在音频复读）
+        self.refine_thread: RefineSubtitleThread = None
+        self.transcribe_thread: ProgressiveTranscribeThread = None
+        self.retired_threads = set()  # 已请求停止、等待自行结束的后台线程
+        self.closing = False  # 正在等待后台线程结束后关闭窗口
+        self.search_dialog: SearchDialog = None
+        self.pending_position = 0.0  # 打开视频后要跳转到的位置（秒）
 
         self._setup_ui()
         self._connect_signals()
@@ -83,10 +96,11 @@ class MainWindow(QMainWindow):
         # 创建状态栏
         self._create_status_bar()
 
-        # 创建定时器（用于字幕同步）
-        self.sync_timer = QTimer()
-        self.sync_timer.setInterval(100)  # 每100毫秒检查一次
-        self.sync_timer.timeout.connect(self._on_sync_timer)
+        # 字幕同步调度器（只在字幕边界时刻唤醒）
+        self.sync_scheduler = SubtitleSyncScheduler(self.video_player, self)
+
+        # 音频复读播放器
+        self.pcm_repeater = PcmRepeatPlayer(self)
 
     def _create_menu_bar(self):
         """创建菜单栏"""
@@ -101,6 +115,12 @@ class MainWindow(QMainWindow):
         open_action.triggered.connect(self._on_open_video)
         file_menu.addAction(open_action)
 
+        # 搜索字幕库
+        search_action = QAction("搜索字幕库(&S)...", self)
+        search_action.setShortcut("Ctrl+Shift+F")
+        search_action.triggered.connect(self._on_search_library)
+        file_menu.addAction(search_action)
+
         file_menu.addSeparator()
 
         # 退出
@@ -130,8 +150,11 @@ class MainWindow(QMainWindow):
 
     def _connect_signals(self):
         """连接信号"""
-        # 播放器位置变化 -> 更新高亮字幕
-        self.video_player.position_changed.connect(self._on_position_changed)
+        # 到达字幕边界或跳转 -> 更新高亮字幕、检查复读
+        self.sync_scheduler.sync.connect(self._on_sync)
+
+        # 跳转播放位置（包括点击字幕和复读） -> 渐进式转录优先处理该位置
+        self.video_player.seeked.connect(self._on_seeked)
 
         # 字幕点击 -> 跳转播放器
         self.subtitle_panel.clicked.connect(self._on_subtitle_clicked)
@@ -139,13 +162,41 @@ class MainWindow(QMainWindow):
         # 复读按钮点击 -> 开始复读
         self.control_panel.repeat_clicked.connect(self._on_repeat_clicked)
 
+        # 音频复读进度
+        self.pcm_repeater.loop_started.connect(self._on_pcm_loop_started)
+        self.pcm_repeater.finished.connect(self._on_pcm_repeat_finished)
+
     # 事件处理
 
     def _on_open_video(self):
         """打开视频"""
+        self._open_video()
+
+    def _open_video(self, video_path: str = None, position: float = 0.0):
+        """
+        打开视频
+
+        Args:
+            video_path: 视频文件路径，None则由用户选择
+            position: 打开后跳转到的位置（秒）
+        """
         dialog = UploadDialog(self)
         dialog.video_loaded.connect(self._on_video_loaded)
-        dialog.exec()
+        if video_path:
+            QTimer.singleShot(0, lambda: dialog.open_file(video_path))
+
+        self.pending_position = position
+        accepted = dialog.exec()
+        self.pending_position = 0.0
+        if not accepted:
+            return
+
+        if dialog.needs_transcription:
+            # 渐进式转录：视频已打开，后台生成字幕
+            self._start_progressive_transcription()
+        elif dialog.needs_refinement:
+            # 两遍转录：视频已用预览字幕打开，后台继续精修
+            self._start_refinement()
 
     def _on_video_loaded(self, video_info: VideoInfo, subtitle_list: SubtitleList):
         """
@@ -155,24 +206,194 @@ class MainWindow(QMainWindow):
             video_info: 视频信息
             subtitle_list: 字幕列表
         """
+        # 切换视频时停止上一个视频的后台转录和精修
+        self._stop_progressive_transcription()
+        self._stop_refinement()
+
         self.video_info = video_info
         self.subtitle_list = subtitle_list
 
         # 加载视频到播放器
-        self.video_player.load_video(video_info.path)
+        self.video_player.load_video(video_info.path, self.pending_position)
 
         # 设置字幕面板
         self.subtitle_panel.set_subtitle_list(subtitle_list)
+        self.sync_scheduler.set_subtitle_list(subtitle_list)
 
         # 更新状态栏
         self.status_bar.showMessage(f"已加载: {video_info.name}")
 
-        # 启动同步定时器
-        self.sync_timer.start()
+    def _on_search_library(self):
+        """打开字幕库搜索对话框"""
+        if self.search_dialog is None:
+            self.search_dialog = SearchDialog(self)
+            self.search_dialog.result_activated.connect(self._on_search_result)
+
+        self.search_dialog.show()
+        self.search_dialog.raise_()
+        self.search_dialog.activateWindow()
+
+    def _on_search_result(self, video_path: str, position: float):
+        """
+        打开搜索结果
+
+        Args:
+            video_path: 视频文件路径
+            position: 字幕开始时间（秒）
+        """
+        if self.video_info is not None and os.path.abspath(self.video_info.path) == os.path.abspath(video_path):
+            # 当前视频，直接跳转
+            self.video_player.seek(position)
+            return
+
+        if not os.path.exists(video_path):
+            QMessageBox.warning(self, "视频不存在", f"找不到视频文件：\n{video_path}")
+            return
+
+        self._open_video(video_path, position)
+
+    def _start_progressive_transcription(self):
+        """启动渐进式转录"""
+        self.transcribe_thread = ProgressiveTranscribeThread(self.video_info)
+        self.transcribe_thread.hint(self.video_player.get_position())
+        self.transcribe_thread.window_transcribed.connect(self._on_window_transcribed)
+        self.transcribe_thread.progress_updated.connect(self.status_bar.showMessage)
+        self.transcribe_thread.transcription_completed.connect(self._on_transcription_completed)
+        self.transcribe_thread.start()
+
+    def _stop_progressive_transcription(self):
+        """停止渐进式转录（不等待线程结束）"""
+        if self.transcribe_thread is not None:
+            thread = self.transcribe_thread
+            self.transcribe_thread = None
+            self._retire_thread(thread, thread.window_transcribed, thread.progress_updated,
+                                thread.transcription_completed)
+
+    def _on_window_transcribed(self, window_list: SubtitleList):
+        """
+        渐进式转录完成一个窗口
+
+        Args:
+            window_list: 窗口内的字幕
+        """
+        if self.sender() is not self.transcribe_thread:
+            # 已停止的转录线程（例如上一个视频）在停止前发出的信号
+            return
+
+        self.subtitle_list.merge(window_list)
+        self.subtitle_panel.add_segments(window_list.segments)
+        # 字幕边界变化，重新计算下一个边界
+        self.sync_scheduler.refresh()
+
+    def _on_transcription_completed(self, subtitle_list: SubtitleList):
+        """
+        渐进式转录全部完成，换用按时间顺序编号的完整字幕
+
+        Args:
+            subtitle_list: 完整字幕列表
+        """
+        if self.sender() is not self.transcribe_thread:
+            return
 
-    def _on_position_changed(self, position: float):
+        # 线程发出此信号后即结束，交给它自行释放
+        self._stop_progressive_transcription()
+
+        self.subtitle_list = subtitle_list
+        self.subtitle_panel.set_subtitle_list(subtitle_list)
+        self.sync_scheduler.set_subtitle_list(subtitle_list)
+        self.status_bar.showMessage(f"字幕生成完成 (共{len(subtitle_list)}条)")
+
+        if config.ASR_TWO_PASS:
+            self._start_refinement()
+
+    def _on_seeked(self, position: float):
+        """
+        播放位置跳转
+
+        Args:
+            position: 目标位置（秒）
+        """
+        if self.transcribe_thread is not None:
+            self.transcribe_thread.hint(position)
+
+    def _start_refinement(self):
+        """启动后台字幕精修"""
+        self.refine_thread = RefineSubtitleThread(self.video_info, self.subtitle_list)
+        self.refine_thread.segments_refined.connect(self._on_segments_refined)
+        self.refine_thread.progress_updated.connect(self.status_bar.showMessage)
+        self.refine_thread.refine_completed.connect(self._on_refine_completed)
+        self.refine_thread.start()
+
+    def _stop_refinement(self):
+        """停止后台字幕精修（不等待线程结束）"""
+        if self.refine_thread is not None:
+            thread = self.refine_thread
+            self.refine_thread = None
+            self._retire_thread(thread, thread.segments_refined, thread.progress_updated, thread.refine_completed)
+
+    def _on_segments_refined(self, result: RefinedWindow):
         """
-        播放位置变化
+        一个窗口精修完成，在界面线程中替换片段
+
+        Args:
+            result: 精修结果
+        """
+        if self.sender() is not self.refine_thread:
+            # 已停止的精修线程在停止前发出的信号
+            return
+
+        subtitle_ids = SubtitleRefiner.apply_window(self.subtitle_list, result)
+        self.subtitle_panel.update_segments(subtitle_ids)
+        # 精修可能调整时间轴，重新计算下一个边界
+        self.sync_scheduler.refresh()
+
+    def _on_refine_completed(self):
+        """字幕精修完成"""
+        if self.sender() is self.refine_thread:
+            self.status_bar.showMessage("字幕精修完成")
+
+    def _retire_thread(self, thread, *signals):
+        """
+        停止后台线程而不在界面线程等待：断开结果信号，线程处理完当前窗口后自行结束并释放
+
+        Args:
+            thread: 转录或精修线程
+            signals: 要断开的信号
+        """
+        thread.stop()
+        for signal in signals:
+            try:
+                signal.disconnect()
+            except TypeError:
+                # 没有连接的槽
+                pass
+
+        # 结束前保留引用，避免线程对象在运行中被回收
+        self.retired_threads.add(thread)
+        thread.finished.connect(lambda: self._on_retired_thread_finished(thread))
+        if thread.isFinished():
+            self._on_retired_thread_finished(thread)
+
+    def _on_retired_thread_finished(self, thread):
+        """
+        已停止的后台线程结束
+
+        Args:
+            thread: 转录或精修线程
+        """
+        if thread not in self.retired_threads:
+            return
+
+        self.retired_threads.discard(thread)
+        thread.deleteLater()
+
+        if self.closing and not self.retired_threads:
+            # 窗口已隐藏，不会再触发最后一个窗口关闭，直接退出
+            QApplication.quit()
+
+    def _on_sync(self, position: float):
+        """
+        到达字幕边界（或跳转、字幕变化）
 
         Args:
             position: 当前位置（秒）
@@ -189,6 +410,7 @@ class MainWindow(QMainWindow):
                 if self.repeat_current >= self.repeat_count:
                     # 复读完成，暂停视频
                     self.repeat_mode = False
+                    self.sync_scheduler.set_deadline(None)
                     self.video_player.pause()
                     self.control_panel.repeat_completed()
                     self.status_bar.showMessage(f"复读完成 (共{self.repeat_count}次)")
@@ -203,6 +425,8 @@ class MainWindow(QMainWindow):
                     # 确保继续播放
                     if not self.video_player.is_playing():
                         self.video_player.play()
+                    # position已是跳转前的位置；跳转后调度器会以句首位置再次同步并高亮
+                    return
 
         # 更新高亮字幕
         self.subtitle_panel.highlight_subtitle(position)
@@ -258,12 +482,21 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("当前没有字幕可供复读")
             return
 
-        # 设置复读模式
-        self.repeat_mode = True
+        self._stop_pcm_repeat()
         self.repeat_count = count
         self.repeat_current = 0
         self.repeat_segment = segment
 
+        # 优先使用音频复读，不可用时回退为跳转复读
+        if self.control_panel.pcm_repeat_enabled() and self._start_pcm_repeat(segment, count):
+            return
+
+        # 设置复读模式
+        self.repeat_mode = True
+
+        # 句子结束后加上缓冲时间时检查是否循环
+        self.sync_scheduler.set_deadline(segment.end + config.REPEAT_BUFFER_TIME)
+
         # 跳转到字幕开始位置并播放
         self.video_player.seek(segment.start)
         self.video_player.play()
@@ -273,20 +506,91 @@ class MainWindow(QMainWindow):
 
         self.status_bar.showMessage(f"开始复读: {count}次")
 
+    def _start_pcm_repeat(self, segment, count: int) -> bool:
+        """
+        开始音频复读
+
+        Args:
+            segment: 要复读的字幕片段
+            count: 复读次数
+
+        Returns:
+            是否成功开始（没有缓存音频或音频设备不支持时返回False）
+        """
+        audio_path = self.video_info.audio_path if self.video_info else None
+        if not audio_path or not os.path.exists(audio_path):
+            self.status_bar.showMessage("没有缓存音频，使用跳转复读")
+            return False
+
+        mode = self.control_panel.pcm_video_mode()
+        self.video_player.set_muted(True)
+        if mode == "freeze":
+            self.video_player.pause()
+            self.video_player.seek(segment.start)
+        elif mode == "sync":
+            self.video_player.seek(segment.start)
+            self.video_player.play()
+
+        # 按采样点截取，不需要跳转复读的缓冲时间；有单词时间戳时截到最后一个单词结束
+        end = segment.end
+        words = self.subtitle_list.get_words(segment) if self.subtitle_list else []
+        if words:
+            end = max(end, words[-1][1])
+        if not self.pcm_repeater.start(audio_path, segment.start, end, count, self.video_player.get_volume()):
+            self.video_player.set_muted(False)
+            self.status_bar.showMessage("音频设备不支持，使用跳转复读")
+            return False
+
+        self.pcm_video_mode = mode
+        self.control_panel.update_repeat_progress(1, count)
+        self.status_bar.showMessage(f"开始音频复读: {count}次")
+        return True
+
+    def _on_pcm_loop_started(self, loop: int):
+        """
+        音频复读开始新的一遍
+
+        Args:
+            loop: 第几遍（从1开始）
+        """
+        self.repeat_current = loop - 1
+        self.control_panel.update_repeat_progress(loop, self.repeat_count)
+
+        # 同步模式下视频跟随每一遍回到句首
+        if self.pcm_video_mode == "sync" and loop > 1 and self.repeat_segment:
+            self.video_player.seek(self.repeat_segment.start)
+
+    def _on_pcm_repeat_finished(self):
+        """音频复读完成"""
+        if self.pcm_video_mode == "sync":
+            self.video_player.pause()
+        self.video_player.set_muted(False)
+        self.pcm_video_mode = None
+
+        self.control_panel.repeat_completed()
+        self.status_bar.showMessage(f"复读完成 (共{self.repeat_count}次)")
+
+    def _stop_pcm_repeat(self):
+        """停止音频复读"""
+        if self.pcm_video_mode is None:
+            return
+
+        self.pcm_repeater.stop()
+        self.video_player.set_muted(False)
+        self.pcm_video_mode = None
+
     def _stop_repeat(self):
         """停止复读"""
+        self._stop_pcm_repeat()
         self.repeat_mode = False
         self.repeat_count = 0
         self.repeat_current = 0
         self.repeat_segment = None
+        self.sync_scheduler.set_deadline(None)
 
         self.control_panel.reset_repeat_button()
         self.status_bar.showMessage("复读已停止")
 
-    def _on_sync_timer(self):
-        """同步定时器"""
-        pass
-
     def _on_about(self):
         """关于对话框"""
         QMessageBox.about(
@@ -306,10 +610,22 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """关闭事件"""
-        # 停止定时器
-        self.sync_timer.stop()
+        # 停止字幕同步
+        self.sync_scheduler.stop()
 
         # 停止播放
+        self._stop_pcm_repeat()
         self.video_player.stop()
 
+        # 停止后台转录和精修
+        self._stop_progressive_transcription()
+        self._stop_refinement()
+
+        if self.retired_threads:
+            # 后台线程处理完当前窗口才会退出，先隐藏窗口，全部结束后再关闭
+            self.closing = True
+            self.hide()
+            event.ignore()
+            return
+
         event.accept()
@@ -0,0 +1,143 @@
+"""
+音频复读播放器 - 从缓存音频中截取句子，在内存中循环播放
+"""
+
+from PyQt6.QtCore import QObject, QBuffer, QByteArray, QIODevice, QTimer, Qt, pyqtSignal
+from PyQt6.QtMultimedia import QAudio, QAudioFormat, QAudioSink, QMediaDevices
+
+from utils.audio_utils import SAMPLE_RATE, read_pcm16
+
+# 16位单声道PCM每个采样点的字节数
+BYTES_PER_SAMPLE = 2
+
+
+class PcmRepeatPlayer(QObject):
+    """
+    音频复读播放器
+
+    把句子对应的PCM数据按复读次数首尾相接放进内存缓冲区，交给QAudioSink一次播放完，
+    循环之间没有跳转和解码，也没有间隙；结束位置按采样点截取，不会多播。
+    """
+
+    # 信号
+    loop_started = pyqtSignal(int)  # 开始第几遍（从1开始）
+    finished = pyqtSignal()  # 全部播放完成
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.sink: QAudioSink = None
+        self.buffer: QBuffer = None
+        self.loop_count = 0
+        self.loop_usecs = 0  # 每一遍的时长（微秒）
+        self.current_loop = 0
+
+        self.audio_format = QAudioFormat()
+        self.audio_format.setSampleRate(SAMPLE_RATE)
+        self.audio_format.setChannelCount(1)
+        self.audio_format.setSampleFormat(QAudioFormat.SampleFormat.Int16)
+
+        # 每一遍结束时检查进度
+        self.loop_timer = QTimer(self)
+        self.loop_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.loop_timer.timeout.connect(self._on_loop_timer)
+
+    def is_supported(self) -> bool:
+        """默认音频输出设备是否支持16kHz单声道16位PCM"""
+        device = QMediaDevices.defaultAudioOutput()
+        return not device.isNull() and device.isFormatSupported(self.audio_format)
+
+    def is_active(self) -> bool:
+        """是否正在复读"""
+        return self.sink is not None
+
+    def start(self, audio_path: str, start: float, end: float, count: int, volume: float = 1.0) -> bool:
+        """
+        开始复读
+
+        Args:
+            audio_path: 16kHz单声道WAV文件路径
+            start: 句子开始时间（秒）
+            end: 句子结束时间（秒）
+            count: 复读次数
+            volume: 音量 (0.0 - 1.0)
+
+        Returns:
+            是否成功开始（没有音频数据或设备不支持时返回False）
+        """
+        self.stop()
+
+        pcm = read_pcm16(audio_path, start, end)
+        if not pcm or count <= 0 or not self.is_supported():
+            return False
+
+        self.loop_count = count
+        self.loop_usecs = len(pcm) // BYTES_PER_SAMPLE * 1000000 // SAMPLE_RATE
+        self.current_loop = 1
+
+        self.buffer = QBuffer(self)
+        self.buffer.setData(QByteArray(pcm * count))
+        self.buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+
+        self.sink = QAudioSink(QMediaDevices.defaultAudioOutput(), self.audio_format, self)
+        self.sink.setVolume(volume)
+        self.sink.stateChanged.connect(self._on_state_changed)
+        self.sink.start(self.buffer)
+
+        self.loop_started.emit(1)
+        if count > 1:
+            self.loop_timer.start(max(self.loop_usecs // 1000, 1))
+        return True
+
+    def stop(self):
+        """停止复读（不发射finished信号）"""
+        self.loop_timer.stop()
+
+        if self.sink is not None:
+            self.sink.stateChanged.disconnect(self._on_state_changed)
+            self.sink.stop()
+            self.sink.deleteLater()
+            self.sink = None
+
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer.deleteLater()
+            self.buffer = None
+
+    def _played_usecs(self) -> int:
+        """
+        实际已播放的时长
+
+        processedUSecs()统计的是已交给音频设备的数据，其中还有一部分在设备缓冲区中排队，
+        需要减去这部分才是真正播放出来的时长。
+
+        Returns:
+            已播放的时长（微秒）
+        """
+        queued_bytes = self.sink.bufferSize() - self.sink.bytesFree()
+        queued_usecs = queued_bytes // BYTES_PER_SAMPLE * 1000000 // SAMPLE_RATE
+        return max(self.sink.processedUSecs() - queued_usecs, 0)
+
+    def _on_loop_timer(self):
+        """按实际已播放的时长更新当前是第几遍"""
+        if self.sink is None:
+            return
+
+        played_usecs = self._played_usecs()
+        loop = min(played_usecs // max(self.loop_usecs, 1) + 1, self.loop_count)
+        if loop > self.current_loop:
+            self.current_loop = loop
+            self.loop_started.emit(loop)
+
+        if self.current_loop >= self.loop_count:
+            self.loop_timer.stop()
+        else:
+            # 对齐到下一遍的开始
+            remaining = self.current_loop * self.loop_usecs - played_usecs
+            self.loop_timer.start(max(remaining // 1000, 1))
+
+    def _on_state_changed(self, state):
+        """缓冲区播放完毕"""
+        if state == QAudio.State.IdleState:
+            self.stop()
+            self.finished.emit()
@@ -0,0 +1,132 @@
+"""
+字幕库搜索对话框 - 在所有已生成字幕的视频中搜索一句话出现的位置
+"""
+
+import sqlite3
+import time
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QLabel, QLineEdit,
+                             QListWidget, QListWidgetItem)
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+
+from core.subtitle_index import SearchHit, SubtitleSearchIndex
+from utils.time_utils import seconds_to_time_string
+
+
+class SearchDialog(QDialog):
+    """字幕库搜索对话框（非模态，可以连续打开多个结果）"""
+
+    # 信号
+    result_activated = pyqtSignal(str, float)  # 选择搜索结果，传递视频路径和开始时间（秒）
+
+    # 输入停止这么久后再搜索（毫秒）
+    SEARCH_DELAY_MS = 150
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        # 索引数据库无法打开时对话框仍可显示，只是提示无法搜索
+        try:
+            self.search_index = SubtitleSearchIndex()
+        except sqlite3.Error as e:
+            self.search_index = None
+            self.index_error = str(e)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self._run_search)
+
+        self._setup_ui()
+
+    def _setup_ui(self):
+        """设置UI"""
+        self.setWindowTitle("搜索字幕库")
+        self.setMinimumSize(700, 500)
+
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+
+        # 搜索框
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("输入英文或中文，在所有已生成字幕的视频中搜索...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setStyleSheet("font-size: 14px; padding: 6px;")
+        self.search_edit.textChanged.connect(lambda: self.search_timer.start())
+        self.search_edit.returnPressed.connect(self._run_search)
+        layout.addWidget(self.search_edit)
+
+        # 结果统计
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #666;")
+        layout.addWidget(self.status_label)
+
+        # 结果列表
+        self.result_list = QListWidget()
+        self.result_list.setWordWrap(True)
+        self.result_list.setAlternatingRowColors(True)
+        self.result_list.itemActivated.connect(self._on_item_activated)
+        layout.addWidget(self.result_list, stretch=1)
+
+        hint_label = QLabel("双击结果打开视频并跳转到该句")
+        hint_label.setStyleSheet("color: #999; font-size: 11px;")
+        layout.addWidget(hint_label)
+
+        if self.search_index is None:
+            self.search_edit.setEnabled(False)
+            self.status_label.setText(f"无法打开字幕搜索索引: {self.index_error}")
+
+    def _run_search(self):
+        """执行搜索并显示结果"""
+        self.search_timer.stop()
+        query = self.search_edit.text().strip()
+
+        self.result_list.clear()
+        if not query:
+            self.status_label.setText("")
+            return
+
+        start_time = time.perf_counter()
+        try:
+            hits, truncated = self.search_index.search(query)
+        except sqlite3.Error as e:
+            self.status_label.setText(f"搜索失败: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+        for hit in hits:
+            item = QListWidgetItem(self._format_hit(hit))
+            item.setData(Qt.ItemDataRole.UserRole, hit)
+            self.result_list.addItem(item)
+
+        video_count = len({hit.video_path for hit in hits})
+        status = f"在 {video_count} 个视频中找到 {len(hits)} 条字幕 (耗时: {elapsed_ms:.0f}毫秒)"
+        if truncated:
+            status += f"，结果过多，只显示前 {len(hits)} 条"
+        self.status_label.setText(status)
+
+    @staticmethod
+    def _format_hit(hit: SearchHit) -> str:
+        """
+        格式化搜索结果的显示文本
+
+        Args:
+            hit: 搜索结果
+
+        Returns:
+            显示文本
+        """
+        text = f"{hit.video_name}  [{seconds_to_time_string(hit.start)}]\n{hit.text_en}"
+        if hit.text_zh:
+            text += f"\n{hit.text_zh}"
+        return text
+
+    def _on_item_activated(self, item: QListWidgetItem):
+        """
+        双击搜索结果
+
+        Args:
+            item: 结果项
+        """
+        hit: SearchHit = item.data(Qt.ItemDataRole.UserRole)
+        self.result_activated.emit(hit.video_path, hit.start)
@@ -2,124 +2,358 @@
 字幕面板组件
 """
 
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QScrollArea,
-                             QLabel, QFrame)
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QCursor
+import math
+from typing import Optional
+
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame,
+                             QLineEdit, QToolButton, QCheckBox, QListView,
+                             QStyledItemDelegate, QStyle, QAbstractItemView)
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QPoint, QRect, QSize, pyqtSignal
+from PyQt6.QtGui import (QCursor, QKeySequence, QShortcut, QColor, QPen, QBrush, QFont,
+                         QFontMetrics, QPainter)
 
 from models.subtitle import SubtitleList, SubtitleSegment
+from models.text_index import NgramIndex
 from utils.time_utils import milliseconds_to_time_string
 
 
-class SubtitleLabel(QFrame):
-    """单个字幕标签"""
+# 行的显示状态
+ROW_NORMAL = 0
+ROW_ACTIVE = 1  # 当前播放的字幕
+ROW_MATCHED = 2  # 当前搜索结果
+ROW_HOVERED = 3  # 鼠标悬停（由视图状态决定，不属于模型数据）
 
-    clicked = pyqtSignal(int)  # 点击信号，传递字幕序号
+# 各状态的背景色、边框色和边框宽度
+ROW_STYLES = {
+    ROW_NORMAL: ("#f5f5f5", "#ddd", 1),
+    ROW_ACTIVE: ("#e3f2fd", "#2196f3", 2),
+    ROW_MATCHED: ("#fff8e1", "#ffb300", 2),
+    ROW_HOVERED: ("#e8e8e8", "#2196f3", 1),
+}
 
-    # 最小高度，确保短句子也有足够的点击区域
-    MINIMUM_HEIGHT = 60
 
-    def __init__(self, segment: SubtitleSegment, parent=None):
+class SubtitleListModel(QAbstractListModel):
+    """
+    字幕列表模型
+
+    直接读取SubtitleList的列数据，只为视图请求的行创建轻量片段视图；行号即字幕在列表中的位置（按时间顺序）。
+    """
+
+    SegmentRole = Qt.ItemDataRole.UserRole + 1  # 字幕片段
+    IdRole = Qt.ItemDataRole.UserRole + 2  # 字幕序号
+    StateRole = Qt.ItemDataRole.UserRole + 3  # 显示状态（ROW_NORMAL/ROW_ACTIVE/ROW_MATCHED）
+
+    def __init__(self, parent=None):
         super().__init__(parent)
 
-        self.segment = segment
-        self._is_active = False
+        self.subtitle_list: SubtitleList = None
+        self._row_count = 0  # 已通知视图的行数
+        self.active_id = None  # 当前播放的字幕序号
+        self.matched_id = None  # 当前搜索结果的字幕序号
 
-        self._setup_ui()
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._row_count
 
-    def _setup_ui(self):
-        """设置UI"""
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(10, 8, 10, 8)
-        layout.setSpacing(4)
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or self.subtitle_list is None:
+            return None
 
-        # 时间标签
-        time_label = QLabel(self._get_time_text())
-        time_label.setStyleSheet("color: #666; font-size: 11px;")
-        layout.addWidget(time_label)
+        segment = self.subtitle_list.segments[index.row()]
+        if role == self.SegmentRole:
+            return segment
+        if role == self.IdRole:
+            return segment.id
+        if role == self.StateRole:
+            return self.row_state(segment.id)
+        if role == Qt.ItemDataRole.DisplayRole:
+            return segment.text_en
+        return None
 
-        # 英文原文
-        en_label = QLabel(self.segment.text_en)
-        en_label.setWordWrap(True)
-        en_label.setStyleSheet("color: #333; font-size: 13px; font-weight: bold;")
-        layout.addWidget(en_label)
+    def set_subtitle_list(self, subtitle_list: SubtitleList):
+        """
+        设置字幕列表
 
-        # 中文翻译
-        if self.segment.text_zh:
-            zh_label = QLabel(self.segment.text_zh)
-            zh_label.setWordWrap(True)
-            zh_label.setStyleSheet("color: #666; font-size: 12px;")
-            layout.addWidget(zh_label)
+        Args:
+            subtitle_list: 字幕列表对象
+        """
+        self.beginResetModel()
+        self.subtitle_list = subtitle_list
+        self._row_count = len(subtitle_list) if subtitle_list is not None else 0
+        self.active_id = None
+        self.matched_id = None
+        self.endResetModel()
+
+    def insert_segments(self, subtitle_ids: list[int]):
+        """
+        通知视图有片段已合并到字幕列表中
+
+        Args:
+            subtitle_ids: 新片段的序号
+        """
+        rows = sorted(row for row in map(self.row_of, subtitle_ids) if row is not None)
+        # 从前往后逐行插入，每插入一行之后的行号都与字幕列表一致
+        for row in rows:
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._row_count += 1
+            self.endInsertRows()
+
+    def segments_changed(self, subtitle_ids: list[int]):
+        """
+        通知视图片段内容已更新
+
+        Args:
+            subtitle_ids: 字幕序号列表
+        """
+        for subtitle_id in subtitle_ids:
+            self._emit_row_changed(subtitle_id, [])
 
-        # 添加弹性空间，确保内容少时也有足够高度
-        layout.addStretch()
+    def row_of(self, subtitle_id: Optional[int]) -> Optional[int]:
+        """
+        字幕序号对应的行号
 
-        # 设置基本样式
-        self.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
-        self.setMinimumHeight(self.MINIMUM_HEIGHT)  # 设置最小高度
-        self._update_style()
+        Args:
+            subtitle_id: 字幕序号
 
-    def _get_time_text(self) -> str:
-        """获取时间文本"""
-        start_ms = int(self.segment.start * 1000)
-        end_ms = int(self.segment.end * 1000)
-        return f"{milliseconds_to_time_string(start_ms)} - {milliseconds_to_time_string(end_ms)}"
+        Returns:
+            行号，不存在时返回None
+        """
+        if subtitle_id is None or self.subtitle_list is None:
+            return None
+        return self.subtitle_list.index_of(subtitle_id)
 
-    def set_active(self, active: bool):
+    def row_state(self, subtitle_id: int) -> int:
         """
-        设置活动状态
+        字幕的显示状态（搜索结果优先于当前播放）
 
         Args:
-            active: 是否为活动状态
-        """
-        self._is_active = active
-        self._update_style()
-
-    def _update_style(self):
-        """更新样式"""
-        if self._is_active:
-            self.setStyleSheet("""
-                SubtitleLabel {
-                    background-color: #e3f2fd;
-                    border-radius: 5px;
-                    border: 2px solid #2196f3;
-                }
-            """)
+            subtitle_id: 字幕序号
+
+        Returns:
+            ROW_NORMAL/ROW_ACTIVE/ROW_MATCHED
+        """
+        if subtitle_id == self.matched_id:
+            return ROW_MATCHED
+        if subtitle_id == self.active_id:
+            return ROW_ACTIVE
+        return ROW_NORMAL
+
+    def set_active_id(self, subtitle_id: Optional[int]):
+        """设置当前播放的字幕（只重绘之前和现在的两行）"""
+        previous_id, self.active_id = self.active_id, subtitle_id
+        self._emit_row_changed(previous_id)
+        self._emit_row_changed(subtitle_id)
+
+    def set_matched_id(self, subtitle_id: Optional[int]):
+        """设置当前搜索结果（只重绘之前和现在的两行）"""
+        previous_id, self.matched_id = self.matched_id, subtitle_id
+        self._emit_row_changed(previous_id)
+        self._emit_row_changed(subtitle_id)
+
+    def _emit_row_changed(self, subtitle_id: Optional[int], roles: Optional[list[int]] = None):
+        """
+        通知视图重绘一行
+
+        Args:
+            subtitle_id: 字幕序号
+            roles: 变化的数据角色，None表示只有显示状态变化（行高不变）
+        """
+        row = self.row_of(subtitle_id)
+        if row is not None and row < self._row_count:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [self.StateRole] if roles is None else roles)
+
+
+class SubtitleDelegate(QStyledItemDelegate):
+    """
+    字幕绘制代理：绘制时间、英文原文和中文翻译
+
+    只绘制可见的行。measured_rows范围内（可见的行及前后若干行，由面板在滚动和跳转前设置）
+    的行高精确计算并按宽度缓存，范围外的行按文本长度估算（不做文本排版）；
+    因此加载和改变宽度只需排版可见附近的行。
+    画笔、画刷和字体度量在所有行之间共享，只在创建时构造一次；高亮变化只需重绘两行。
+    """
+
+    # 最小高度，确保短句子也有足够的点击区域
+    MINIMUM_HEIGHT = 60
+
+    # 内边距和行间距
+    MARGIN_X = 10
+    MARGIN_Y = 8
+    SPACING = 4
+
+    TEXT_FLAGS = Qt.TextFlag.TextWordWrap.value | Qt.AlignmentFlag.AlignLeft.value | Qt.AlignmentFlag.AlignTop.value
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._heights: dict[int, tuple[int, int, int]] = {}  # 字幕序号 -> (宽度, 行高, 英文高度)
+        self.measured_rows = range(0)  # 精确计算行高的行
+
+        base_font = parent.font() if parent is not None else QFont()
+        self.time_font = QFont(base_font)
+        self.time_font.setPixelSize(11)
+        self.en_font = QFont(base_font)
+        self.en_font.setPixelSize(13)
+        self.en_font.setBold(True)
+        self.zh_font = QFont(base_font)
+        self.zh_font.setPixelSize(12)
+
+        self.time_metrics = QFontMetrics(self.time_font)
+        self.en_metrics = QFontMetrics(self.en_font)
+        self.zh_metrics = QFontMetrics(self.zh_font)
+
+        # 估算行高用的平均字符宽度（中文按全角字符宽度）
+        self.en_char_width = max(self.en_metrics.averageCharWidth(), 1)
+        self.zh_char_width = max(self.zh_metrics.horizontalAdvance("中"), 1)
+
+        # 各状态的 (画刷, 画笔)
+        self.row_styles = {
+            state: (QBrush(QColor(background)), QPen(QColor(border), border_width))
+            for state, (background, border, border_width) in ROW_STYLES.items()
+        }
+        self.time_pen = QPen(QColor("#666"))
+        self.en_pen = QPen(QColor("#333"))
+        self.zh_pen = QPen(QColor("#666"))
+
+    def invalidate(self, subtitle_id: int = None):
+        """
+        使缓存的行高失效
+
+        Args:
+            subtitle_id: 字幕序号，None表示全部
+        """
+        if subtitle_id is None:
+            self._heights.clear()
         else:
-            self.setStyleSheet("""
-                SubtitleLabel {
-                    background-color: #f5f5f5;
-                    border-radius: 5px;
-                    border: 1px solid #ddd;
-                }
-                SubtitleLabel:hover {
-                    background-color: #e8e8e8;
-                    border: 1px solid #2196f3;
-                }
-            """)
-
-    def mousePressEvent(self, event):
-        """鼠标点击事件 - 记录点击位置"""
-        if event.button() == Qt.MouseButton.LeftButton:
-            self._press_pos = event.pos()
-        super().mousePressEvent(event)
-
-    def mouseReleaseEvent(self, event):
-        """鼠标释放事件 - 确认是点击而不是拖动"""
-        if event.button() == Qt.MouseButton.LeftButton:
-            # 检查是否是点击操作（按下和释放位置接近）
-            if hasattr(self, '_press_pos'):
-                # 计算移动距离
-                move_distance = (event.pos() - self._press_pos).manhattanLength()
-                # 如果移动距离小于10像素，认为是点击
-                if move_distance < 10 and self.rect().contains(event.pos()):
-                    self.clicked.emit(self.segment.id)
-                delattr(self, '_press_pos')
-            else:
-                # 没有记录按下位置，直接检查释放位置
-                if self.rect().contains(event.pos()):
-                    self.clicked.emit(self.segment.id)
-        super().mouseReleaseEvent(event)
+            self._heights.pop(subtitle_id, None)
+
+    @staticmethod
+    def _item_width(option) -> int:
+        """行的宽度（视口宽度减去行间距）"""
+        view = option.widget
+        if view is None:
+            return option.rect.width()
+        return view.viewport().width() - 2 * view.spacing()
+
+    def sizeHint(self, option, index):
+        # 已精确计算或在measured_rows范围内的行用精确行高，其余用估算值
+        width = self._item_width(option)
+        segment = index.data(SubtitleListModel.SegmentRole)
+        cached = self._heights.get(segment.id)
+        if cached is not None and cached[0] == width:
+            return QSize(width, cached[1])
+        if index.row() in self.measured_rows:
+            return QSize(width, self._measure(segment, width)[0])
+        return QSize(width, self._estimate(segment, width))
+
+    def measure_change(self, segment: SubtitleSegment, width: int) -> int:
+        """
+        精确计算按估算行高布局的行
+
+        Args:
+            segment: 字幕片段
+            width: 行的宽度
+
+        Returns:
+            精确行高与估算行高之差，已精确计算过的行返回0
+        """
+        cached = self._heights.get(segment.id)
+        if cached is not None and cached[0] == width:
+            return 0
+        return self._measure(segment, width)[0] - self._estimate(segment, width)
+
+    def _estimate(self, segment: SubtitleSegment, width: int) -> int:
+        """
+        按字符数估算行高（不做文本排版，用于远离可见区域的行）
+
+        Args:
+            segment: 字幕片段
+            width: 行的宽度
+
+        Returns:
+            估算的行高
+        """
+        text_width = max(width - 2 * self.MARGIN_X, 1)
+        en_lines = max(math.ceil(len(segment.text_en) * self.en_char_width / text_width), 1)
+
+        height = 2 * self.MARGIN_Y + self.time_metrics.height() + self.SPACING + en_lines * self.en_metrics.lineSpacing()
+        if segment.text_zh:
+            zh_lines = max(math.ceil(len(segment.text_zh) * self.zh_char_width / text_width), 1)
+            height += self.SPACING + zh_lines * self.zh_metrics.lineSpacing()
+        return max(height, self.MINIMUM_HEIGHT)
+
+    def _measure(self, segment: SubtitleSegment, width: int) -> tuple[int, int]:
+        """
+        计算行高（按宽度缓存）
+
+        Args:
+            segment: 字幕片段
+            width: 行的宽度
+
+        Returns:
+            (行高, 英文文本高度)
+        """
+        cached = self._heights.get(segment.id)
+        if cached is not None and cached[0] == width:
+            return cached[1], cached[2]
+
+        text_width = max(width - 2 * self.MARGIN_X, 1)
+        en_height = self._text_height(self.en_metrics, text_width, segment.text_en)
+
+        height = 2 * self.MARGIN_Y + self.time_metrics.height() + self.SPACING + en_height
+        if segment.text_zh:
+            height += self.SPACING + self._text_height(self.zh_metrics, text_width, segment.text_zh)
+        height = max(height, self.MINIMUM_HEIGHT)
+
+        self._heights[segment.id] = (width, height, en_height)
+        return height, en_height
+
+    def _text_height(self, metrics: QFontMetrics, width: int, text: str) -> int:
+        """文本换行后的高度"""
+        return metrics.boundingRect(QRect(0, 0, width, 1 << 20), self.TEXT_FLAGS, text).height()
+
+    def paint(self, painter, option, index):
+        segment = index.data(SubtitleListModel.SegmentRole)
+        state = index.model().row_state(segment.id)
+        if state == ROW_NORMAL and option.state & QStyle.StateFlag.State_MouseOver:
+            state = ROW_HOVERED
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # 背景和边框
+        brush, pen = self.row_styles[state]
+        painter.setPen(pen)
+        painter.setBrush(brush)
+        painter.drawRoundedRect(option.rect.adjusted(1, 1, -1, -1), 5, 5)
+
+        # 时间
+        text_rect = option.rect.adjusted(self.MARGIN_X, self.MARGIN_Y, -self.MARGIN_X, -self.MARGIN_Y)
+        start_ms = int(segment.start * 1000)
+        end_ms = int(segment.end * 1000)
+        time_text = f"{milliseconds_to_time_string(start_ms)} - {milliseconds_to_time_string(end_ms)}"
+        painter.setFont(self.time_font)
+        painter.setPen(self.time_pen)
+        time_height = self.time_metrics.height()
+        painter.drawText(QRect(text_rect.left(), text_rect.top(), text_rect.width(), time_height),
+                         self.TEXT_FLAGS, time_text)
+
+        # 英文原文
+        top = text_rect.top() + time_height + self.SPACING
+        _, en_height = self._measure(segment, self._item_width(option))
+        painter.setFont(self.en_font)
+        painter.setPen(self.en_pen)
+        painter.drawText(QRect(text_rect.left(), top, text_rect.width(), en_height), self.TEXT_FLAGS, segment.text_en)
+
+        # 中文翻译
+        if segment.text_zh:
+            top += en_height + self.SPACING
+            painter.setFont(self.zh_font)
+            painter.setPen(self.zh_pen)
+            painter.drawText(QRect(text_rect.left(), top, text_rect.width(), text_rect.bottom() - top),
+                             self.TEXT_FLAGS, segment.text_zh)
+
+        painter.restore()
 
 
 class SubtitlePanel(QWidget):
@@ -127,16 +361,26 @@ class SubtitlePanel(QWidget):
 
     clicked = pyqtSignal(int)  # 点击字幕信号
 
+    # 可见行前后精确计算行高的行数；可见行离范围边缘少于一半时重新计算范围
+    MEASURE_MARGIN_ROWS = 100
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
         self.subtitle_list: SubtitleList = None
-        self.subtitle_widgets: list[SubtitleLabel] = []
         self.current_highlight_id = None  # 当前高亮的字幕ID
         self.scroll_enabled = True  # 是否允许自动滚动
         self.user_scrolling = False  # 用户是否正在滚动
         self.last_scroll_time = 0  # 上次滚动时间
         self.scroll_threshold = 100  # 滚动间隔阈值（毫秒）
+        self.relayouting = False  # 正在按精确行高重新布局（滚动条变化不是用户操作）
+
+        # 搜索
+        self.text_index = NgramIndex()  # 当前视频字幕的文本索引
+        self.search_query = ""  # 当前搜索文本
+        self.search_results: list[int] = []  # 匹配的字幕序号（按时间顺序）
+        self.search_position = -1  # 当前跳转到的搜索结果位置
+        self.hidden_ids: set[int] = set()  # 过滤模式下隐藏的字幕序号
 
         self._setup_ui()
 
@@ -151,23 +395,66 @@ class SubtitlePanel(QWidget):
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title_label)
 
-        # 滚动区域
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setFrameShape(QFrame.Shape.NoFrame)
+        # 搜索栏
+        search_layout = QHBoxLayout()
+        search_layout.setContentsMargins(10, 6, 10, 0)
+        search_layout.setSpacing(4)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("搜索字幕 (Ctrl+F)")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self._on_search_changed)
+        self.search_edit.returnPressed.connect(self.next_match)
+        search_layout.addWidget(self.search_edit, stretch=1)
+
+        self.match_label = QLabel("")
+        self.match_label.setStyleSheet("color: #666; font-size: 11px;")
+        search_layout.addWidget(self.match_label)
+
+        previous_button = QToolButton()
+        previous_button.setText("▲")
+        previous_button.setToolTip("上一个 (Shift+Enter)")
+        previous_button.clicked.connect(self.previous_match)
+        search_layout.addWidget(previous_button)
+
+        next_button = QToolButton()
+        next_button.setText("▼")
+        next_button.setToolTip("下一个 (Enter)")
+        next_button.clicked.connect(self.next_match)
+        search_layout.addWidget(next_button)
+
+        self.filter_checkbox = QCheckBox("只显示匹配")
+        self.filter_checkbox.toggled.connect(lambda: self._apply_filter())
+        search_layout.addWidget(self.filter_checkbox)
+
+        layout.addLayout(search_layout)
+
+        QShortcut(QKeySequence.StandardKey.Find, self, self._focus_search)
+        QShortcut(QKeySequence("Shift+Return"), self.search_edit, self.previous_match)
+        QShortcut(QKeySequence("Escape"), self.search_edit, self.search_edit.clear)
+
+        # 字幕列表（只绘制可见的行）
+        self.list_view = QListView()
+        self.list_view.setFrameShape(QFrame.Shape.NoFrame)
+        self.list_view.setSpacing(4)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.list_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.list_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.list_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.list_view.setMouseTracking(True)
+        self.list_view.viewport().setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
+
+        self.model = SubtitleListModel(self)
+        self.delegate = SubtitleDelegate(self.list_view)
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(self.delegate)
+        self.list_view.clicked.connect(self._on_index_clicked)
 
         # 连接滚动条信号
-        self.scroll_area.verticalScrollBar().valueChanged.connect(self._on_scroll_changed)
+        self.list_view.verticalScrollBar().valueChanged.connect(self._on_scroll_changed)
 
-        # 容器widget
-        self.container_widget = QWidget()
-        self.container_layout = QVBoxLayout(self.container_widget)
-        self.container_layout.setSpacing(8)
-        self.container_layout.setContentsMargins(10, 10, 10, 10)
-        self.container_layout.addStretch()
-
-        self.scroll_area.setWidget(self.container_widget)
-        layout.addWidget(self.scroll_area)
+        layout.addWidget(self.list_view)
 
     def set_subtitle_list(self, subtitle_list: SubtitleList):
         """
@@ -180,22 +467,45 @@ class SubtitlePanel(QWidget):
         self._clear_subtitles()
 
         self.subtitle_list = subtitle_list
+        self.current_highlight_id = None
+
+        # 建立文本索引（只在加载字幕时建立一次，之后增量更新）
+        self.text_index.clear()
+        self.text_index.update(
+            (segment.id, segment.text_en, segment.text_zh) for segment in subtitle_list.segments
+        )
+
+        # 加载时只精确计算开头的行，其余行按估算行高布局
+        self.delegate.measured_rows = range(min(len(subtitle_list), self.MEASURE_MARGIN_ROWS))
+        self.model.set_subtitle_list(subtitle_list)
+
+        self._refresh_search()
+
+    def add_segments(self, segments: list[SubtitleSegment]):
+        """
+        显示新合并到字幕列表中的片段（渐进式转录乱序完成的窗口）
 
-        # 创建字幕widget
-        for segment in subtitle_list.segments:
-            subtitle_widget = SubtitleLabel(segment)
-            subtitle_widget.clicked.connect(self._on_subtitle_clicked)
-            self.subtitle_widgets.append(subtitle_widget)
-            self.container_layout.insertWidget(
-                self.container_layout.count() - 1,
-                subtitle_widget
-            )
+        Args:
+            segments: 已合并到字幕列表中的片段
+        """
+        self.model.insert_segments([segment.id for segment in segments])
+        # 插入的行改变了行号，重新计算可见附近的行
+        self._update_measured_rows(force=True)
+
+        self.text_index.update((segment.id, segment.text_en, segment.text_zh) for segment in segments)
+        self._refresh_search()
 
     def _clear_subtitles(self):
         """清除所有字幕"""
-        for widget in self.subtitle_widgets:
-            widget.deleteLater()
-        self.subtitle_widgets.clear()
+        for subtitle_id in self.hidden_ids:
+            row = self.model.row_of(subtitle_id)
+            if row is not None:
+                self.list_view.setRowHidden(row, False)
+        self.model.set_subtitle_list(None)
+        self.delegate.invalidate()
+        self.search_results = []
+        self.search_position = -1
+        self.hidden_ids.clear()
 
     def highlight_subtitle(self, time: float):
         """
@@ -215,28 +525,43 @@ class SubtitlePanel(QWidget):
             return
 
         self.current_highlight_id = segment.id if segment else None
+        self.model.set_active_id(self.current_highlight_id)
 
-        # 清除所有高亮
-        for widget in self.subtitle_widgets:
-            widget.set_active(False)
-
-        # 高亮当前字幕
-        if segment:
-            for widget in self.subtitle_widgets:
-                if widget.segment.id == segment.id:
-                    widget.set_active(True)
-                    # 只在允许滚动时才滚动
-                    if self.scroll_enabled and not self.user_scrolling:
-                        self._scroll_to_widget(widget)
-                    break
+        # 只在允许滚动时才滚动（搜索时不打断用户查看搜索结果）
+        if segment and self.scroll_enabled and not self.user_scrolling and not self.search_query:
+            self._scroll_to_row(self.model.row_of(segment.id))
 
-    def _scroll_to_widget(self, widget: SubtitleLabel):
+    def update_segments(self, subtitle_ids: list):
         """
-        滚动到指定widget（智能滚动，将目标字幕放在视野中央）
+        刷新指定字幕的显示（字幕列表中的片段已被替换）
 
         Args:
-            widget: 目标widget
+            subtitle_ids: 字幕序号列表
         """
+        for subtitle_id in subtitle_ids:
+            segment = self.get_segment_by_id(subtitle_id)
+            if segment:
+                self.delegate.invalidate(subtitle_id)
+                self.text_index.add(subtitle_id, segment.text_en, segment.text_zh)
+
+                # 文本变化后行高可能变化
+                row = self.model.row_of(subtitle_id)
+                if row is not None:
+                    self.delegate.sizeHintChanged.emit(self.model.index(row))
+
+        self.model.segments_changed(subtitle_ids)
+        self._refresh_search()
+
+    def _scroll_to_row(self, row: Optional[int]):
+        """
+        滚动到指定行（智能滚动，将目标字幕放在视野中央）
+
+        Args:
+            row: 行号
+        """
+        if row is None:
+            return
+
         # 检查滚动频率，避免过于频繁
         import time
         current_time = time.time() * 1000  # 转换为毫秒
@@ -245,37 +570,92 @@ class SubtitlePanel(QWidget):
 
         self.last_scroll_time = current_time
 
-        # 确保widget已显示
-        widget.setVisible(True)
+        # 过滤模式下被隐藏的行不滚动
+        if self.list_view.isRowHidden(row):
+            return
+
+        # 先精确计算目标行附近的行高，滚动位置不会在绘制后变化
+        self._update_measured_rows(row, force=True)
+        self.list_view.scrollTo(self.model.index(row), QAbstractItemView.ScrollHint.PositionAtCenter)
+
+    def _row_at(self, y: int) -> Optional[int]:
+        """视口中指定高度处的行号（落在行间距上时向下找）"""
+        x = self.list_view.viewport().width() // 2
+        for offset in range(0, 2 * self.list_view.spacing() + 2, self.list_view.spacing() + 1):
+            index = self.list_view.indexAt(QPoint(x, y + offset))
+            if index.isValid():
+                return index.row()
+        return None
+
+    def _update_measured_rows(self, center_row: Optional[int] = None, force: bool = False):
+        """
+        精确计算可见行（或指定行）前后若干行的行高
+
+        新进入范围的行如果之前按估算行高布局，立即重新布局，并按可见区域上方行高的变化
+        调整滚动位置，屏幕上的内容不会移动。
 
-        # 计算滚动位置（将字幕放在视野中央）
-        scroll_bar = self.scroll_area.verticalScrollBar()
-        widget_geometry = widget.geometry()
-        widget_top = widget_geometry.top()
-        widget_height = widget_geometry.height()
+        Args:
+            center_row: 以该行为中心（跳转前使用），None表示当前可见的行
+            force: 可见行仍在范围内时也重新计算
+        """
+        row_count = self.model.rowCount()
+        if row_count == 0 or self.subtitle_list is None:
+            return
 
-        # 视口高度
-        viewport_height = self.scroll_area.viewport().height()
+        if center_row is None:
+            first_visible = self._row_at(0)
+            if first_visible is None:
+                first_visible = 0
+            last_visible = self._row_at(self.list_view.viewport().height() - 1)
+            if last_visible is None:
+                last_visible = row_count - 1
+        else:
+            first_visible = last_visible = center_row
 
-        # 目标位置：让字幕显示在视口中央
-        target_position = widget_top - (viewport_height // 2) + (widget_height // 2)
+        measured = self.delegate.measured_rows
+        margin = self.MEASURE_MARGIN_ROWS
+        if not force and (measured.start == 0 or first_visible - measured.start >= margin // 2) \
+                and (measured.stop == row_count or measured.stop - 1 - last_visible >= margin // 2):
+            return
 
-        # 确保滚动位置在有效范围内
-        max_value = scroll_bar.maximum()
-        min_value = scroll_bar.minimum()
-        target_position = max(min_value, min(target_position, max_value))
+        rows = range(max(first_visible - margin, 0), min(last_visible + margin + 1, row_count))
+        width = self.list_view.viewport().width() - 2 * self.list_view.spacing()
+
+        # 新进入范围、之前按估算行高布局的行（强制时行号可能已变化，全部检查）
+        previous = range(0) if force else measured
+        changed = False
+        shift = 0  # 当前可见区域上方的行高变化
+        top_row = self._row_at(0)
+        for row in rows:
+            if row in previous:
+                continue
+            change = self.delegate.measure_change(self.subtitle_list.segments[row], width)
+            if change:
+                changed = True
+                if top_row is not None and row < top_row and not self.list_view.isRowHidden(row):
+                    shift += change
+
+        self.delegate.measured_rows = rows
+        if not changed:
+            return
 
-        # 平滑滚动到目标位置
-        scroll_bar.setValue(int(target_position))
+        scroll_bar = self.list_view.verticalScrollBar()
+        value = scroll_bar.value()
+        self.relayouting = True
+        try:
+            self.list_view.doItemsLayout()
+            scroll_bar.setValue(value + shift)
+        finally:
+            self.relayouting = False
 
-    def _on_subtitle_clicked(self, subtitle_id: int):
+    def _on_index_clicked(self, index: QModelIndex):
         """
         字幕点击事件
 
         Args:
-            subtitle_id: 字幕序号
+            index: 被点击的行
         """
-        self.clicked.emit(subtitle_id)
+        self.clicked.emit(index.data(SubtitleListModel.IdRole))
 
     def _on_scroll_changed(self, value: int):
         """
@@ -284,6 +664,12 @@ class SubtitlePanel(QWidget):
         Args:
             value: 滚动条值
         """
+        if self.relayouting:
+            return
+
+        # 滚动到新的区域前精确计算附近的行高
+        self._update_measured_rows()
+
         # 用户正在滚动时，暂停自动滚动
         self.user_scrolling = True
 
@@ -305,15 +691,121 @@ class SubtitlePanel(QWidget):
         # 暂时禁用自动滚动标志
         self.scroll_enabled = False
 
-        for widget in self.subtitle_widgets:
-            if widget.segment.id == subtitle_id:
-                self._scroll_to_widget(widget)
-                break
+        self._scroll_to_row(self.model.row_of(subtitle_id))
 
         # 500ms后恢复自动滚动
         from PyQt6.QtCore import QTimer
         QTimer.singleShot(500, lambda: setattr(self, 'scroll_enabled', True))
 
+    def _focus_search(self):
+        """聚焦搜索框"""
+        self.search_edit.setFocus()
+        self.search_edit.selectAll()
+
+    def _on_search_changed(self, text: str):
+        """
+        搜索文本改变 - 跳转到当前播放位置之后的第一个匹配
+
+        Args:
+            text: 搜索文本
+        """
+        self.search_query = text.strip()
+        self._update_results()
+
+        position = -1
+        if self.search_results:
+            # 从当前播放的字幕开始向后找
+            current_row = self.model.row_of(self.current_highlight_id) or 0
+            position = 0
+            for i, subtitle_id in enumerate(self.search_results):
+                if self.model.row_of(subtitle_id) >= current_row:
+                    position = i
+                    break
+
+        self._apply_filter()
+        self._set_search_position(position)
+
+    def _refresh_search(self):
+        """字幕内容变化后重新搜索（保持当前跳转到的字幕）"""
+        if not self.search_query:
+            return
+
+        current_id = self._current_match_id()
+        self._update_results()
+        self._apply_filter()
+
+        position = self.search_results.index(current_id) if current_id in self.search_results else -1
+        self._set_search_position(position, scroll=False)
+
+    def _update_results(self):
+        """用文本索引查找匹配的字幕，按时间顺序排列"""
+        if not self.search_query or self.subtitle_list is None:
+            self.search_results = []
+            return
+
+        rows = {subtitle_id: self.model.row_of(subtitle_id)
+                for subtitle_id in self.text_index.search(self.search_query)}
+        self.search_results = sorted((subtitle_id for subtitle_id, row in rows.items() if row is not None),
+                                     key=rows.__getitem__)
+
+    def _apply_filter(self):
+        """过滤模式下隐藏不匹配的字幕（只改变显示状态有变化的行）"""
+        if self.filter_checkbox.isChecked() and self.search_query and self.subtitle_list is not None:
+            hidden_ids = self.text_index.keys() - set(self.search_results)
+        else:
+            hidden_ids = set()
+
+        for subtitle_id in hidden_ids - self.hidden_ids:
+            self.list_view.setRowHidden(self.model.row_of(subtitle_id), True)
+        for subtitle_id in self.hidden_ids - hidden_ids:
+            row = self.model.row_of(subtitle_id)
+            if row is not None:
+                self.list_view.setRowHidden(row, False)
+
+        self.hidden_ids = hidden_ids
+
+    def _current_match_id(self) -> Optional[int]:
+        """当前跳转到的搜索结果的字幕序号"""
+        if 0 <= self.search_position < len(self.search_results):
+            return self.search_results[self.search_position]
+        return None
+
+    def _set_search_position(self, position: int, scroll: bool = True):
+        """
+        跳转到第position个搜索结果
+
+        Args:
+            position: 搜索结果位置，-1表示没有当前结果
+            scroll: 是否滚动到该字幕
+        """
+        self.search_position = position
+        self.model.set_matched_id(self._current_match_id())
+
+        if not self.search_query:
+            self.match_label.setText("")
+            return
+
+        if position < 0:
+            self.match_label.setText("0/0" if not self.search_results else f"-/{len(self.search_results)}")
+            return
+
+        self.match_label.setText(f"{position + 1}/{len(self.search_results)}")
+        if scroll:
+            # 跳转时忽略滚动频率限制
+            self.last_scroll_time = 0
+            self._scroll_to_row(self.model.row_of(self._current_match_id()))
+
+    def next_match(self):
+        """跳转到下一个搜索结果"""
+        if self.search_results:
+            self._set_search_position((self.search_position + 1) % len(self.search_results))
+
+    def previous_match(self):
+        """跳转到上一个搜索结果"""
+        if self.search_results:
+            position = self.search_position if self.search_position >= 0 else 0
+            self._set_search_position((position - 1) % len(self.search_results))
+
     def get_segment_by_id(self, subtitle_id: int) -> SubtitleSegment:
         """
         根据序号获取字幕片段
@@ -327,8 +819,4 @@ class SubtitlePanel(QWidget):
         if not self.subtitle_list:
             return None
 
-        for segment in self.subtitle_list.segments:
-            if segment.id == subtitle_id:
-                return segment
-
-        return None
+        return self.subtitle_list.get_segment_by_id(subtitle_id)
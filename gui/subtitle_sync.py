@@ -0,0 +1,164 @@
+"""
+字幕同步调度器 - 只在字幕边界时刻唤醒界面线程
+"""
+
+import math
+import time
+from typing import Optional
+
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+from gui.video_player import VideoPlayer
+from models.subtitle import SubtitleList
+
+# 定时器在边界之后这么久触发（秒），此时结束边界上的片段已不再包含当前时间
+BOUNDARY_DELAY = 0.001
+
+# 定时器提前触发时，重新定时的最短间隔（毫秒）
+MIN_TIMER_INTERVAL_MS = 1
+
+
+class SubtitleSyncScheduler(QObject):
+    """
+    字幕同步调度器
+
+    播放时根据当前位置计算下一个字幕边界（片段开始或结束时间，以及复读的结束时刻），
+    只用一个精确定时器在该时刻唤醒一次，而不是在每次播放位置变化时都查找字幕。
+    跳转、播放状态和播放速度变化时重新计算；暂停时不唤醒。
+    """
+
+    # 信号
+    sync = pyqtSignal(float)  # 需要同步字幕，传递当前位置（秒）
+
+    def __init__(self, video_player: VideoPlayer, parent=None):
+        super().__init__(parent)
+
+        self.video_player = video_player
+        self.subtitle_list: Optional[SubtitleList] = None
+        self.deadline: Optional[float] = None  # 额外的边界（复读结束时刻）
+
+        # 最近一次得知的播放位置及其时刻，用于推算当前位置
+        self._anchor_position = 0.0
+        self._anchor_time = time.monotonic()
+        self._playing = False
+        self._rate = 1.0
+        self._target: Optional[float] = None  # 定时器对应的边界
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._on_timeout)
+
+        media_player = video_player.media_player
+        media_player.positionChanged.connect(self._on_position_reported)
+        media_player.playbackRateChanged.connect(self._on_rate_changed)
+        video_player.playback_state_changed.connect(self._on_playback_state_changed)
+        video_player.seeked.connect(self._on_seeked)
+
+    def set_subtitle_list(self, subtitle_list: Optional[SubtitleList]):
+        """
+        设置字幕列表并立即同步一次
+
+        Args:
+            subtitle_list: 字幕列表
+        """
+        self.subtitle_list = subtitle_list
+        self.refresh()
+
+    def set_deadline(self, deadline: Optional[float]):
+        """
+        设置额外的边界（例如复读的结束时刻），None表示取消
+
+        Args:
+            deadline: 时间点（秒）
+        """
+        self.deadline = deadline
+        self.reschedule()
+
+    def refresh(self):
+        """立即同步一次并重新计算下一个边界（字幕内容变化后调用）"""
+        self.sync.emit(self.current_position())
+        self.reschedule()
+
+    def stop(self):
+        """停止调度"""
+        self.timer.stop()
+        self._target = None
+
+    def current_position(self) -> float:
+        """
+        推算当前播放位置（秒）
+
+        播放器报告的位置在跳转后会滞后，因此从最近一次得知的位置按播放速度推算。
+        """
+        if not self._playing:
+            return self._anchor_position
+        return self._anchor_position + (time.monotonic() - self._anchor_time) * self._rate
+
+    def _reanchor(self):
+        """以推算的当前位置作为新的起点（播放状态或速度改变之前调用）"""
+        self._anchor_position = self.current_position()
+        self._anchor_time = time.monotonic()
+
+    def reschedule(self):
+        """计算下一个边界并设置定时器"""
+        self.timer.stop()
+        self._target = None
+
+        rate = self._rate
+        if self.subtitle_list is None or not self._playing or rate <= 0:
+            return
+
+        position = self.current_position()
+        target = self.subtitle_list.next_boundary(position)
+        if self.deadline is not None and self.deadline > position and (target is None or self.deadline < target):
+            target = self.deadline
+        if target is None:
+            return
+
+        self._target = target
+        self._start_timer(target, position, rate)
+
+    def _start_timer(self, target: float, position: float, rate: float):
+        """定时到边界之后BOUNDARY_DELAY触发"""
+        interval = (target + BOUNDARY_DELAY - position) / rate * 1000
+        self.timer.start(max(MIN_TIMER_INTERVAL_MS, math.ceil(interval)))
+
+    def _on_timeout(self):
+        """到达边界"""
+        target = self._target
+        if target is None:
+            return
+
+        position = self.current_position()
+        if position <= target:
+            # 定时器提前触发（或播放器报告的位置滞后），等到真正越过边界
+            self._start_timer(target, position, self._rate)
+            return
+
+        self.sync.emit(position)
+        self.reschedule()
+
+    def _on_position_reported(self, position: int):
+        """播放器报告位置 - 只记录，不做其他处理"""
+        self._anchor_position = position / 1000.0
+        self._anchor_time = time.monotonic()
+
+    def _on_playback_state_changed(self, playing: bool):
+        """播放/暂停"""
+        self._reanchor()
+        self._playing = playing
+        self.reschedule()
+
+    def _on_rate_changed(self, rate: float):
+        """播放速度变化"""
+        self._reanchor()
+        self._rate = rate
+        self.reschedule()
+
+    def _on_seeked(self, position: float):
+        """跳转后以目标位置为准立即同步"""
+        self._anchor_position = position
+        self._anchor_time = time.monotonic()
+        self.sync.emit(position)
+        self.reschedule()
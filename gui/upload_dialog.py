@@ -3,21 +3,31 @@
 """
 
 import os
+from typing import Optional
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout,
                              QLabel, QPushButton, QProgressBar,
-                             QFileDialog, QMessageBox)
+                             QFileDialog, QMessageBox, QInputDialog)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QPixmap
 
 import config
 from core.video_processor import VideoProcessor
 from core.speech_recognizer import SpeechRecognizer
+from core.inference_server import InferenceServer
 from core.translator import GoogleTranslator
 from core.subtitle_generator import SubtitleGenerator
+from core.subtitle_refiner import RefinedWindow, SubtitleRefiner
+from core.transcription_scheduler import TranscriptionScheduler
+from core.transcription_checkpoint import TranscriptionCheckpoint
 from models.subtitle import SubtitleList
-from models.video_info import VideoInfo
+from models.video_info import SubtitleStream, VideoInfo
+from utils.audio_utils import split_audio_file_windows
 from utils.file_utils import is_video_file, format_file_size
-from utils.time_utils import format_duration
+from utils.time_utils import format_duration, seconds_to_time_string
+
+
+# 视频旁边可直接使用的字幕文件（按优先级排列）
+SIDECAR_SUBTITLE_SUFFIXES = ["_bilingual.json", "_bilingual.srt", ".en.srt", ".srt", ".en.vtt", ".vtt"]
 
 
 class ProcessVideoThread(QThread):
@@ -28,12 +38,28 @@ class ProcessVideoThread(QThread):
     processing_completed = pyqtSignal(VideoInfo, SubtitleList)  # 处理完成
     error_occurred = pyqtSignal(str)  # 发生错误
 
-    def __init__(self, video_path: str):
+    def __init__(self,
+                 video_path: str,
+                 subtitle_stream: Optional[SubtitleStream] = None,
+                 subtitle_file: Optional[str] = None):
+        """
+        Args:
+            video_path: 视频文件路径
+            subtitle_stream: 使用的内嵌字幕流，指定后跳过语音识别直接翻译
+            subtitle_file: 使用的英文字幕文件（.srt/.vtt/.json），指定后跳过语音识别直接翻译
+        """
         super().__init__()
 
         self.video_path = video_path
+        self.subtitle_stream = subtitle_stream
+        self.subtitle_file = subtitle_file
         self.video_processor = VideoProcessor()
-        self.speech_recognizer = SpeechRecognizer()
+        # 两遍转录时第一遍使用快速模型
+        model_name = config.WHISPER_PREVIEW_MODEL if config.ASR_TWO_PASS else config.WHISPER_MODEL
+
+        # 多个处理线程同时运行时共享同一个模型
+        server = InferenceServer.get_instance(model_name=model_name) if config.ASR_SHARED_SERVER else None
+        self.speech_recognizer = SpeechRecognizer(model_name=model_name, server=server)
         self.translator = GoogleTranslator()
         self.subtitle_generator = SubtitleGenerator()
 
@@ -45,6 +71,26 @@ class ProcessVideoThread(QThread):
             video_info = self.video_processor.get_video_info(self.video_path)
             video_info.audio_path = self.video_processor.extract_audio(self.video_path)
 
+            subtitle_file = self.subtitle_file
+            if self.subtitle_stream is not None:
+                self.progress_updated.emit(0.2, "正在提取内嵌字幕...")
+                subtitle_file = self.video_processor.extract_subtitle_stream(self.video_path, self.subtitle_stream)
+
+            if subtitle_file is not None:
+                # 使用已有的英文字幕，跳过语音识别
+                self.progress_updated.emit(0.3, "正在加载字幕...")
+                subtitle_list = self.subtitle_generator.load_file(subtitle_file)
+                if len(subtitle_list) == 0:
+                    raise ValueError("字幕中没有可用的文本")
+                self._translate_and_save(video_info, subtitle_list)
+                return
+
+            if config.ASR_PROGRESSIVE:
+                # 渐进式转录：音频就绪后立即打开视频，语音识别和翻译在后台进行
+                self.progress_updated.emit(1.0, "音频提取完成，将在播放时后台生成字幕")
+                self.processing_completed.emit(video_info, SubtitleList(segments=[]))
+                return
+
             # 步骤2: 语音识别
             self.progress_updated.emit(0.2, "正在进行语音识别...")
             subtitle_list = self.speech_recognizer.transcribe(
@@ -52,40 +98,217 @@ class ProcessVideoThread(QThread):
                 language="en"
             )
 
-            # 步骤3: 翻译
-            self.progress_updated.emit(0.7, "正在翻译字幕...")
-            subtitle_list = self.translator.translate_subtitle_list(subtitle_list)
+            self._translate_and_save(video_info, subtitle_list)
+
+        except Exception as e:
+            self.error_occurred.emit(f"处理失败: {str(e)}")
+
+    def _translate_and_save(self, video_info: VideoInfo, subtitle_list: SubtitleList):
+        """
+        翻译并保存字幕，完成后发出处理完成信号
+
+        Args:
+            video_info: 视频信息
+            subtitle_list: 英文字幕列表
+        """
+        # 步骤3: 翻译
+        self.progress_updated.emit(0.7, "正在翻译字幕...")
+        subtitle_list = self.translator.translate_subtitle_list(subtitle_list)
+
+        # 步骤4: 保存字幕
+        self.progress_updated.emit(0.95, "正在保存字幕...")
+
+        # 保存到缓存目录，同时保存到视频同目录（JSON和SRT），方便用户下次使用
+        targets = self.subtitle_generator.save_outputs(subtitle_list, self.video_path)
+        video_info.subtitle_path = targets[0].path
+
+        # 字幕已保存到缓存，语音识别断点不再需要
+        if video_info.audio_path:
+            TranscriptionCheckpoint.remove(video_info.audio_path)
+
+        # 完成
+        self.progress_updated.emit(1.0, "处理完成！")
+        self.processing_completed.emit(video_info, subtitle_list)
+
+
+class ProbeSubtitleStreamsThread(QThread):
+    """内嵌字幕检查线程 - 在后台用ffprobe读取视频中的文本字幕流"""
+
+    # 信号
+    probe_completed = pyqtSignal(list)  # 检查完成 (文本字幕流列表，无法读取时为空)
+
+    def __init__(self, video_path: str):
+        super().__init__()
+
+        self.video_path = video_path
+
+    def run(self):
+        """读取流信息"""
+        try:
+            video_info = VideoProcessor().get_video_info(self.video_path)
+            streams = [stream for stream in video_info.subtitle_streams if stream.is_text]
+        except Exception:
+            # 无法读取流信息时按原流程处理
+            streams = []
+        self.probe_completed.emit(streams)
+
+
+class RefineSubtitleThread(QThread):
+    """字幕精修线程 - 在后台用更大的模型重新识别预览字幕"""
+
+    # 信号
+    segments_refined = pyqtSignal(RefinedWindow)  # 一个窗口精修完成（由界面线程写入字幕列表）
+    progress_updated = pyqtSignal(str)  # 进度消息
+    refine_completed = pyqtSignal()  # 精修完成
+
+    def __init__(self, video_info: VideoInfo, subtitle_list: SubtitleList):
+        """
+        Args:
+            video_info: 视频信息
+            subtitle_list: 正在显示的预览字幕（在界面线程中复制，线程只读写自己的副本）
+        """
+        super().__init__()
+
+        self.video_info = video_info
+        self.subtitle_list = SubtitleList(
+            segments=[segment.to_segment() for segment in subtitle_list.segments],
+            language=subtitle_list.language,
+            words=subtitle_list.words
+        )
+        self.refiner = SubtitleRefiner()
+        self.subtitle_generator = SubtitleGenerator()
+        self._stop_requested = False
 
-            # 步骤4: 保存字幕
-            self.progress_updated.emit(0.95, "正在保存字幕...")
+    def stop(self):
+        """请求停止（当前窗口处理完后退出）"""
+        self._stop_requested = True
 
-            # 保存到缓存目录
-            cache_path = self.subtitle_generator.save_to_cache(
-                subtitle_list,
-                self.video_path,
-                format="json"
+    def run(self):
+        """按优先级逐个窗口精修，每个窗口完成后立即发给界面线程显示，每隔几个窗口保存一次"""
+        unsaved = 0  # 尚未保存的精修窗口数
+
+        try:
+            targets = self.subtitle_generator.get_output_targets(self.video_info.path)
+            windows = self.refiner.plan_windows(self.subtitle_list)
+
+            for i, window in enumerate(windows):
+                if self._stop_requested:
+                    break
+
+                self.progress_updated.emit(f"正在后台精修字幕 {i + 1}/{len(windows)}...")
+                result = self.refiner.refine_window(
+                    window,
+                    self.video_info.audio_path,
+                    self.subtitle_list.language
+                )
+                if not result.segments:
+                    continue
+
+                self.segments_refined.emit(result)
+
+                # 副本同样写入，用于保存
+                self.refiner.apply_window(self.subtitle_list, result)
+                unsaved += 1
+                if unsaved >= config.REFINE_SAVE_WINDOWS:
+                    # 缓存和用户文件都是先写临时文件再替换
+                    self.subtitle_generator.save_outputs(self.subtitle_list, self.video_info.path, targets)
+                    unsaved = 0
+
+            if unsaved:
+                self.subtitle_generator.save_outputs(self.subtitle_list, self.video_info.path, targets)
+
+            if not self._stop_requested:
+                self.refine_completed.emit()
+
+        except Exception as e:
+            self.progress_updated.emit(f"字幕精修失败: {str(e)}")
+
+
+class ProgressiveTranscribeThread(QThread):
+    """渐进式转录线程 - 视频打开后在后台逐个窗口转录和翻译，优先处理播放位置附近的窗口"""
+
+    # 信号
+    window_transcribed = pyqtSignal(SubtitleList)  # 一个窗口转录并翻译完成
+    progress_updated = pyqtSignal(str)  # 进度消息
+    transcription_completed = pyqtSignal(SubtitleList)  # 全部完成（按时间顺序重新编号的完整字幕）
+
+    def __init__(self, video_info: VideoInfo):
+        super().__init__()
+
+        self.video_info = video_info
+        # 窗口划分需要读取音频，在run()中完成后才创建调度器
+        self.scheduler: Optional[TranscriptionScheduler] = None
+        self.hint_position: Optional[float] = None  # 调度器创建前收到的播放位置
+
+        model_name = config.WHISPER_PREVIEW_MODEL if config.ASR_TWO_PASS else config.WHISPER_MODEL
+        server = InferenceServer.get_instance(model_name=model_name) if config.ASR_SHARED_SERVER else None
+        self.speech_recognizer = SpeechRecognizer(model_name=model_name, server=server)
+        self.translator = GoogleTranslator()
+        self.subtitle_generator = SubtitleGenerator()
+        self._stop_requested = False
+
+    def hint(self, position: float):
+        """
+        提示用户正在观看的位置，下一个转录的窗口从该位置开始
+
+        Args:
+            position: 播放位置（秒）
+        """
+        self.hint_position = position
+        if self.scheduler is not None:
+            self.scheduler.hint(position)
+
+    def stop(self):
+        """请求停止（当前窗口处理完后退出）"""
+        self._stop_requested = True
+
+    def run(self):
+        """按调度顺序逐个窗口转录，全部完成后保存字幕"""
+        try:
+            self.scheduler = TranscriptionScheduler(
+                split_audio_file_windows(self.video_info.audio_path, config.PROGRESSIVE_WINDOW_SECONDS)
             )
-            video_info.subtitle_path = cache_path
+            if self.hint_position is not None:
+                self.scheduler.hint(self.hint_position)
 
-            # 同时保存到视频同目录，方便用户下次使用
-            from pathlib import Path
-            video_dir = Path(self.video_path).parent
-            video_name = Path(self.video_path).stem
-            user_subtitle_path = video_dir / f"{video_name}_bilingual.json"
+            subtitle_list = SubtitleList(segments=[])
+            next_id = 1
 
-            # 保存JSON格式
-            self.subtitle_generator.save_json(subtitle_list, str(user_subtitle_path))
+            while not self._stop_requested:
+                index = self.scheduler.next_window()
+                if index is None:
+                    break
 
-            # 同时保存SRT格式，方便通用播放器使用
-            srt_path = video_dir / f"{video_name}_bilingual.srt"
-            self.subtitle_generator.save_srt(subtitle_list, str(srt_path))
+                start, end = self.scheduler.windows[index]
+                self.progress_updated.emit(
+                    f"正在后台生成字幕 {seconds_to_time_string(start)} - {seconds_to_time_string(end)}"
+                    f"（剩余 {self.scheduler.remaining + 1} 段）"
+                )
 
-            # 完成
-            self.progress_updated.emit(1.0, "处理完成！")
-            self.processing_completed.emit(video_info, subtitle_list)
+                window_list = self.speech_recognizer.transcribe_window(self.video_info.audio_path, start, end)
+                self.translator.translate_subtitle_list(window_list)
+
+                # 序号按完成顺序分配，合并后保持不变，界面可以继续按序号查找
+                for segment in window_list.segments:
+                    segment.id = next_id
+                    next_id += 1
+
+                subtitle_list.merge(window_list)
+                self.window_transcribed.emit(window_list)
+
+            if self._stop_requested:
+                return
+
+            # 全部完成后按时间顺序重新编号，与一次性转录的结果一致
+            subtitle_list.renumber()
+
+            targets = self.subtitle_generator.save_outputs(subtitle_list, self.video_info.path)
+            self.video_info.subtitle_path = targets[0].path
+
+            self.transcription_completed.emit(subtitle_list)
 
         except Exception as e:
-            self.error_occurred.emit(f"处理失败: {str(e)}")
+            self.progress_updated.emit(f"字幕生成失败: {str(e)}")
 
 
 class UploadDialog(QDialog):
@@ -99,6 +322,11 @@ class UploadDialog(QDialog):
 
         self.video_path = None
         self.process_thread = None
+        self.probe_thread = None
+        self.needs_refinement = False  # 字幕来自两遍转录的第一遍，需要后台精修
+        self.needs_transcription = False  # 渐进式转录：视频打开后在后台生成字幕
+        self.subtitle_stream = None  # 使用的内嵌字幕流
+        self.subtitle_file = None  # 使用的外挂字幕文件
 
         self._setup_ui()
 
@@ -182,21 +410,49 @@ class UploadDialog(QDialog):
         )
 
         if file_path:
-            self.video_path = file_path
+            self.open_file(file_path)
 
-            # 检查是否已存在字幕文件
-            from pathlib import Path
-            video_dir = Path(file_path).parent
-            video_name = Path(file_path).stem
-            existing_subtitle = video_dir / f"{video_name}_bilingual.json"
+    def open_file(self, file_path: str):
+        """
+        打开视频文件：有现有字幕时直接加载，否则开始处理
 
-            if existing_subtitle.exists():
-                # 直接加载现有字幕，不再询问
-                self._load_existing_subtitle(file_path, existing_subtitle)
-                return
+        Args:
+            file_path: 视频文件路径
+        """
+        self.video_path = file_path
 
-            # 没有现有字幕，开始处理
-            self._start_processing()
+        # 检查是否已存在字幕文件
+        existing_subtitle = self._find_existing_subtitle(file_path)
+
+        if existing_subtitle is not None:
+            # 直接加载现有字幕，不再询问
+            self._load_existing_subtitle(file_path, existing_subtitle)
+            return
+
+        # 没有现有字幕，开始处理
+        self._start_processing()
+
+    def _find_existing_subtitle(self, video_path: str) -> Optional[str]:
+        """
+        查找视频旁边已有的字幕文件
+
+        优先使用本程序生成的双语字幕，其次是同名的 .srt/.vtt 字幕（如 video.srt、video.en.srt）。
+
+        Args:
+            video_path: 视频文件路径
+
+        Returns:
+            字幕文件路径，没有时返回None
+        """
+        from pathlib import Path
+        video_dir = Path(video_path).parent
+        video_name = Path(video_path).stem
+
+        for suffix in SIDECAR_SUBTITLE_SUFFIXES:
+            subtitle_path = video_dir / f"{video_name}{suffix}"
+            if subtitle_path.exists():
+                return str(subtitle_path)
+        return None
 
     def _load_existing_subtitle(self, video_path: str, subtitle_path: str):
         """加载已存在的字幕"""
@@ -219,7 +475,20 @@ class UploadDialog(QDialog):
             self.progress_bar.setValue(80)
 
             subtitle_generator = SubtitleGenerator()
-            subtitle_list = subtitle_generator.load_json(str(subtitle_path))
+            subtitle_list = subtitle_generator.load_with_cache(str(subtitle_path))
+
+            if len(subtitle_list) == 0:
+                raise ValueError("字幕文件中没有可用的字幕")
+
+            if not all(segment.text_zh for segment in subtitle_list.segments if segment.text_en):
+                # 有片段缺少中文翻译（例如只有英文的字幕文件）：跳过语音识别，只翻译缺少翻译的片段
+                self.progress_bar.setVisible(False)
+                self.status_label.setVisible(False)
+                self._start_processing(subtitle_file=str(subtitle_path))
+                return
+
+            # 之前生成的字幕也加入字幕库搜索索引
+            subtitle_generator.index_subtitles(subtitle_list, video_path)
 
             self.progress_bar.setValue(100)
             self.status_label.setText("✓ 加载完成！（使用已有字幕，无需重新翻译）")
@@ -253,25 +522,87 @@ class UploadDialog(QDialog):
             self.select_button.setEnabled(True)
             self._start_processing()
 
-    def _start_processing(self):
-        """开始处理"""
+    def _start_processing(self, subtitle_file: Optional[str] = None):
+        """
+        开始处理
+
+        Args:
+            subtitle_file: 已有的英文字幕文件，指定后跳过语音识别直接翻译
+        """
         if not self.video_path:
             return
 
+        self.subtitle_file = subtitle_file
+        self.subtitle_stream = None
+
         # 显示进度
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         self.status_label.setVisible(True)
-        self.status_label.setText("正在处理...")
         self.select_button.setEnabled(False)
 
-        # 启动处理线程
-        self.process_thread = ProcessVideoThread(self.video_path)
+        if subtitle_file is None and config.USE_EMBEDDED_SUBTITLES:
+            # 在后台检查内嵌文本字幕，检查期间进度条显示忙碌状态
+            self.status_label.setText("正在检查内嵌字幕...")
+            self.progress_bar.setRange(0, 0)
+            self.probe_thread = ProbeSubtitleStreamsThread(self.video_path)
+            self.probe_thread.probe_completed.connect(self._on_probe_completed)
+            self.probe_thread.start()
+            return
+
+        self._start_process_thread()
+
+    def _on_probe_completed(self, streams: list):
+        """
+        内嵌字幕检查完成，视频带有文本字幕时询问是否直接使用
+
+        Args:
+            streams: 文本字幕流列表
+        """
+        self.progress_bar.setRange(0, 100)
+        self.subtitle_stream = self._choose_subtitle_stream(streams)
+        self._start_process_thread()
+
+    def _start_process_thread(self):
+        """启动处理线程"""
+        self.status_label.setText("正在处理...")
+
+        self.process_thread = ProcessVideoThread(self.video_path, self.subtitle_stream, self.subtitle_file)
         self.process_thread.progress_updated.connect(self._on_progress_updated)
         self.process_thread.processing_completed.connect(self._on_processing_completed)
         self.process_thread.error_occurred.connect(self._on_error_occurred)
         self.process_thread.start()
 
+    def _choose_subtitle_stream(self, streams: list[SubtitleStream]) -> Optional[SubtitleStream]:
+        """
+        让用户选择使用哪条内嵌文本字幕代替语音识别
+
+        Args:
+            streams: 视频中的文本字幕流
+
+        Returns:
+            选择的字幕流，没有可用字幕或选择语音识别时返回None
+        """
+        if not streams:
+            return None
+
+        # 英文字幕排在前面，默认选中第一条
+        streams.sort(key=lambda stream: (not stream.is_english, not stream.default))
+        items = [f"使用内嵌字幕 {stream.description}" for stream in streams]
+        items.append("不使用，进行语音识别")
+
+        item, ok = QInputDialog.getItem(
+            self,
+            "发现内嵌字幕",
+            "视频中包含文本字幕，可以直接使用字幕跳过语音识别：",
+            items,
+            0,
+            False
+        )
+        if not ok or item == items[-1]:
+            return None
+        return streams[items.index(item)]
+
     def _on_progress_updated(self, progress: float, message: str):
         """
         进度更新
@@ -291,12 +622,22 @@ class UploadDialog(QDialog):
             video_info: 视频信息
             subtitle_list: 字幕列表
         """
+        # 使用内嵌字幕时字幕已完整，不需要后台转录和精修
+        from_asr = self.subtitle_stream is None and self.subtitle_file is None
+        self.needs_transcription = from_asr and config.ASR_PROGRESSIVE
+        # 渐进式转录完成后再开始精修
+        self.needs_refinement = from_asr and config.ASR_TWO_PASS and not config.ASR_PROGRESSIVE
+
         # 显示视频信息
         info_text = f"""<b>文件名:</b> {video_info.name}
 <b>时长:</b> {format_duration(video_info.duration)}
 <b>分辨率:</b> {video_info.resolution}
 <b>文件大小:</b> {format_file_size(video_info.size)}
-<b>字幕数量:</b> {len(subtitle_list)} 条"""
+<b>字幕数量:</b> {"播放时后台生成" if self.needs_transcription else f"{len(subtitle_list)} 条"}"""
+        if self.subtitle_stream is not None:
+            info_text += f"\n<b>字幕来源:</b> 内嵌字幕 {self.subtitle_stream.description}"
+        elif self.subtitle_file is not None:
+            info_text += f"\n<b>字幕来源:</b> 外挂字幕 {os.path.basename(self.subtitle_file)}"
         self.video_info_label.setText(info_text)
         self.video_info_label.setVisible(True)
 
@@ -15,9 +15,9 @@ class VideoPlayer(QWidget):
     """视频播放器组件"""
 
     # 信号
-    position_changed = pyqtSignal(float)  # 当前播放位置变化
     duration_changed = pyqtSignal(float)  # 视频时长变化
     playback_state_changed = pyqtSignal(bool)  # 播放状态变化
+    seeked = pyqtSignal(float)  # 跳转播放位置（程序调用或拖动进度条）
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -72,20 +72,26 @@ class VideoPlayer(QWidget):
         layout.addLayout(control_layout)
 
         self._slider_pressed = False
+        self._pending_seek = None  # 视频加载完成后要跳转的位置（秒）
+        self._duration_text = seconds_to_time_string(0)  # 时长文本（时长变化时才重新格式化）
+        self._displayed_second = -1  # 时间标签当前显示的秒数
 
     def _connect_signals(self):
         """连接信号"""
         self.media_player.positionChanged.connect(self._on_position_changed)
         self.media_player.durationChanged.connect(self._on_duration_changed)
         self.media_player.playbackStateChanged.connect(self._on_state_changed)
+        self.media_player.mediaStatusChanged.connect(self._on_media_status_changed)
 
-    def load_video(self, video_path: str):
+    def load_video(self, video_path: str, start_position: float = 0.0):
         """
         加载视频文件
 
         Args:
             video_path: 视频文件路径
+            start_position: 加载完成后跳转到的位置（秒）
         """
+        self._pending_seek = start_position if start_position > 0 else None
         video_url = QUrl.fromLocalFile(video_path)
         self.media_player.setSource(video_url)
 
@@ -116,6 +122,7 @@ class VideoPlayer(QWidget):
             position: 目标位置（秒）
         """
         self.media_player.setPosition(int(position * 1000))
+        self.seeked.emit(position)
 
     def set_volume(self, volume: float):
         """
@@ -126,6 +133,24 @@ class VideoPlayer(QWidget):
         """
         self.audio_output.setVolume(volume)
 
+    def get_volume(self) -> float:
+        """
+        获取音量
+
+        Returns:
+            音量值 (0.0 - 1.0)
+        """
+        return self.audio_output.volume()
+
+    def set_muted(self, muted: bool):
+        """
+        设置视频声音是否静音（不改变音量设置）
+
+        Args:
+            muted: 是否静音
+        """
+        self.audio_output.setMuted(muted)
+
     def get_position(self) -> float:
         """
         获取当前播放位置
@@ -159,25 +184,38 @@ class VideoPlayer(QWidget):
         """播放位置变化"""
         position_seconds = position / 1000.0
 
-        # 更新进度条（如果用户没有在拖动）
+        # 更新进度条（如果用户没有在拖动），位置变化不足一个像素时不重绘
         if not self._slider_pressed:
-            self.position_slider.setValue(int(position))
+            pixel_ms = self.position_slider.maximum() / max(self.position_slider.width(), 1)
+            if abs(position - self.position_slider.value()) >= pixel_ms:
+                self.position_slider.setValue(int(position))
 
-        # 更新时间显示
-        duration = self.get_duration()
-        current_time = seconds_to_time_string(position_seconds)
-        total_time = seconds_to_time_string(duration)
-        self.time_label.setText(f"{current_time} / {total_time}")
-
-        # 发射信号
-        self.position_changed.emit(position_seconds)
+        # 更新时间显示（只精确到秒，秒数变化时才更新）
+        self._update_time_label(position_seconds)
 
     def _on_duration_changed(self, duration: int):
         """视频时长变化"""
         duration_seconds = duration / 1000.0
         self.position_slider.setRange(0, int(duration))
+        self._duration_text = seconds_to_time_string(duration_seconds)
+        self._displayed_second = -1
+        self._update_time_label(self.get_position())
         self.duration_changed.emit(duration_seconds)
 
+    def _update_time_label(self, position: float):
+        """
+        更新时间标签（显示的秒数没有变化时跳过）
+
+        Args:
+            position: 当前位置（秒）
+        """
+        second = int(position)
+        if second == self._displayed_second:
+            return
+
+        self._displayed_second = second
+        self.time_label.setText(f"{seconds_to_time_string(position)} / {self._duration_text}")
+
     def _on_state_changed(self, state):
         """播放状态变化"""
         if state == QMediaPlayer.PlaybackState.PlayingState:
@@ -187,6 +225,18 @@ class VideoPlayer(QWidget):
             self.play_button.setText("播放")
             self.playback_state_changed.emit(False)
 
+    def _on_media_status_changed(self, status):
+        """媒体状态变化 - 视频加载完成后执行等待中的跳转"""
+        if self._pending_seek is None:
+            return
+
+        if status in (QMediaPlayer.MediaStatus.LoadedMedia, QMediaPlayer.MediaStatus.BufferedMedia):
+            position = self._pending_seek
+            self._pending_seek = None
+            self.seek(position)
+        elif status == QMediaPlayer.MediaStatus.InvalidMedia:
+            self._pending_seek = None
+
     def _on_slider_pressed(self):
         """进度条按下"""
         self._slider_pressed = True
@@ -194,8 +244,10 @@ class VideoPlayer(QWidget):
     def _on_slider_released(self):
         """进度条释放"""
         self._slider_pressed = False
+        self._pending_seek = None  # 用户已手动跳转，不再执行等待中的跳转
         position = self.position_slider.value()
         self.media_player.setPosition(position)
+        self.seeked.emit(position / 1000.0)
 
     def _on_volume_changed(self, value: int):
         """音量变化"""
@@ -0,0 +1,81 @@
+"""
+字幕时间区间索引
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Optional
+
+
+class IntervalIndex:
+    """
+    按开始时间排序的区间索引
+
+    查找包含某个时间点的区间时，先用二分查找定位开始时间不晚于该时间点的区间，
+    再用结束时间的前缀最大值找到其中最早开始、且尚未结束的区间，支持区间重叠。
+    播放时时间点单调增加，先检查上次命中的区间和下一个区间，通常不需要二分查找。
+    """
+
+    def __init__(self, starts: list[float], ends: list[float]):
+        """
+        建立索引
+
+        Args:
+            starts: 各区间的开始时间（不要求有序）
+            ends: 各区间的结束时间
+        """
+        self.order = sorted(range(len(starts)), key=starts.__getitem__)  # 排序位置 -> 原位置
+        self.starts = [starts[i] for i in self.order]
+        self.ends = [ends[i] for i in self.order]
+        # 前 k+1 个区间（按开始时间）中最晚的结束时间，单调不减
+        self.max_ends = list(accumulate(self.ends, max))
+        self._cursor = 0  # 上次命中的排序位置
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def find(self, time: float) -> Optional[int]:
+        """
+        查找包含时间点的区间（start <= time <= end），有多个时返回开始最早的一个
+
+        Args:
+            time: 时间点（秒）
+
+        Returns:
+            区间的原位置，不存在时返回None
+        """
+        for position in (self._cursor, self._cursor + 1):
+            if self._is_first_containing(position, time):
+                self._cursor = position
+                return self.order[position]
+
+        # 最早结束时间不早于time的区间，它之前的区间都已结束
+        position = bisect_left(self.max_ends, time)
+        if position < len(self.order) and self.starts[position] <= time:
+            self._cursor = position
+            return self.order[position]
+        return None
+
+    def _is_first_containing(self, position: int, time: float) -> bool:
+        """排序位置上的区间包含时间点，且前面的区间都已结束"""
+        return (
+            position < len(self.order)
+            and self.starts[position] <= time <= self.ends[position]
+            and (position == 0 or self.max_ends[position - 1] < time)
+        )
+
+    def overlapping(self, start: float, end: float) -> list[int]:
+        """
+        查找与时间范围 [start, end] 重叠的所有区间
+
+        Args:
+            start: 开始时间（秒）
+            end: 结束时间（秒）
+
+        Returns:
+            区间的原位置列表（按开始时间排序）
+        """
+        # 之前的区间都在start之前结束，之后的区间都在end之后开始
+        first = bisect_left(self.max_ends, start)
+        last = bisect_right(self.starts, end)
+        return [self.order[i] for i in range(first, last) if self.ends[i] >= start]
@@ -2,11 +2,19 @@
 字幕数据模型
 """
 
+from array import array
+from bisect import bisect_right
+from collections.abc import MutableSequence
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Union
 
+import numpy as np
 
-@dataclass
+from models.interval_index import IntervalIndex
+from models.word_timing import WordTimings
+
+
+@dataclass(slots=True)
 class SubtitleSegment:
     """字幕片段"""
     id: int  # 序号
@@ -15,6 +23,8 @@ class SubtitleSegment:
     text_en: str  # 英文原文
     text_zh: str = ""  # 中文翻译
     translating: bool = False  # 是否正在翻译
+    avg_logprob: float = 0.0  # 识别结果的平均对数概率（越低越不可靠，不保存到文件）
+    no_speech_prob: float = 0.0  # 识别为无语音的概率（不保存到文件）
 
     @property
     def duration(self) -> float:
@@ -43,23 +53,407 @@ class SubtitleSegment:
         )
 
 
-@dataclass
+class SegmentView:
+    """
+    字幕列表中一个片段的视图
+
+    属性与 SubtitleSegment 相同，读写直接作用于字幕列表的列存储。
+    视图指向物理行，片段被 replace_segment 替换后，旧视图仍然是替换前的内容。
+    """
+
+    __slots__ = ("_list", "_row")
+
+    def __init__(self, subtitle_list: "SubtitleList", row: int):
+        self._list = subtitle_list
+        self._row = row
+
+    @property
+    def id(self) -> int:
+        return self._list._ids[self._row]
+
+    @id.setter
+    def id(self, value: int) -> None:
+        self._list._ids[self._row] = value
+        self._list._id_index = None
+
+    @property
+    def start(self) -> float:
+        return self._list._starts[self._row]
+
+    @start.setter
+    def start(self, value: float) -> None:
+        self._list._starts[self._row] = value
+        self._list._invalidate_times()
+
+    @property
+    def end(self) -> float:
+        return self._list._ends[self._row]
+
+    @end.setter
+    def end(self, value: float) -> None:
+        self._list._ends[self._row] = value
+        self._list._invalidate_times()
+
+    @property
+    def text_en(self) -> str:
+        return self._list._texts_en[self._row]
+
+    @text_en.setter
+    def text_en(self, value: str) -> None:
+        self._list._texts_en[self._row] = value
+
+    @property
+    def text_zh(self) -> str:
+        return self._list._texts_zh[self._row]
+
+    @text_zh.setter
+    def text_zh(self, value: str) -> None:
+        self._list._texts_zh[self._row] = value
+
+    @property
+    def translating(self) -> bool:
+        return bool(self._list._translating[self._row])
+
+    @translating.setter
+    def translating(self, value: bool) -> None:
+        self._list._translating[self._row] = bool(value)
+
+    @property
+    def avg_logprob(self) -> float:
+        return self._list._avg_logprobs[self._row]
+
+    @avg_logprob.setter
+    def avg_logprob(self, value: float) -> None:
+        self._list._avg_logprobs[self._row] = value
+
+    @property
+    def no_speech_prob(self) -> float:
+        return self._list._no_speech_probs[self._row]
+
+    @no_speech_prob.setter
+    def no_speech_prob(self, value: float) -> None:
+        self._list._no_speech_probs[self._row] = value
+
+    @property
+    def duration(self) -> float:
+        """获取时长"""
+        return self.end - self.start
+
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return self._list._row_dict(self._row)
+
+    def to_segment(self) -> SubtitleSegment:
+        """复制为独立的字幕片段"""
+        return SubtitleSegment(
+            id=self.id,
+            start=self.start,
+            end=self.end,
+            text_en=self.text_en,
+            text_zh=self.text_zh,
+            translating=self.translating,
+            avg_logprob=self.avg_logprob,
+            no_speech_prob=self.no_speech_prob
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (SegmentView, SubtitleSegment)):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"SegmentView({self.to_segment()!r})"
+
+
+Segment = Union[SubtitleSegment, SegmentView]
+
+
+class SegmentSequence(MutableSequence):
+    """字幕列表的片段序列（按时间顺序），元素是 SegmentView"""
+
+    __slots__ = ("_list",)
+
+    def __init__(self, subtitle_list: "SubtitleList"):
+        self._list = subtitle_list
+
+    def __len__(self) -> int:
+        return len(self._list._order)
+
+    def __getitem__(self, index):
+        order = self._list._order
+        if isinstance(index, slice):
+            return [SegmentView(self._list, row) for row in order[index]]
+        return SegmentView(self._list, order[index])
+
+    def __iter__(self) -> Iterator[SegmentView]:
+        subtitle_list = self._list
+        # 遍历顺序的快照，遍历过程中其他线程插入片段不影响本次遍历
+        for row in subtitle_list._order.tolist():
+            yield SegmentView(subtitle_list, row)
+
+    def __setitem__(self, index: int, segment: Segment) -> None:
+        if isinstance(index, slice):
+            raise TypeError("不支持切片赋值")
+        # 新片段写入新的物理行后再替换顺序表中的一项，其他线程不会看到修改一半的片段
+        self._list._order[index] = self._list._append_row(segment)
+        self._list.invalidate_index()
+
+    def __delitem__(self, index) -> None:
+        del self._list._order[index]
+        self._list.invalidate_index()
+
+    def insert(self, index: int, segment: Segment) -> None:
+        self._list._order.insert(index, self._list._append_row(segment))
+        self._list.invalidate_index()
+
+
 class SubtitleList:
-    """字幕列表"""
-    segments: list[SubtitleSegment]
-    language: str = "en"  # 原始语言
+    """
+    字幕列表（列式存储）
+
+    片段的序号、时间和识别置信度保存在 array 列中，文本保存在字符串列表中，
+    不为每个片段创建对象；segments 中的元素是按需创建的轻量视图 SegmentView。
+    物理行只追加不修改位置，_order 记录按时间顺序排列的物理行号，插入和替换片段时只修改 _order。
+
+    按时间查找片段使用区间索引，按序号查找片段使用序号索引，索引在第一次查找时建立，
+    修改片段时自动失效。
+    """
+
+    def __init__(self,
+                 segments: Optional[Iterable[Segment]] = None,
+                 language: str = "en",
+                 words: Optional[WordTimings] = None):
+        """
+        Args:
+            segments: 按时间排序的字幕片段
+            language: 原始语言
+            words: 单词级时间戳
+        """
+        self.language = language  # 原始语言
+        self.words = words  # 单词级时间戳
+        self._clear()
+        if segments is not None:
+            self.segments = segments
+
+    def _clear(self) -> None:
+        """清空列存储"""
+        self._ids = array('i')
+        self._starts = array('d')
+        self._ends = array('d')
+        self._texts_en: list[str] = []
+        self._texts_zh: list[str] = []
+        self._translating = bytearray()
+        self._avg_logprobs = array('f')
+        self._no_speech_probs = array('f')
+        self._order = array('I')  # 按时间顺序排列的物理行号
+        self._index: Optional[IntervalIndex] = None
+        self._id_index: Optional[dict[int, int]] = None
+        self._times: Optional[tuple[np.ndarray, np.ndarray]] = None  # 按时间顺序的开始/结束时间数组
+        self._boundaries: Optional[np.ndarray] = None  # 所有片段边界（去重排序）
+
+    @classmethod
+    def from_columns(cls,
+                     ids: Iterable[int],
+                     starts: Iterable[float],
+                     ends: Iterable[float],
+                     texts_en: list[str],
+                     texts_zh: list[str],
+                     language: str = "en",
+                     words: Optional[WordTimings] = None) -> "SubtitleList":
+        """
+        由整列数据创建字幕列表（不经过逐个片段对象）
+
+        Args:
+            ids: 序号列
+            starts: 开始时间列（秒）
+            ends: 结束时间列（秒）
+            texts_en: 英文原文列
+            texts_zh: 中文翻译列
+            language: 原始语言
+            words: 单词级时间戳
+
+        Returns:
+            字幕列表对象
+        """
+        subtitle_list = cls(language=language, words=words)
+        subtitle_list._ids = array('i', ids)
+        subtitle_list._starts = array('d', starts)
+        subtitle_list._ends = array('d', ends)
+        subtitle_list._texts_en = list(texts_en)
+        subtitle_list._texts_zh = list(texts_zh)
+
+        count = len(subtitle_list._ids)
+        subtitle_list._translating = bytearray(count)
+        subtitle_list._avg_logprobs = array('f', bytes(4 * count))
+        subtitle_list._no_speech_probs = array('f', bytes(4 * count))
+        subtitle_list._order = array('I', range(count))
+        return subtitle_list
+
+    @property
+    def segments(self) -> SegmentSequence:
+        """按时间顺序的片段序列"""
+        return SegmentSequence(self)
+
+    @segments.setter
+    def segments(self, segments: Iterable[Segment]) -> None:
+        # 先复制视图再清空：新片段可能就是从本列表的视图生成的
+        segments = [s.to_segment() if isinstance(s, SegmentView) else s for s in segments]
+        self._clear()
+        for segment in segments:
+            self._order.append(self._append_row(segment))
+
+    def _append_row(self, segment: Segment) -> int:
+        """把片段写入新的物理行，返回行号"""
+        row = len(self._ids)
+        self._starts.append(segment.start)
+        self._ends.append(segment.end)
+        self._texts_en.append(segment.text_en)
+        self._texts_zh.append(segment.text_zh)
+        self._translating.append(bool(segment.translating))
+        self._avg_logprobs.append(segment.avg_logprob)
+        self._no_speech_probs.append(segment.no_speech_prob)
+        # 序号最后写入，其他线程按行数读取时该行的其他列都已就绪
+        self._ids.append(segment.id)
+        return row
+
+    def _row_dict(self, row: int) -> dict:
+        """物理行转换为字典"""
+        return {
+            "id": self._ids[row],
+            "start": self._starts[row],
+            "end": self._ends[row],
+            "text_en": self._texts_en[row],
+            "text_zh": self._texts_zh[row],
+        }
 
     def __len__(self) -> int:
-        return len(self.segments)
+        return len(self._order)
 
-    def __getitem__(self, index: int) -> SubtitleSegment:
+    def __getitem__(self, index: int) -> SegmentView:
         return self.segments[index]
 
-    def append(self, segment: SubtitleSegment) -> None:
+    def append(self, segment: Segment) -> None:
         """添加字幕片段"""
-        self.segments.append(segment)
+        self._order.append(self._append_row(segment))
+        self.invalidate_index()
+
+    def merge(self, other: "SubtitleList") -> None:
+        """
+        按时间顺序合并另一个字幕列表（渐进式转录中乱序完成的窗口）
+
+        Args:
+            other: 要合并的字幕列表，其片段序号不能与本列表重复
+        """
+        for segment in other.segments:
+            index = bisect_right(self._order, segment.start, key=self._starts.__getitem__)
+            self._order.insert(index, self._append_row(segment))
+        self.invalidate_index()
+
+        if other.words is None or len(other.words) == 0:
+            return
+
+        if self.words is None:
+            self.words = other.words
+            return
+
+        # 新窗口内原本没有单词，替换一个空区间即插入到对应位置
+        new_words = [
+            (other.words.starts[i], other.words.ends[i], other.words.word(i))
+            for i in range(len(other.words))
+        ]
+        first_start = new_words[0][0]
+        self.words = self.words.with_range_replaced(first_start, first_start, new_words)
 
-    def get_segment_at_time(self, time: float) -> Optional[SubtitleSegment]:
+    def replace_segment(self, segment: Segment) -> bool:
+        """
+        用新的片段替换序号相同的片段（写入新的物理行后单次赋值，其他线程不会看到修改一半的片段）
+
+        Args:
+            segment: 新的字幕片段
+
+        Returns:
+            是否找到并替换
+        """
+        i = self.index_of(segment.id)
+        if i is None:
+            return False
+
+        old_row = self._order[i]
+        self._order[i] = self._append_row(segment)
+        if (segment.start, segment.end) != (self._starts[old_row], self._ends[old_row]):
+            self._invalidate_times()
+        return True
+
+    def renumber(self) -> None:
+        """按时间顺序把序号重新编为 1, 2, 3..."""
+        for i, row in enumerate(self._order):
+            self._ids[row] = i + 1
+        self._id_index = None
+
+    def index_of(self, segment_id: int) -> Optional[int]:
+        """
+        获取指定序号的片段在列表中的位置
+
+        Args:
+            segment_id: 字幕序号
+
+        Returns:
+            片段位置，不存在时返回None
+        """
+        id_index = self._id_index
+        if id_index is None or len(id_index) != len(self._order):
+            id_index = self._build_id_index()
+
+        i = id_index.get(segment_id)
+        if i is not None and (i >= len(self._order) or self._ids[self._order[i]] != segment_id):
+            # 索引建立后列表又被修改过，重建后再查一次
+            i = self._build_id_index().get(segment_id)
+        return i
+
+    def _build_id_index(self) -> dict[int, int]:
+        """建立序号 -> 位置的索引"""
+        ids = self._ids
+        self._id_index = {ids[row]: i for i, row in enumerate(self._order)}
+        return self._id_index
+
+    def get_segment_by_id(self, segment_id: int) -> Optional[SegmentView]:
+        """
+        根据序号获取字幕片段
+
+        Args:
+            segment_id: 字幕序号
+
+        Returns:
+            字幕片段，不存在时返回None
+        """
+        i = self.index_of(segment_id)
+        return self.segments[i] if i is not None else None
+
+    def invalidate_index(self) -> None:
+        """使时间索引和序号索引失效（下次查找时重建）"""
+        self._invalidate_times()
+        self._id_index = None
+
+    def _invalidate_times(self) -> None:
+        """片段时间改变后使时间索引和时间列缓存失效"""
+        self._index = None
+        self._times = None
+        self._boundaries = None
+
+    def _get_index(self) -> IntervalIndex:
+        """获取时间索引，片段数量变化时自动重建"""
+        index = self._index
+        if index is None or len(index) != len(self._order):
+            index = IntervalIndex(
+                [self._starts[row] for row in self._order],
+                [self._ends[row] for row in self._order]
+            )
+            self._index = index
+        return index
+
+    def get_segment_at_time(self, time: float) -> Optional[SegmentView]:
         """
         获取指定时间点的字幕片段
 
@@ -67,22 +461,172 @@ class SubtitleList:
             time: 时间点（秒）
 
         Returns:
-            对应的字幕片段，如果不存在返回None
+            对应的字幕片段（多个片段重叠时返回开始最早的一个），如果不存在返回None
+        """
+        position = self._get_index().find(time)
+        return self.segments[position] if position is not None else None
+
+    def time_columns(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        获取按片段顺序排列的开始/结束时间数组（只读，片段时间改变后重新生成）
+
+        Returns:
+            (开始时间数组, 结束时间数组)
+        """
+        times = self._times
+        if times is None or len(times[0]) != len(self._order):
+            order = np.frombuffer(self._order, dtype=np.uint32)
+            # 按顺序表取值得到的是副本，不会长期占用 array 的缓冲区（占用期间 array 不能追加）
+            starts = np.frombuffer(self._starts, dtype=np.float64)[order]
+            ends = np.frombuffer(self._ends, dtype=np.float64)[order]
+            del order
+            starts.flags.writeable = False
+            ends.flags.writeable = False
+            times = (starts, ends)
+            self._times = times
+        return times
+
+    def overlapping(self, start: float, end: float) -> list[SegmentView]:
+        """
+        获取与时间范围 [start, end] 重叠的所有片段
+
+        Args:
+            start: 开始时间（秒）
+            end: 结束时间（秒）
+
+        Returns:
+            按开始时间排列的片段
+        """
+        segments = self.segments
+        return [segments[i] for i in self._get_index().overlapping(start, end)]
+
+    def _get_boundaries(self) -> np.ndarray:
+        """所有片段开始/结束时间去重排序后的数组"""
+        boundaries = self._boundaries
+        if boundaries is None:
+            boundaries = np.unique(np.concatenate(self.time_columns()))
+            self._boundaries = boundaries
+        return boundaries
+
+    def next_boundary(self, time: float) -> Optional[float]:
+        """
+        获取时间点之后的第一个片段边界（开始或结束时间）
+
+        Args:
+            time: 时间点（秒）
+
+        Returns:
+            边界时间（秒），之后没有边界时返回None
+        """
+        boundaries = self._get_boundaries()
+        i = int(np.searchsorted(boundaries, time, side="right"))
+        return float(boundaries[i]) if i < len(boundaries) else None
+
+    def previous_boundary(self, time: float) -> Optional[float]:
+        """
+        获取时间点之前的最后一个片段边界（开始或结束时间）
+
+        Args:
+            time: 时间点（秒）
+
+        Returns:
+            边界时间（秒），之前没有边界时返回None
+        """
+        boundaries = self._get_boundaries()
+        i = int(np.searchsorted(boundaries, time, side="left"))
+        return float(boundaries[i - 1]) if i > 0 else None
+
+    def gaps(self, min_duration: float = 0.0) -> list[tuple[float, float]]:
+        """
+        获取片段之间没有字幕的时间段（重叠的片段视为连续）
+
+        Args:
+            min_duration: 最短间隔（秒），更短的间隔忽略
+
+        Returns:
+            (开始时间, 结束时间) 列表，按时间排序
+        """
+        starts, ends = self.time_columns()
+        if len(starts) < 2:
+            return []
+
+        order = np.argsort(starts, kind="stable")
+        starts = starts[order]
+        covered = np.maximum.accumulate(ends[order])  # 到每个片段为止字幕覆盖到的最晚时间
+
+        gap_starts = covered[:-1]
+        gap_ends = starts[1:]
+        mask = gap_ends - gap_starts > min_duration
+        if min_duration <= 0:
+            mask &= gap_ends > gap_starts
+        return list(zip(gap_starts[mask].tolist(), gap_ends[mask].tolist()))
+
+    def shift(self, offset: float) -> None:
+        """
+        整体平移所有片段和单词的时间（小于0的时间截为0）
+
+        Args:
+            offset: 平移量（秒），正数向后
+        """
+        self._transform_times(1.0, offset)
+
+    def scale(self, factor: float, origin: float = 0.0) -> None:
+        """
+        以origin为原点整体缩放所有片段和单词的时间（如修正帧率不一致的字幕）
+
+        Args:
+            factor: 缩放系数
+            origin: 缩放原点（秒）
+        """
+        self._transform_times(factor, origin * (1.0 - factor))
+
+    def _transform_times(self, factor: float, offset: float) -> None:
+        """所有时间变换为 max(t * factor + offset, 0)"""
+        for column in (self._starts, self._ends):
+            values = np.frombuffer(column, dtype=np.float64)
+            np.maximum(values * factor + offset, 0.0, out=values)
+            del values
+
+        if self.words is not None:
+            self.words.transform(factor, offset)
+
+        self._invalidate_times()
+
+    def get_words(self, segment: Segment) -> list[tuple[float, float, str]]:
+        """
+        获取字幕片段内的单词时间戳
+
+        Args:
+            segment: 字幕片段
+
+        Returns:
+            (开始时间, 结束时间, 单词) 列表，没有单词时间戳时返回空列表
         """
-        for segment in self.segments:
-            if segment.start <= time <= segment.end:
-                return segment
-        return None
+        if self.words is None:
+            return []
+        return self.words.words_between(segment.start, segment.end)
 
     def to_dict(self) -> dict:
         """转换为字典"""
-        return {
+        data = {
             "language": self.language,
-            "segments": [seg.to_dict() for seg in self.segments],
+            "segments": [self._row_dict(row) for row in self._order],
         }
+        if self.words is not None:
+            data["words"] = self.words.to_dict()
+        return data
 
     @classmethod
     def from_dict(cls, data: dict) -> "SubtitleList":
         """从字典创建实例"""
-        segments = [SubtitleSegment.from_dict(seg) for seg in data["segments"]]
-        return cls(segments=segments, language=data.get("language", "en"))
+        segments = data["segments"]
+        words = WordTimings.from_dict(data["words"]) if "words" in data else None
+        return cls.from_columns(
+            [seg["id"] for seg in segments],
+            [seg["start"] for seg in segments],
+            [seg["end"] for seg in segments],
+            [seg["text_en"] for seg in segments],
+            [seg.get("text_zh", "") for seg in segments],
+            language=data.get("language", "en"),
+            words=words
+        )
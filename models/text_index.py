@@ -0,0 +1,139 @@
+"""
+字幕文本n-gram索引
+"""
+
+from typing import Iterable, Optional
+
+# 索引的n-gram长度
+NGRAM_SIZE = 3
+
+
+class NgramIndex:
+    """
+    字幕文本的n-gram倒排索引（不区分大小写，中英文都按字符切分）
+
+    每条字幕的文本按长度为NGRAM_SIZE的子串建立倒排表，查询时先取各n-gram倒排表的
+    交集作为候选，再逐条确认包含完整的查询文本；比n-gram短的查询直接逐条匹配。
+    边输入边搜索时，新查询包含上一次的查询文本，只需在上一次的结果中继续筛选。
+    """
+
+    def __init__(self):
+        self._texts: dict[int, str] = {}  # 字幕序号 -> 小写文本
+        self._postings: dict[str, set[int]] = {}  # n-gram -> 字幕序号集合
+        self._last_query = ""
+        self._last_result: Optional[set[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def keys(self):
+        """已索引的所有字幕序号"""
+        return self._texts.keys()
+
+    @staticmethod
+    def _grams(text: str) -> set[str]:
+        """文本中的所有n-gram"""
+        return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+    def add(self, key: int, *texts: str) -> None:
+        """
+        添加或更新一条字幕的文本
+
+        Args:
+            key: 字幕序号
+            texts: 字幕文本（英文、中文）
+        """
+        self.remove(key)
+
+        # 不同文本之间用换行分隔，查询不会跨文本匹配
+        text = "\n".join(texts).lower()
+        self._texts[key] = text
+        postings = self._postings
+        for gram in self._grams(text):
+            keys = postings.get(gram)
+            if keys is None:
+                postings[gram] = {key}
+            else:
+                keys.add(key)
+        self._last_result = None
+
+    def update(self, items: Iterable[tuple[int, str, str]]) -> None:
+        """
+        批量添加或更新字幕文本
+
+        Args:
+            items: (字幕序号, 英文, 中文) 序列
+        """
+        for key, text_en, text_zh in items:
+            self.add(key, text_en, text_zh)
+
+    def remove(self, key: int) -> None:
+        """
+        删除一条字幕
+
+        Args:
+            key: 字幕序号
+        """
+        text = self._texts.pop(key, None)
+        if text is None:
+            return
+
+        for gram in self._grams(text):
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+        self._last_result = None
+
+    def clear(self) -> None:
+        """清空索引"""
+        self._texts.clear()
+        self._postings.clear()
+        self._last_result = None
+
+    def search(self, query: str) -> set[int]:
+        """
+        查找包含查询文本的字幕
+
+        Args:
+            query: 查询文本
+
+        Returns:
+            字幕序号集合
+        """
+        query = query.strip().lower()
+        if not query:
+            return set()
+
+        if self._last_result is not None and self._last_query and self._last_query in query:
+            candidates = self._last_result
+        else:
+            candidates = self._candidates(query)
+
+        texts = self._texts
+        result = {key for key in candidates if query in texts[key]}
+
+        self._last_query = query
+        self._last_result = result
+        return result
+
+    def _candidates(self, query: str) -> set[int]:
+        """各n-gram倒排表的交集（从最短的倒排表开始），查询比n-gram短时为全部字幕"""
+        if len(query) < NGRAM_SIZE:
+            return self._texts.keys()
+
+        postings = []
+        for gram in self._grams(query):
+            keys = self._postings.get(gram)
+            if not keys:
+                return set()
+            postings.append(keys)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            candidates &= keys
+            if not candidates:
+                break
+        return candidates
@@ -2,9 +2,63 @@
 视频信息数据模型
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
+# 可以直接转换为SRT的文本字幕编码（PGS、DVD等图形字幕需要OCR，不支持）
+TEXT_SUBTITLE_CODECS = {"subrip", "srt", "ass", "ssa", "mov_text", "webvtt", "text"}
+
+
+@dataclass
+class SubtitleStream:
+    """视频内嵌的字幕流"""
+    index: int  # 流序号（ffmpeg的 -map 0:<序号>）
+    codec: str  # 编码名称
+    language: str = ""  # 语言标签（如 eng）
+    title: str = ""  # 字幕标题
+    default: bool = False  # 是否为默认字幕
+
+    @property
+    def is_text(self) -> bool:
+        """是否为文本字幕（可以提取并解析）"""
+        return self.codec in TEXT_SUBTITLE_CODECS
+
+    @property
+    def is_english(self) -> bool:
+        """是否为英文字幕"""
+        return self.language.lower() in ("eng", "en")
+
+    @property
+    def description(self) -> str:
+        """获取显示用的描述"""
+        parts = [f"#{self.index}", self.language or "未知语言", self.codec]
+        if self.title:
+            parts.append(self.title)
+        if self.default:
+            parts.append("默认")
+        return " / ".join(parts)
+
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            "index": self.index,
+            "codec": self.codec,
+            "language": self.language,
+            "title": self.title,
+            "default": self.default,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SubtitleStream":
+        """从字典创建实例"""
+        return cls(
+            index=data["index"],
+            codec=data["codec"],
+            language=data.get("language", ""),
+            title=data.get("title", ""),
+            default=data.get("default", False),
+        )
+
 
 @dataclass
 class VideoInfo:
@@ -18,6 +72,7 @@ class VideoInfo:
     size: int  # 文件大小（字节）
     audio_path: Optional[str] = None  # 提取的音频文件路径
     subtitle_path: Optional[str] = None  # 字幕文件路径
+    subtitle_streams: list[SubtitleStream] = field(default_factory=list)  # 内嵌字幕流
 
     @property
     def resolution(self) -> str:
@@ -41,6 +96,7 @@ class VideoInfo:
             "size": self.size,
             "audio_path": self.audio_path,
             "subtitle_path": self.subtitle_path,
+            "subtitle_streams": [stream.to_dict() for stream in self.subtitle_streams],
         }
 
     @classmethod
@@ -56,4 +112,5 @@ class VideoInfo:
             size=data["size"],
             audio_path=data.get("audio_path"),
             subtitle_path=data.get("subtitle_path"),
+            subtitle_streams=[SubtitleStream.from_dict(stream) for stream in data.get("subtitle_streams", [])],
         )
@@ -0,0 +1,202 @@
+"""
+单词级时间戳数据模型
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+class WordTimings:
+    """
+    单词时间戳（列式存储）
+
+    开始/结束时间保存在float32数组中，单词文本拼接成一个字符串表，
+    通过偏移量数组定位，长视频也不会为每个单词创建Python对象。
+    单词按开始时间排序，按时间查找为O(log n)。
+    """
+
+    def __init__(self):
+        self.starts = array('f')  # 单词开始时间（秒）
+        self.ends = array('f')  # 单词结束时间（秒）
+        self.offsets = array('I', [0])  # 第i个单词为 text[offsets[i]:offsets[i + 1]]
+        self._chunks: list[str] = []  # 尚未合并进字符串表的单词
+        self._text = ""
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def text(self) -> str:
+        """获取拼接后的单词字符串表"""
+        if self._chunks:
+            self._text += "".join(self._chunks)
+            self._chunks.clear()
+        return self._text
+
+    def append(self, start: float, end: float, word: str) -> None:
+        """
+        追加一个单词
+
+        Args:
+            start: 开始时间（秒）
+            end: 结束时间（秒）
+            word: 单词文本
+        """
+        word = word.strip()
+        # 保证按开始时间有序，乱序追加时插入到正确位置
+        if self.starts and start < self.starts[-1]:
+            self._insert(start, end, word)
+            return
+
+        self.starts.append(start)
+        self.ends.append(end)
+        self._chunks.append(word)
+        self.offsets.append(self.offsets[-1] + len(word))
+
+    def _insert(self, start: float, end: float, word: str) -> None:
+        """按开始时间插入单词（仅用于乱序追加，需要重建偏移量）"""
+        index = bisect_right(self.starts, start)
+        words = list(self.iter_words())
+        words.insert(index, word)
+
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self._rebuild_text(words)
+
+    def _rebuild_text(self, words: list[str]) -> None:
+        """根据单词列表重建字符串表和偏移量"""
+        offsets = array('I', [0])
+        position = 0
+        for word in words:
+            position += len(word)
+            offsets.append(position)
+
+        self.offsets = offsets
+        self._chunks.clear()
+        self._text = "".join(words)
+
+    def word(self, index: int) -> str:
+        """
+        获取指定序号的单词
+
+        Args:
+            index: 单词序号
+
+        Returns:
+            单词文本
+        """
+        return self.text[self.offsets[index]:self.offsets[index + 1]]
+
+    def iter_words(self) -> Iterator[str]:
+        """按顺序遍历所有单词"""
+        text = self.text
+        offsets = self.offsets
+        for i in range(len(self.starts)):
+            yield text[offsets[i]:offsets[i + 1]]
+
+    def index_at(self, time: float) -> Optional[int]:
+        """
+        获取指定时间点正在说的单词序号
+
+        Args:
+            time: 时间点（秒）
+
+        Returns:
+            单词序号，如果该时间点没有单词返回None
+        """
+        index = bisect_right(self.starts, time) - 1
+        if index >= 0 and time <= self.ends[index]:
+            return index
+        return None
+
+    def range_between(self, start: float, end: float) -> range:
+        """
+        获取开始时间落在 [start, end) 区间内的单词序号范围
+
+        Args:
+            start: 区间开始时间（秒）
+            end: 区间结束时间（秒）
+
+        Returns:
+            单词序号范围
+        """
+        # float32存储有精度误差，边界放宽1毫秒
+        first = bisect_left(self.starts, start - 0.001)
+        last = bisect_left(self.starts, end - 0.001, lo=first)
+        return range(first, last)
+
+    def words_between(self, start: float, end: float) -> list[tuple[float, float, str]]:
+        """
+        获取时间区间内的单词
+
+        Args:
+            start: 区间开始时间（秒）
+            end: 区间结束时间（秒）
+
+        Returns:
+            (开始时间, 结束时间, 单词) 列表
+        """
+        return [
+            (self.starts[i], self.ends[i], self.word(i))
+            for i in self.range_between(start, end)
+        ]
+
+    def with_range_replaced(self, start: float, end: float,
+                            words: list[tuple[float, float, str]]) -> "WordTimings":
+        """
+        生成替换了时间区间内单词的新实例（原实例不变，便于整体替换）
+
+        Args:
+            start: 区间开始时间（秒）
+            end: 区间结束时间（秒）
+            words: 新的 (开始时间, 结束时间, 单词) 列表
+
+        Returns:
+            新的WordTimings实例
+        """
+        replaced = self.range_between(start, end)
+        result = WordTimings()
+
+        for i in range(replaced.start):
+            result.append(self.starts[i], self.ends[i], self.word(i))
+        for word_start, word_end, word in words:
+            result.append(word_start, word_end, word)
+        for i in range(replaced.stop, len(self)):
+            result.append(self.starts[i], self.ends[i], self.word(i))
+
+        return result
+
+    def transform(self, factor: float, offset: float) -> None:
+        """
+        原地变换所有单词时间为 max(t * factor + offset, 0)（factor为正数时顺序不变）
+
+        Args:
+            factor: 缩放系数
+            offset: 平移量（秒）
+        """
+        for column in (self.starts, self.ends):
+            values = np.frombuffer(column, dtype=np.float32)
+            np.maximum(values * factor + offset, 0.0, out=values, casting="same_kind")
+            del values
+
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            "start": [round(t, 3) for t in self.starts],
+            "end": [round(t, 3) for t in self.ends],
+            "text": self.text,
+            "offsets": self.offsets.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WordTimings":
+        """从字典创建实例"""
+        words = cls()
+        words.starts = array('f', data["start"])
+        words.ends = array('f', data["end"])
+        words.offsets = array('I', data["offsets"])
+        words._text = data["text"]
+        return words
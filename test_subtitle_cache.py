@@ -0,0 +1,124 @@
+"""
+字幕缓存测试脚本
+用于检查二进制字幕缓存的写入和读取结果一致
+"""
+
+import os
+import struct
+import tempfile
+
+import config
+from core.subtitle_cache import HEADER, MAGIC, VERSION, read_subtitle_cache, write_subtitle_cache
+from core.subtitle_generator import SubtitleGenerator
+from models.subtitle import SubtitleList, SubtitleSegment
+from models.word_timing import WordTimings
+
+
+def make_subtitle_list() -> SubtitleList:
+    """创建包含非ASCII文本和单词时间戳的字幕列表"""
+    words = WordTimings()
+    words.append(0.5, 0.75, "Café")
+    words.append(0.75, 1.25, "naïve")
+    words.append(2.0, 2.5, "日本語")
+    words.append(2.5, 3.0, "🎬")
+
+    segments = [
+        SubtitleSegment(id=1, start=0.5, end=1.25, text_en="Café naïve", text_zh="咖啡馆 天真"),
+        SubtitleSegment(id=2, start=2.0, end=3.0, text_en="日本語 🎬", text_zh=""),
+        SubtitleSegment(id=5, start=3.125, end=4.0, text_en="", text_zh="只有中文"),
+    ]
+    return SubtitleList(segments=segments, language="ja", words=words)
+
+
+def round_trip(subtitle_list: SubtitleList, compress: bool) -> SubtitleList:
+    """写入缓存文件后重新读取"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "cache.subc")
+        write_subtitle_cache(subtitle_list, path, compress)
+        return read_subtitle_cache(path)
+
+
+def assert_same(actual: SubtitleList, expected: SubtitleList):
+    """比较两个字幕列表的片段、语言和单词"""
+    assert actual.language == expected.language
+    assert [(s.id, s.start, s.end, s.text_en, s.text_zh) for s in actual.segments] == \
+        [(s.id, s.start, s.end, s.text_en, s.text_zh) for s in expected.segments]
+
+    if expected.words is None:
+        assert actual.words is None
+    else:
+        assert list(actual.words.starts) == list(expected.words.starts)
+        assert list(actual.words.ends) == list(expected.words.ends)
+        assert list(actual.words.iter_words()) == list(expected.words.iter_words())
+    for segment, expected_segment in zip(actual.segments, expected.segments):
+        assert actual.get_words(segment) == expected.get_words(expected_segment)
+
+
+def test_empty_list():
+    """空字幕列表（没有片段和单词）"""
+    for compress in (False, True):
+        subtitle_list = round_trip(SubtitleList(segments=[]), compress)
+        assert len(subtitle_list.segments) == 0
+        assert subtitle_list.language == "en"
+        assert subtitle_list.words is None
+
+
+def test_non_ascii_and_words():
+    """非ASCII文本、单词列和语言代码"""
+    expected = make_subtitle_list()
+    for compress in (False, True):
+        assert_same(round_trip(expected, compress), expected)
+
+
+def test_config_compress():
+    """SUBTITLE_CACHE_COMPRESS=True 时写入压缩的缓存"""
+    expected = make_subtitle_list()
+    original = config.SUBTITLE_CACHE_COMPRESS
+    generator = SubtitleGenerator()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for compress in (False, True):
+                config.SUBTITLE_CACHE_COMPRESS = compress
+                path = os.path.join(temp_dir, f"cache_{compress}.subc")
+                generator.save_binary(expected, path)
+
+                with open(path, "rb") as f:
+                    flags = HEADER.unpack(f.read(HEADER.size))[2]
+                assert bool(flags & 0x1) == compress
+
+                assert_same(generator.load_binary(path), expected)
+    finally:
+        config.SUBTITLE_CACHE_COMPRESS = original
+
+
+def test_rejects_bad_header():
+    """文件标识或版本号不对时拒绝读取"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "cache.subc")
+        write_subtitle_cache(make_subtitle_list(), path)
+        with open(path, "rb") as f:
+            data = f.read()
+
+        cases = {
+            "magic": b"JSON" + data[len(MAGIC):],
+            "version": data[:len(MAGIC)] + struct.pack("<H", VERSION + 1) + data[len(MAGIC) + 2:],
+            "truncated": data[:HEADER.size - 1],
+            "empty": b"",
+        }
+        for name, content in cases.items():
+            bad_path = os.path.join(temp_dir, f"{name}.subc")
+            with open(bad_path, "wb") as f:
+                f.write(content)
+            try:
+                read_subtitle_cache(bad_path)
+            except ValueError:
+                continue
+            raise AssertionError(f"应拒绝读取: {name}")
+
+
+if __name__ == "__main__":
+    test_empty_list()
+    test_non_ascii_and_words()
+    test_config_compress()
+    test_rejects_bad_header()
+    print("✓ 字幕缓存测试通过")
@@ -0,0 +1,85 @@
+"""
+字幕导出测试脚本
+用于检查批量时间戳格式化与原逐个格式化的结果一致（原实现截断毫秒，现在四舍五入）
+"""
+
+import numpy as np
+
+from core.subtitle_exporter import format_timestamps
+
+# 毫秒小数部分不进位、进位，以及跨秒/分/时和超过99小时的时间（避开恰好0.5毫秒的情况）
+TEST_SECONDS = [
+    0.0, 0.001, 0.29, 0.9994, 0.99949, 0.99951, 0.9996, 1.001, 1.0004, 12.3456,
+    59.9996, 61.2344, 3599.9996, 3600.0, 5025.0261, 86399.99961, 359999.9994,
+    359999.9996, 360000.0, 360000.0004, 400000.1236, 3600000.5554,
+]
+
+
+def old_srt_time(seconds: float) -> str:
+    """原 SubtitleGenerator._seconds_to_srt_time（截断毫秒）"""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    milliseconds = int((seconds % 1) * 1000)
+
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
+
+
+def old_vtt_time(seconds: float) -> str:
+    """原 SubtitleGenerator._seconds_to_vtt_time（截断毫秒）"""
+    return old_srt_time(seconds).replace(",", ".")
+
+
+def add_one_millisecond(timestamp: str, separator: str) -> str:
+    """时间戳加1毫秒（进位到秒、分、时）"""
+    clock, milliseconds = timestamp.split(separator)
+    hours, minutes, secs = (int(part) for part in clock.split(":"))
+    total = ((hours * 60 + minutes) * 60 + secs) * 1000 + int(milliseconds) + 1
+    hours, total = divmod(total, 3600000)
+    minutes, total = divmod(total, 60000)
+    secs, milliseconds = divmod(total, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+
+def rounds_up(seconds: float) -> bool:
+    """按原实现的计算方式，被截断的毫秒小数部分是否不小于0.5"""
+    fraction = (seconds % 1) * 1000
+    return fraction - int(fraction) >= 0.5
+
+
+def check_against_old(old_format, separator: str):
+    """逐个比较：不进位时与原结果相同，进位时比原结果多1毫秒"""
+    new = format_timestamps(np.array(TEST_SECONDS), separator)
+    for seconds, timestamp in zip(TEST_SECONDS, new):
+        expected = old_format(seconds)
+        if rounds_up(seconds):
+            expected = add_one_millisecond(expected, separator)
+        assert timestamp == expected, (seconds, timestamp, expected)
+
+        # 单独格式化与批量格式化结果相同
+        assert format_timestamps(np.array([seconds]), separator) == [timestamp]
+
+
+def test_srt_matches_old():
+    """SRT时间戳"""
+    check_against_old(old_srt_time, ",")
+
+
+def test_vtt_matches_old():
+    """WebVTT时间戳"""
+    check_against_old(old_vtt_time, ".")
+
+
+def test_rounding_examples():
+    """四舍五入进位到秒和小时，超过99小时只加宽对应的时间戳"""
+    assert format_timestamps(np.array([0.9996, 3599.9996, 359999.9996, 1.5]), ",") == [
+        "00:00:01,000", "01:00:00,000", "100:00:00,000", "00:00:01,500"
+    ]
+    assert format_timestamps(np.array([]), ",") == []
+
+
+if __name__ == "__main__":
+    test_srt_matches_old()
+    test_vtt_matches_old()
+    test_rounding_examples()
+    print("✓ 字幕导出测试通过")
@@ -0,0 +1,35 @@
+"""
+字幕列表测试脚本
+用于检查列存储字幕列表的基本操作
+"""
+
+from models.subtitle import SubtitleList, SubtitleSegment
+
+
+def make_list() -> SubtitleList:
+    """创建测试用的字幕列表"""
+    return SubtitleList([
+        SubtitleSegment(id=i + 1, start=i * 2.0, end=i * 2.0 + 1.5, text_en=f"line {i + 1}", text_zh=f"第{i + 1}句")
+        for i in range(5)
+    ])
+
+
+def test_assign_from_own_segments():
+    """用本列表的片段重新赋值（过滤、倒序）"""
+    subtitle_list = make_list()
+
+    subtitle_list.segments = [s for s in subtitle_list.segments if s.id % 2 == 1]
+    assert [s.id for s in subtitle_list.segments] == [1, 3, 5]
+    assert [s.text_en for s in subtitle_list.segments] == ["line 1", "line 3", "line 5"]
+    assert subtitle_list.get_segment_at_time(4.5).text_zh == "第3句"
+
+    subtitle_list.segments = subtitle_list.segments
+    assert [s.id for s in subtitle_list.segments] == [1, 3, 5]
+
+    subtitle_list.segments = reversed(list(subtitle_list.segments))
+    assert [s.id for s in subtitle_list.segments] == [5, 3, 1]
+
+
+if __name__ == "__main__":
+    test_assign_from_own_segments()
+    print("✓ 字幕列表测试通过")
@@ -0,0 +1,81 @@
+"""
+字幕解析测试脚本
+用于检查SRT/WebVTT解析和双语文本的中英文划分
+"""
+
+import io
+
+from core.subtitle_parser import parse_subtitle_stream
+
+
+def parse(text: str):
+    """解析字幕文本，返回片段列表"""
+    return list(parse_subtitle_stream(io.StringIO(text)).segments)
+
+
+def test_mixed_lines():
+    """英文句子夹杂个别汉字仍是英文；英文在前、中文在后"""
+    segments = parse(
+        "1\n"
+        "00:00:01,000 --> 00:00:02,500\n"
+        "I visited 北京 today\n"
+        "\n"
+        "2\n"
+        "00:00:03,000 --> 00:00:04,000\n"
+        "I visited 北京 today\n"
+        "我今天去了北京\n"
+        "\n"
+        "3\n"
+        "00:00:05,000 --> 00:00:06,000\n"
+        "I love Python\n"
+        "我喜欢Python编程\n"
+        "\n"
+        "4\n"
+        "00:00:07,000 --> 00:00:08,000\n"
+        "只有中文\n"
+    )
+
+    assert [(s.text_en, s.text_zh) for s in segments] == [
+        ("I visited 北京 today", ""),
+        ("I visited 北京 today", "我今天去了北京"),
+        ("I love Python", "我喜欢Python编程"),
+        ("", "只有中文"),
+    ]
+    assert (segments[0].start, segments[0].end) == (1.0, 2.5)
+
+
+def test_vtt_header_note_and_settings():
+    """WebVTT头部、NOTE/STYLE块、字幕标识和位置设置都被忽略"""
+    segments = parse(
+        "WEBVTT - lecture\n"
+        "Kind: captions\n"
+        "\n"
+        "NOTE\n"
+        "This is a comment\n"
+        "spanning two lines\n"
+        "\n"
+        "STYLE\n"
+        "::cue { color: yellow }\n"
+        "\n"
+        "intro\n"
+        "00:01.000 --> 00:02.000 align:start position:10%\n"
+        "<v Speaker>Hello &amp; welcome</v>\n"
+        "\n"
+        "NOTE one-line comment\n"
+        "\n"
+        "01:00:03.250 --> 01:00:04.000 line:0\n"
+        "<i>Second</i> cue\n"
+        "第二句\n"
+    )
+
+    assert [(s.start, s.end, s.text_en, s.text_zh) for s in segments] == [
+        (1.0, 2.0, "Hello & welcome", ""),
+        (3603.25, 3604.0, "Second cue", "第二句"),
+    ]
+    assert [s.id for s in segments] == [1, 2]
+
+
+if __name__ == "__main__":
+    test_mixed_lines()
+    test_vtt_header_note_and_settings()
+    print("✓ 字幕解析测试通过")
@@ -0,0 +1,145 @@
+"""
+音频工具函数 - 读取缓存的16kHz单声道PCM音频
+"""
+
+import wave
+
+import numpy as np
+
+# 缓存音频的采样率（与 VideoProcessor.extract_audio 一致）
+SAMPLE_RATE = 16000
+
+
+def get_audio_duration(audio_path: str) -> float:
+    """
+    获取WAV音频时长
+
+    Args:
+        audio_path: WAV文件路径
+
+    Returns:
+        时长（秒）
+    """
+    with wave.open(audio_path, 'rb') as f:
+        return f.getnframes() / f.getframerate()
+
+
+def read_pcm16(audio_path: str, start: float = 0.0, end: float = None) -> bytes:
+    """
+    读取WAV音频中指定区间的原始PCM数据（按采样点精确截取）
+
+    Args:
+        audio_path: WAV文件路径（16位PCM）
+        start: 开始时间（秒）
+        end: 结束时间（秒），None表示到文件末尾
+
+    Returns:
+        16位PCM字节数据
+    """
+    with wave.open(audio_path, 'rb') as f:
+        rate = f.getframerate()
+        total_frames = f.getnframes()
+
+        first_frame = min(max(int(round(start * rate)), 0), total_frames)
+        last_frame = total_frames if end is None else min(int(round(end * rate)), total_frames)
+
+        f.setpos(first_frame)
+        return f.readframes(max(last_frame - first_frame, 0))
+
+
+def load_audio(audio_path: str, start: float = 0.0, end: float = None) -> np.ndarray:
+    """
+    读取WAV音频为float32数组（Whisper的输入格式）
+
+    Args:
+        audio_path: WAV文件路径（16kHz单声道16位PCM）
+        start: 开始时间（秒）
+        end: 结束时间（秒），None表示到文件末尾
+
+    Returns:
+        取值范围 [-1, 1] 的float32数组
+    """
+    pcm = read_pcm16(audio_path, start, end)
+    return np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def split_audio_windows(audio: np.ndarray,
+                        max_seconds: float = 30.0,
+                        search_seconds: float = 5.0) -> list[tuple[int, int]]:
+    """
+    把音频预先切分为不超过max_seconds的窗口，切分点选在窗口末尾最安静的位置
+
+    Args:
+        audio: 16kHz float32音频数组
+        max_seconds: 窗口最大时长（秒）
+        search_seconds: 在窗口末尾多长范围内寻找切分点（秒）
+
+    Returns:
+        (开始采样点, 结束采样点) 列表
+    """
+    max_length = int(max_seconds * SAMPLE_RATE)
+    search_length = int(search_seconds * SAMPLE_RATE)
+    total_length = len(audio)
+
+    windows = []
+    start = 0
+    while start < total_length:
+        end = min(start + max_length, total_length)
+
+        if end < total_length:
+            end = end - search_length + _quietest_offset(audio[end - search_length:end])
+
+        windows.append((start, end))
+        start = end
+
+    return windows
+
+
+def split_audio_file_windows(audio_path: str,
+                             max_seconds: float = 30.0,
+                             search_seconds: float = 5.0) -> list[tuple[float, float]]:
+    """
+    按固定网格把WAV音频切分为窗口，每个切分点在网格点之前最安静的位置
+
+    与 split_audio_windows 不同，只读取每个切分点附近的音频，不加载整段音频，
+    切分点的位置也不依赖前面的窗口，任意窗口都可以单独转录。
+    窗口时长在 max_seconds ± search_seconds 范围内。
+
+    Args:
+        audio_path: WAV文件路径
+        max_seconds: 网格间隔（秒）
+        search_seconds: 在网格点之前多长范围内寻找切分点（秒）
+
+    Returns:
+        (开始时间, 结束时间) 列表（秒）
+    """
+    duration = get_audio_duration(audio_path)
+
+    boundaries = [0.0]
+    grid_point = max_seconds
+    while grid_point < duration:
+        region = load_audio(audio_path, grid_point - search_seconds, grid_point)
+        boundaries.append(grid_point - search_seconds + _quietest_offset(region) / SAMPLE_RATE)
+        grid_point += max_seconds
+    boundaries.append(duration)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _quietest_offset(region: np.ndarray) -> int:
+    """
+    计算区域内每帧的能量，返回能量最低的帧中间的采样点位置
+
+    Args:
+        region: 16kHz float32音频数组
+
+    Returns:
+        相对区域开始的采样点偏移
+    """
+    frame_length = SAMPLE_RATE // 50  # 20毫秒一帧
+    frame_count = len(region) // frame_length
+    if frame_count == 0:
+        return len(region)
+
+    energy = np.square(region[:frame_count * frame_length]).reshape(frame_count, frame_length).mean(axis=1)
+    return int(np.argmin(energy)) * frame_length + frame_length // 2
@@ -4,8 +4,10 @@
 
 import os
 import hashlib
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 
 def get_file_hash(file_path: str) -> str:
@@ -80,6 +82,49 @@ def get_cache_file_path(original_path: str, cache_dir: str, extension: str) -> s
     return str(Path(cache_dir) / filename)
 
 
+@contextmanager
+def atomic_write(file_path: str,
+                 mode: str = "w",
+                 encoding: Optional[str] = "utf-8",
+                 buffering: int = -1) -> Iterator:
+    """
+    原子写入文件：先写入同目录的临时文件，成功后再替换目标文件
+
+    读取方不会看到写了一半的文件，写入失败时原文件保持不变。
+
+    Args:
+        file_path: 目标文件路径
+        mode: 打开模式 ("w" 或 "wb")
+        encoding: 文本编码，二进制模式下忽略
+        buffering: 缓冲区大小，-1使用默认值
+
+    Yields:
+        临时文件对象
+    """
+    if "b" in mode:
+        encoding = None
+
+    # 每次写入使用唯一的临时文件名，多个写入方同时写同一文件时不会互相覆盖临时文件
+    directory, name = os.path.split(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory)
+
+    try:
+        # mkstemp创建的文件只有所有者可读写，保持与原文件（或普通新文件）相同的权限
+        try:
+            permissions = os.stat(file_path).st_mode & 0o777
+        except FileNotFoundError:
+            permissions = 0o644
+        os.chmod(temp_path, permissions)
+
+        with open(fd, mode, buffering=buffering, encoding=encoding) as f:
+            yield f
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
 def format_file_size(bytes_size: int) -> str:
     """
     格式化文件大小显示